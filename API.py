@@ -1,20 +1,59 @@
 # Author: Zedaine McDonald
 import random
 import string
-from flask import Flask, jsonify, request, Response
+from flask import Blueprint, Flask, json, jsonify, request, Response, send_file
 import mysql.connector
 from mysql.connector import Error
 from typing import Dict
-from Helper import get_connection, is_valid_email, generate_password
-from datetime import datetime
+from Helper import get_connection, get_pool, is_valid_email, generate_password, parse_datetime
+from Pagination import InvalidPageRequest, parse_page_args, keyset_condition, split_page
+from Export import ndjson_response
+from AttachmentStore import get_attachment_store
+from Cache import TTLCache
+import Config
+import Metrics
+import FastJSON
+import Compression
+import heapq
+import logging
+import math
+import time
+import uuid
+from Geo import parse_point, covering_cells, haversine_km
+from Dispatch import OPEN_STATUSES, technician_index
+from Availability import availability_engine
+from Provisioning import provision_users
+from RentSummary import adjust_rent_counts
+import Events
+from Events import enqueue_event, enqueue_events
+from Feed import FeedFull, feed_publisher
+from Conditional import make_etag, not_modified, page_version, with_validators
+from Passwords import HasherBusy, check_password, hash_password, run_bounded
+from RateLimit import check_login, record_login_success
+from Sessions import create_session, current_session, revoke_session, revoke_user_sessions, session_cache
+from datetime import datetime, timedelta
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 
 
-app = Flask(__name__)
+api = Blueprint('api', __name__)
+
+# Reachable without a token when DPM_REQUIRE_AUTH is on
+PUBLIC_ENDPOINTS = {"api.login", "api.metrics"}
+
+# Bearer token check for every API call; tokens are validated from the in-process session cache
+@api.before_request
+def authenticate():
+    if not Config.REQUIRE_AUTH or request.endpoint in PUBLIC_ENDPOINTS:
+        return None
+    if current_session() is None:
+        return jsonify({"success": False, "message": "Authentication required"}), 401, {"WWW-Authenticate": "Bearer"}
+    return None
 
 #USER CALLS
 #login API call    
-@app.route('/api/login', methods=['POST'])
+@api.route('/api/login', methods=['POST'])
 def login():
     data = request.get_json()
     email = data.get('email')
@@ -24,17 +63,50 @@ def login():
     if not email or not password:
         return jsonify({"success": False, "message": "Please enter email and password"}), 400
 
+    email = email.strip()
+    password = password.strip()
+
+    # Throttled before any database or hashing work, so a credential-stuffing burst stays in memory
+    # Behind a proxy, ProxyFix (PROXY_HOPS) has already set remote_addr from X-Forwarded-For
+    retry_after = check_login(request.remote_addr, email.lower())
+    if retry_after:
+        return jsonify({"success": False, "message": "Too many login attempts, please try again later"}), 429, {"Retry-After": str(retry_after)}
+
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
-        query = "SELECT UserID, Email, Role, FirstName, LastName FROM Users WHERE Email = %s AND PasswordHash = %s"
-        cursor.execute(query, (email.strip(), password.strip()))
+        query = "SELECT UserID, Email, Role, FirstName, LastName, PasswordHash FROM Users WHERE Email = %s"
+        cursor.execute(query, (email,))
         user = cursor.fetchone()
 
-        if user:
-            return jsonify({"success": True, "message": "Login successful", "user": user}), 200
-        else:
-            return jsonify({"success": False, "message": "Invalid email or password"}), 401
+    except Error as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    finally:
+        if conn.is_connected():
+            cursor.close()
+            conn.close()
+
+    # The connection is back in the pool before the (deliberately slow) hash check
+    stored_hash = user.pop('PasswordHash') if user else None
+    try:
+        valid, rehash = check_password(password, stored_hash)
+    except HasherBusy:
+        return jsonify({"success": False, "message": "Too many login attempts in progress, please retry"}), 503, {"Retry-After": "1"}
+
+    if not valid:
+        return jsonify({"success": False, "message": "Invalid email or password"}), 401
+
+    record_login_success(email.lower())
+
+    if rehash:
+        upgrade_password_hash(user['UserID'], stored_hash, password)
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        token, expires_at = create_session(cursor, user['UserID'], user['Role'])
+        conn.commit()
 
     except Error as e:
         return jsonify({"success": False, "message": str(e)}), 500
@@ -44,7 +116,57 @@ def login():
             cursor.close()
             conn.close()
 
-@app.route('/api/users', methods = ['POST'])
+    return jsonify({
+        "success": True,
+        "message": "Login successful",
+        "user": user,
+        "token": token,
+        "expires_at": expires_at
+    }), 200
+
+# Revokes the bearer token sent with the request
+@api.route('/api/logout', methods=['POST'])
+def logout():
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return jsonify({"success": False, "message": "No bearer token provided"}), 400
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        revoked = revoke_session(cursor, token.strip())
+        conn.commit()
+
+        if not revoked:
+            return jsonify({"success": False, "message": "Session not found or already ended"}), 404
+        return jsonify({"success": True, "message": "Logged out"}), 200
+
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Logout failed: {str(e)}"}), 500
+
+    finally:
+        if conn.is_connected():
+            cursor.close()
+            conn.close()
+
+# Replaces a plaintext or outdated hash after a successful login; a failure here must not fail the login
+def upgrade_password_hash(user_id, old_hash, password):
+    try:
+        new_hash = run_bounded(hash_password, password)
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            # Matching the old value skips the upgrade if the password was reset in the meantime
+            cursor.execute("UPDATE Users SET PasswordHash = %s WHERE UserID = %s AND PasswordHash = %s",
+                           (new_hash, user_id, old_hash))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+    except Exception as e:
+        print(f"Password hash upgrade for user {user_id} failed: {e}")
+
+@api.route('/api/users', methods = ['POST'])
 def create_user():
     data = request.get_json()
 
@@ -58,6 +180,10 @@ def create_user():
         return jsonify({"success": False, "message": "Please enter all required fields."}), 400
     
     password = generate_password()
+    try:
+        password_hash = run_bounded(hash_password, password)
+    except HasherBusy:
+        return jsonify({"success": False, "message": "Server busy, please retry"}), 503, {"Retry-After": "1"}
     
     try:
         conn = get_connection()
@@ -72,7 +198,7 @@ def create_user():
         cursor.execute("""
             INSERT INTO Users (Email, PasswordHash, Role, FirstName, LastName, PhoneNumber)
             VALUES (%s, %s, %s, %s, %s, %s)
-        """, (email, password, role, first_name, last_name, phone))
+        """, (email, password_hash, role, first_name, last_name, phone))
         conn.commit()
         
          # Get UserID
@@ -97,6 +223,8 @@ def create_user():
             pass
 
         conn.commit()
+        if role == "Technician":
+            technician_index.invalidate()
 
         return jsonify({
             "success": True,
@@ -113,7 +241,45 @@ def create_user():
         cursor.close()
         conn.close()
 
-@app.route('/api/users/<int:user_id>', methods=['PUT'])
+# Creates many users in one transaction and returns their generated credentials as newline-delimited
+# JSON, one line per input item followed by a summary line. The body is only built once the batch has
+# committed, so no credentials go out for users that could still be rolled back.
+@api.route('/api/users/batch', methods=['POST'])
+def create_users_batch():
+    data = request.get_json(silent=True) or {}
+    users = data.get('users')
+
+    if not isinstance(users, list) or not users:
+        return jsonify({"success": False, "message": "'users' must be a non-empty list"}), 400
+    # Every new user costs a password hash, so this cap is well below MAX_BATCH_ITEMS to finish within the
+    # worker timeout; larger imports go through `python Manage.py create-users`
+    if len(users) > Config.MAX_BATCH_USERS:
+        return jsonify({"success": False, "message": f"At most {Config.MAX_BATCH_USERS} users per batch"}), 400
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        results = provision_users(cursor, users)
+        conn.commit()
+
+    except Exception as e:
+        return jsonify({"success": False, "message": f"User creation failed: {str(e)}"}), 500
+
+    finally:
+        if conn.is_connected():
+            cursor.close()
+            conn.close()
+
+    created = [result for result in results if result['success']]
+    if any(result['role'] == "Technician" for result in created):
+        technician_index.invalidate()
+
+    lines = [json.dumps(result) for result in results]
+    lines.append(json.dumps({"summary": {"created": len(created), "failed": len(results) - len(created)}}))
+    return Response("\n".join(lines) + "\n", status=201 if created else 400, mimetype="application/x-ndjson")
+
+@api.route('/api/users/<int:user_id>', methods=['PUT'])
 def update_user(user_id):
     data = request.get_json()
 
@@ -157,6 +323,9 @@ def update_user(user_id):
             WHERE UserID = %s
         """
         cursor.execute(query, tuple(values))
+        # Sessions carry the role they were issued with, so a role change ends them
+        if role:
+            revoke_user_sessions(cursor, user_id)
         conn.commit()
 
         return jsonify({"success": True, "message": "User profile updated successfully"}), 200
@@ -169,14 +338,14 @@ def update_user(user_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/users/<int:user_id>', methods=['GET'])
+@api.route('/api/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
         query = """
-            SELECT UserID, Email, Role, FirstName, LastName, PhoneNumber
+            SELECT UserID, Email, Role, FirstName, LastName, PhoneNumber, UpdatedAt
             FROM Users
             WHERE UserID = %s
         """
@@ -186,7 +355,12 @@ def get_user(user_id):
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
-        return jsonify({"success": True, "user": user}), 200
+        updated_at = user.pop('UpdatedAt')
+        etag = make_etag("user", user_id, updated_at)
+        cached_response = not_modified(etag, updated_at)
+        if cached_response is not None:
+            return cached_response
+        return with_validators(jsonify({"success": True, "user": user}), etag, updated_at), 200
 
     except Exception as e:
         return jsonify({"success": False, "message": f"Failed to fetch user: {str(e)}"}), 500
@@ -196,7 +370,7 @@ def get_user(user_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/users/<int:user_id>', methods=['DELETE'])
+@api.route('/api/users/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
     try:
         conn = get_connection()
@@ -207,7 +381,12 @@ def delete_user(user_id):
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "User not found"}), 404
 
+        # A deleted tenant drops out of their property's rent counts
+        cursor.execute("SELECT PropertyID, RentStatus FROM Tenants WHERE UserID = %s FOR UPDATE", (user_id,))
+        adjust_rent_counts(cursor, [(property_id, rent_status, None) for property_id, rent_status in cursor.fetchall()])
+
         # Delete the user (will cascade to related role tables if FK is set)
+        revoke_user_sessions(cursor, user_id)
         cursor.execute("DELETE FROM Users WHERE UserID = %s", (user_id,))
         conn.commit()
 
@@ -221,10 +400,14 @@ def delete_user(user_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/users/<int:user_id>/password-reset', methods=['PUT'])
+@api.route('/api/users/<int:user_id>/password-reset', methods=['PUT'])
 def reset_user_password(user_id):
     
     new_password = generate_password()
+    try:
+        password_hash = run_bounded(hash_password, new_password)
+    except HasherBusy:
+        return jsonify({"success": False, "message": "Server busy, please retry"}), 503, {"Retry-After": "1"}
 
     try:
         conn = get_connection()
@@ -236,7 +419,8 @@ def reset_user_password(user_id):
             return jsonify({"success": False, "message": "User not found"}), 404
 
         # Update password
-        cursor.execute("UPDATE Users SET PasswordHash = %s WHERE UserID = %s", (new_password, user_id))
+        cursor.execute("UPDATE Users SET PasswordHash = %s WHERE UserID = %s", (password_hash, user_id))
+        revoke_user_sessions(cursor, user_id)
         conn.commit()
 
         return jsonify({
@@ -256,7 +440,7 @@ def reset_user_password(user_id):
 
 
 #TECHNICIAN CALLS
-@app.route('/api/technicians/<int:technician_id>', methods=['GET'])
+@api.route('/api/technicians/<int:technician_id>', methods=['GET'])
 def get_technician_profile(technician_id):
     try:
         conn = get_connection()
@@ -271,7 +455,8 @@ def get_technician_profile(technician_id):
                 u.Email,
                 u.PhoneNumber,
                 t.Skillset,
-                t.AvgRating
+                t.AvgRating,
+                GREATEST(t.UpdatedAt, u.UpdatedAt) AS UpdatedAt
             FROM Technicians t
             JOIN Users u ON t.UserID = u.UserID
             WHERE t.TechnicianID = %s
@@ -282,7 +467,12 @@ def get_technician_profile(technician_id):
         if not tech:
             return jsonify({"success": False, "message": "Technician not found"}), 404
 
-        return jsonify({"success": True, "technician": tech}), 200
+        updated_at = tech.pop('UpdatedAt')
+        etag = make_etag("technician", technician_id, updated_at)
+        cached_response = not_modified(etag, updated_at)
+        if cached_response is not None:
+            return cached_response
+        return with_validators(jsonify({"success": True, "technician": tech}), etag, updated_at), 200
 
     except Exception as e:
         return jsonify({"success": False, "message": f"Failed to fetch technician: {str(e)}"}), 500
@@ -292,10 +482,15 @@ def get_technician_profile(technician_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/technicians/<int:technician_id>/jobs', methods=['GET'])
+@api.route('/api/technicians/<int:technician_id>/jobs', methods=['GET'])
 def get_assigned_jobs(technician_id):
     status_filter = request.args.get('status')  # Optional query param
 
+    try:
+        limit, after = parse_page_args(request.args, 2)
+    except InvalidPageRequest as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
@@ -316,26 +511,42 @@ def get_assigned_jobs(technician_id):
             JOIN Properties p ON j.PropertyID = p.PropertyID
             JOIN Tenants t ON j.TenantID = t.TenantID
             JOIN Users u ON t.UserID = u.UserID
-            WHERE j.AssignedTechnicianID = %s
         """
 
+        page = " WHERE j.AssignedTechnicianID = %s"
         values = [technician_id]
 
         if status_filter:
-            base_query += " AND j.Status = %s"
+            page += " AND j.Status = %s"
             values.append(status_filter)
 
-        base_query += " ORDER BY j.RequestedTime DESC"
+        if after:
+            condition, condition_values = keyset_condition(
+                ["j.RequestedTime", "j.JobID"], after, descending=True, nullable=("j.RequestedTime",))
+            page += " AND " + condition
+            values.extend(condition_values)
 
-        cursor.execute(base_query, tuple(values))
-        jobs = cursor.fetchall()
+        page += " ORDER BY j.RequestedTime DESC, j.JobID DESC LIMIT %s"
+        values.append(limit + 1)
 
-        return jsonify({
+        version = page_version(cursor, "SELECT j.JobID AS RowKey, j.UpdatedAt FROM JobRequests j" + page,
+                               values, tables=("Properties", "Users"))
+        etag = make_etag("technician-jobs", technician_id, status_filter, limit, request.args.get('after'), version)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
+        cursor.execute(base_query + page, tuple(values))
+        jobs, next_cursor = split_page(cursor.fetchall(), limit, ("RequestedTime", "JobID"))
+
+        return with_validators(jsonify({
             "success": True,
             "technician_id": technician_id,
             "filter_status": status_filter or "All",
-            "assigned_jobs": jobs
-        }), 200
+            "assigned_jobs": jobs,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }), etag), 200
 
     except Exception as e:
         return jsonify({"success": False, "message": f"Failed to fetch assigned jobs: {str(e)}"}), 500
@@ -345,32 +556,103 @@ def get_assigned_jobs(technician_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/technicians/<int:technician_id>/schedule', methods=['POST'])
+@api.route('/api/technicians/<int:technician_id>/schedule', methods=['POST'])
 def add_technician_availability(technician_id):
     data = request.get_json()
 
     start_time = data.get('start_time')
     end_time = data.get('end_time')
     status = data.get('status', 'Available')  # Optional, defaults to "Available"
+    on_conflict = data.get('on_conflict', 'reject')  # "reject" or "merge" into overlapping slots of the same status
 
     if not start_time or not end_time:
         return jsonify({"success": False, "message": "Start and end time are required"}), 400
 
+    if on_conflict not in ('reject', 'merge'):
+        return jsonify({"success": False, "message": "on_conflict must be 'reject' or 'merge'"}), 400
+
+    try:
+        start_time = parse_datetime(start_time)
+        end_time = parse_datetime(end_time)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    if end_time <= start_time:
+        return jsonify({"success": False, "message": "End time must be after start time"}), 400
+
     try:
         conn = get_connection()
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
 
+        # Lock the slots that overlap or touch the new one: those starting inside it, plus the last one
+        # starting before it. Slots are kept disjoint, so no earlier slot can reach into the new one.
         cursor.execute("""
-            INSERT INTO TechnicianSchedule (TechnicianID, StartTime, EndTime, Status)
-            VALUES (%s, %s, %s, %s)
-        """, (technician_id, start_time, end_time, status))
+            SELECT ScheduleID, StartTime, EndTime, Status
+            FROM TechnicianSchedule
+            WHERE TechnicianID = %s AND StartTime >= %s AND StartTime <= %s
+            ORDER BY StartTime
+            FOR UPDATE
+        """, (technician_id, start_time, end_time))
+        nearby = cursor.fetchall()
+        cursor.execute("""
+            SELECT ScheduleID, StartTime, EndTime, Status
+            FROM TechnicianSchedule
+            WHERE TechnicianID = %s AND StartTime < %s
+            ORDER BY StartTime DESC
+            LIMIT 1
+            FOR UPDATE
+        """, (technician_id, start_time))
+        previous = cursor.fetchone()
+        if previous and previous['EndTime'] >= start_time:
+            nearby.insert(0, previous)
+
+        overlapping = [slot for slot in nearby if slot['StartTime'] < end_time and slot['EndTime'] > start_time]
+        if on_conflict == 'merge':
+            mergeable = [slot for slot in nearby if slot['Status'] == status]
+            conflicts = [slot for slot in overlapping if slot['Status'] != status]
+        else:
+            mergeable = []
+            conflicts = overlapping
+
+        if conflicts:
+            conn.rollback()
+            return jsonify({
+                "success": False,
+                "message": "Slot overlaps existing schedule",
+                "conflicts": conflicts
+            }), 409
+
+        removed_ids = [slot['ScheduleID'] for slot in mergeable]
+        if mergeable:
+            start_time = min([start_time] + [slot['StartTime'] for slot in mergeable])
+            end_time = max([end_time] + [slot['EndTime'] for slot in mergeable])
+            schedule_id = removed_ids[0]
+            cursor.execute("""
+                UPDATE TechnicianSchedule
+                SET StartTime = %s, EndTime = %s
+                WHERE ScheduleID = %s
+            """, (start_time, end_time, schedule_id))
+            if len(removed_ids) > 1:
+                placeholders = ", ".join(["%s"] * (len(removed_ids) - 1))
+                cursor.execute(f"DELETE FROM TechnicianSchedule WHERE ScheduleID IN ({placeholders})", removed_ids[1:])
+        else:
+            cursor.execute("""
+                INSERT INTO TechnicianSchedule (TechnicianID, StartTime, EndTime, Status)
+                VALUES (%s, %s, %s, %s)
+            """, (technician_id, start_time, end_time, status))
+            schedule_id = cursor.lastrowid
 
         conn.commit()
+        availability_engine.apply(technician_id, removed_ids, [(schedule_id, start_time, end_time, status)])
 
         return jsonify({
             "success": True,
-            "message": "Availability slot added",
-            "technician_id": technician_id
+            "message": "Availability slot merged" if mergeable else "Availability slot added",
+            "technician_id": technician_id,
+            "schedule_id": schedule_id,
+            "start_time": start_time,
+            "end_time": end_time,
+            "merged_schedule_ids": removed_ids[1:]
         }), 201
 
     except Exception as e:
@@ -381,18 +663,35 @@ def add_technician_availability(technician_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/technicians/<int:technician_id>/schedule', methods=['GET'])
+@api.route('/api/technicians/<int:technician_id>/schedule', methods=['GET'])
 def get_technician_schedule(technician_id):
+    try:
+        window_start = parse_datetime(request.args.get('from'))
+        window_end = parse_datetime(request.args.get('to'))
+        if window_start and window_end and window_end <= window_start:
+            raise ValueError("'to' must be after 'from'")
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    conditions = ["TechnicianID = %s"]
+    params = [technician_id]
+    if window_end:
+        conditions.append("StartTime < %s")
+        params.append(window_end)
+    if window_start:
+        conditions.append("EndTime > %s")
+        params.append(window_start)
+
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT ScheduleID, StartTime, EndTime, Status
             FROM TechnicianSchedule
-            WHERE TechnicianID = %s
+            WHERE {" AND ".join(conditions)}
             ORDER BY StartTime ASC
-        """, (technician_id,))
+        """, params)
         schedule = cursor.fetchall()
 
         return jsonify({
@@ -409,18 +708,79 @@ def get_technician_schedule(technician_id):
             cursor.close()
             conn.close()
 
+# Technicians whose 'Available' slots cover the whole window, answered from the in-memory availability engine
+@api.route('/api/technicians/available', methods=['GET'])
+def get_available_technicians():
+    try:
+        window_start = parse_datetime(request.args.get('from'))
+        window_end = parse_datetime(request.args.get('to'))
+        if not window_start or not window_end:
+            raise ValueError("'from' and 'to' are required")
+        if window_end <= window_start:
+            raise ValueError("'to' must be after 'from'")
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    try:
+        technician_ids = availability_engine.free_between(window_start, window_end)
+
+        return jsonify({
+            "success": True,
+            "window": {
+                "from": window_start.isoformat(),
+                "to": window_end.isoformat()
+            },
+            "count": len(technician_ids),
+            "technician_ids": technician_ids
+        }), 200
+
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Failed to fetch available technicians: {str(e)}"}), 500
 
 
 #PROPERTY CALLS
-@app.route('/api/properties', methods=['GET'])
-def get_all_properties():
+# Properties change rarely, so reads go through a process-local cache.
+# add_property, update_property and delete_property invalidate exactly the entries they affect.
+property_cache = TTLCache(Config.PROPERTY_CACHE_SIZE, Config.PROPERTY_CACHE_TTL)
+property_list_cache = TTLCache(Config.PROPERTY_LIST_CACHE_SIZE, Config.PROPERTY_CACHE_TTL)
+
+# states are the (manager_id, status) pairs the property had before and/or after the write;
+# every cached list whose filters would match one of them is dropped
+def invalidate_property(property_id, *states):
+    if property_id is not None:
+        property_cache.delete(property_id)
+
+    states = [(str(manager_id) if manager_id is not None else None, (status or '').lower()) for manager_id, status in states]
+
+    def affected(key):
+        key_manager, key_status = key[0], key[1]
+        return any(
+            (key_manager is None or key_manager == manager_id) and
+            (key_status is None or key_status.lower() == status)
+            for manager_id, status in states
+        )
+
+    property_list_cache.delete_where(affected)
+
+# Radius search: the grid cells covering the circle are read through idx_properties_grid,
+# then the exact distance filters the candidates and orders the results
+def search_properties_near(near, radius_km, manager_id, status):
     try:
-        manager_id = request.args.get('manager_id')
-        status = request.args.get('status')
+        lat, lng = parse_point(near)
+        radius_km = float(radius_km) if radius_km else 5.0
+        # float() accepts "nan" and "inf"; nan would slip past every comparison below
+        if not math.isfinite(radius_km) or radius_km <= 0:
+            raise ValueError("radius_km must be a positive number")
+        radius_km = min(radius_km, Config.MAX_SEARCH_RADIUS_KM)
+        limit, _ = parse_page_args(request.args, 1)
+    except ValueError as e:
+        return jsonify({"success": False, "message": f"Invalid radius search: {str(e)}"}), 400
 
+    try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
+        (lat_lo, lat_hi), lng_ranges = covering_cells(lat, lng, radius_km)
         query = """
             SELECT 
                 PropertyID,
@@ -430,9 +790,14 @@ def get_all_properties():
                 ManagerID,
                 Status
             FROM Properties
-            WHERE 1 = 1
+            WHERE GridLat BETWEEN %s AND %s
         """
-        values = []
+        values = [lat_lo, lat_hi]
+
+        if lng_ranges:
+            query += " AND (" + " OR ".join(["GridLng BETWEEN %s AND %s"] * len(lng_ranges)) + ")"
+            for lng_lo, lng_hi in lng_ranges:
+                values.extend([lng_lo, lng_hi])
 
         if manager_id:
             query += " AND ManagerID = %s"
@@ -442,20 +807,130 @@ def get_all_properties():
             query += " AND Status = %s"
             values.append(status)
 
-        query += " ORDER BY PropertyID ASC"
-
         cursor.execute(query, tuple(values))
-        properties = cursor.fetchall()
+
+        matches = []
+        for prop in cursor.fetchall():
+            distance = haversine_km(lat, lng, float(prop['Latitude']), float(prop['Longitude']))
+            if distance <= radius_km:
+                matches.append((distance, prop['PropertyID'], prop))
+
+        properties = []
+        for distance, _, prop in heapq.nsmallest(limit, matches):
+            prop['DistanceKm'] = round(distance, 3)
+            properties.append(prop)
 
         return jsonify({
             "success": True,
+            "near": {
+                "latitude": lat,
+                "longitude": lng,
+                "radius_km": radius_km
+            },
             "filter": {
                 "manager_id": manager_id,
                 "status": status
             },
-            "properties": properties
+            "total_within_radius": len(matches),
+            "properties": properties,
+            "limit": limit,
+            "next_cursor": None
         }), 200
 
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Failed to search properties: {str(e)}"}), 500
+
+    finally:
+        if conn.is_connected():
+            cursor.close()
+            conn.close()
+
+@api.route('/api/properties', methods=['GET'])
+def get_all_properties():
+    manager_id = request.args.get('manager_id') or None
+    status = request.args.get('status') or None
+
+    near = request.args.get('near')
+    if near:
+        return search_properties_near(near, request.args.get('radius_km'), manager_id, status)
+
+    try:
+        limit, after = parse_page_args(request.args, 1)
+    except InvalidPageRequest as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    cache_key = (manager_id, status, limit, request.args.get('after') or None)
+    cached = property_list_cache.get(cache_key)
+    if cached is not None:
+        properties, next_cursor, etag = cached
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+        return with_validators(jsonify({
+            "success": True,
+            "filter": {
+                "manager_id": manager_id,
+                "status": status
+            },
+            "properties": properties,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }), etag), 200
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        query = """
+            SELECT 
+                PropertyID,
+                Address,
+                Latitude,
+                Longitude,
+                ManagerID,
+                Status
+            FROM Properties
+        """
+        page = " WHERE 1 = 1"
+        values = []
+
+        if manager_id:
+            page += " AND ManagerID = %s"
+            values.append(manager_id)
+
+        if status:
+            page += " AND Status = %s"
+            values.append(status)
+
+        if after:
+            condition, condition_values = keyset_condition(["PropertyID"], after)
+            page += " AND " + condition
+            values.extend(condition_values)
+
+        page += " ORDER BY PropertyID ASC LIMIT %s"
+        values.append(limit + 1)
+
+        version = page_version(cursor, "SELECT PropertyID AS RowKey, UpdatedAt FROM Properties" + page, values)
+        etag = make_etag("properties", *cache_key, version)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
+        cursor.execute(query + page, tuple(values))
+        properties, next_cursor = split_page(cursor.fetchall(), limit, ("PropertyID",))
+        property_list_cache.set(cache_key, (properties, next_cursor, etag))
+
+        return with_validators(jsonify({
+            "success": True,
+            "filter": {
+                "manager_id": manager_id,
+                "status": status
+            },
+            "properties": properties,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }), etag), 200
+
     except Exception as e:
         return jsonify({"success": False, "message": f"Failed to fetch properties: {str(e)}"}), 500
 
@@ -464,7 +939,7 @@ def get_all_properties():
             cursor.close()
             conn.close()
 
-@app.route('/api/properties', methods=['POST'])
+@api.route('/api/properties', methods=['POST'])
 def add_property():
     data = request.get_json()
 
@@ -488,6 +963,7 @@ def add_property():
         """, (address, latitude, longitude, manager_id, status))
 
         conn.commit()
+        invalidate_property(None, (manager_id, status))
 
         return jsonify({
             "success": True,
@@ -509,8 +985,16 @@ def add_property():
             cursor.close()
             conn.close()
 
-@app.route('/api/properties/<int:property_id>', methods=['GET'])
+@api.route('/api/properties/<int:property_id>', methods=['GET'])
 def get_property_by_id(property_id):
+    cached = property_cache.get(property_id)
+    if cached is not None:
+        prop, updated_at, etag = cached
+        cached_response = not_modified(etag, updated_at)
+        if cached_response is not None:
+            return cached_response
+        return with_validators(jsonify({"success": True, "property": prop}), etag, updated_at), 200
+
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
@@ -522,7 +1006,8 @@ def get_property_by_id(property_id):
                 Latitude,
                 Longitude,
                 ManagerID,
-                Status
+                Status,
+                UpdatedAt
             FROM Properties
             WHERE PropertyID = %s
         """, (property_id,))
@@ -531,7 +1016,13 @@ def get_property_by_id(property_id):
         if not prop:
             return jsonify({"success": False, "message": "Property not found"}), 404
 
-        return jsonify({"success": True, "property": prop}), 200
+        updated_at = prop.pop('UpdatedAt')
+        etag = make_etag("property", property_id, updated_at)
+        property_cache.set(property_id, (prop, updated_at, etag))
+        cached_response = not_modified(etag, updated_at)
+        if cached_response is not None:
+            return cached_response
+        return with_validators(jsonify({"success": True, "property": prop}), etag, updated_at), 200
 
     except Exception as e:
         return jsonify({"success": False, "message": f"Failed to fetch property: {str(e)}"}), 500
@@ -541,7 +1032,7 @@ def get_property_by_id(property_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/properties/<int:property_id>', methods=['PUT'])
+@api.route('/api/properties/<int:property_id>', methods=['PUT'])
 def update_property(property_id):
     data = request.get_json()
 
@@ -558,6 +1049,10 @@ def update_property(property_id):
         conn = get_connection()
         cursor = conn.cursor()
 
+        # Old manager/status tell us which cached property lists this update touches
+        cursor.execute("SELECT ManagerID, Status FROM Properties WHERE PropertyID = %s", (property_id,))
+        old_state = cursor.fetchone()
+
         update_fields = []
         values = []
         changed_log = []
@@ -601,6 +1096,13 @@ def update_property(property_id):
 
         conn.commit()
 
+        if old_state:
+            old_manager_id, old_status = old_state
+            invalidate_property(property_id, (old_manager_id, old_status),
+                                (manager_id or old_manager_id, status or old_status))
+        else:
+            invalidate_property(property_id)
+
         return jsonify({"success": True, "message": "Property updated and changes logged"}), 200
 
     except Exception as e:
@@ -611,20 +1113,22 @@ def update_property(property_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/properties/<int:property_id>', methods=['DELETE'])
+@api.route('/api/properties/<int:property_id>', methods=['DELETE'])
 def delete_property(property_id):
     try:
         conn = get_connection()
         cursor = conn.cursor()
 
         # Optional: Check if property exists
-        cursor.execute("SELECT * FROM Properties WHERE PropertyID = %s", (property_id,))
-        if not cursor.fetchone():
+        cursor.execute("SELECT ManagerID, Status FROM Properties WHERE PropertyID = %s", (property_id,))
+        old_state = cursor.fetchone()
+        if not old_state:
             return jsonify({"success": False, "message": "Property not found"}), 404
 
         # Delete property
         cursor.execute("DELETE FROM Properties WHERE PropertyID = %s", (property_id,))
         conn.commit()
+        invalidate_property(property_id, old_state)
 
         return jsonify({
             "success": True,
@@ -640,13 +1144,39 @@ def delete_property(property_id):
             conn.close()
 
 #TENANT CALLS
-@app.route('/api/tenants', methods=['GET'])
+# Loads the job history of many tenants with one query per chunk of IDs instead of one per tenant
+def load_job_histories(cursor, tenant_ids, chunk_size=1000):
+    histories = {tenant_id: [] for tenant_id in tenant_ids}
+    ids = list(histories)
+
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"""
+            SELECT TenantID, JobID, JobType, Description, Status, RequestedTime
+            FROM JobRequests
+            WHERE TenantID IN ({placeholders})
+            ORDER BY TenantID, RequestedTime DESC
+        """, tuple(chunk))
+        for job in cursor.fetchall():
+            histories[job.pop('TenantID')].append(job)
+
+    return histories
+
+@api.route('/api/tenants', methods=['GET'])
 def get_all_tenants():
+    try:
+        limit, after = parse_page_args(request.args, 1)
+    except InvalidPageRequest as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     try:
         # Get query filters
         property_id = request.args.get('property_id')
         rent_status = request.args.get('rent_status')
         move_out_requested = request.args.get('move_out_requested')
+        include = [part.strip() for part in request.args.get('include', '').split(',') if part.strip()]
+        include_job_history = 'job_history' in include
 
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
@@ -667,44 +1197,58 @@ def get_all_tenants():
             FROM Tenants t
             JOIN Users u ON t.UserID = u.UserID
             LEFT JOIN Properties p ON t.PropertyID = p.PropertyID
-            WHERE 1 = 1
         """
+        page = " WHERE 1 = 1"
         filters = []
 
         if property_id:
-            query += " AND t.PropertyID = %s"
+            page += " AND t.PropertyID = %s"
             filters.append(property_id)
         if rent_status:
-            query += " AND t.RentStatus = %s"
+            page += " AND t.RentStatus = %s"
             filters.append(rent_status)
         if move_out_requested:
-            query += " AND t.MoveOutRequested = %s"
+            page += " AND t.MoveOutRequested = %s"
             filters.append(move_out_requested.lower() == "true")
 
-        query += " ORDER BY t.TenantID ASC"
-
-        cursor.execute(query, tuple(filters))
-        tenants = cursor.fetchall()
-
-        # Add job history for each tenant
-        for tenant in tenants:
-            cursor.execute("""
-                SELECT JobID, JobType, Description, Status, RequestedTime
-                FROM JobRequests
-                WHERE TenantID = %s
-                ORDER BY RequestedTime DESC
-            """, (tenant['TenantID'],))
-            tenant['JobHistory'] = cursor.fetchall()
-
-        return jsonify({
+        if after:
+            condition, condition_values = keyset_condition(["t.TenantID"], after)
+            page += " AND " + condition
+            filters.extend(condition_values)
+
+        page += " ORDER BY t.TenantID ASC LIMIT %s"
+        filters.append(limit + 1)
+
+        version = page_version(
+            cursor, "SELECT t.TenantID AS RowKey, t.UpdatedAt FROM Tenants t" + page, filters,
+            tables=("Users", "Properties") + (("JobRequests",) if include_job_history else ()))
+        etag = make_etag("tenants", property_id, rent_status, move_out_requested, include,
+                         limit, request.args.get('after'), version)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
+        cursor.execute(query + page, tuple(filters))
+        tenants, next_cursor = split_page(cursor.fetchall(), limit, ("TenantID",))
+
+        # Job history is opt-in (?include=job_history) and loaded for all tenants in one go
+        if include_job_history:
+            histories = load_job_histories(cursor, [tenant['TenantID'] for tenant in tenants])
+            for tenant in tenants:
+                tenant['JobHistory'] = histories[tenant['TenantID']]
+
+        return with_validators(jsonify({
             "success": True,
             "filters_applied": {
                 "property_id": property_id,
                 "rent_status": rent_status,
                 "move_out_requested": move_out_requested
             },
-            "tenants": tenants
-        }), 200
+            "include": include,
+            "tenants": tenants,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }), etag), 200
 
     except Exception as e:
         return jsonify({
@@ -748,7 +1292,7 @@ def get_all_tenants():
             cursor.close()
             conn.close()
 
-@app.route('/api/tenants/<int:tenant_id>/moveout', methods=['PUT'])
+@api.route('/api/tenants/<int:tenant_id>/moveout', methods=['PUT'])
 def submit_moveout_request(tenant_id):
     data = request.get_json()
     reason = data.get('reason')
@@ -791,7 +1335,7 @@ def submit_moveout_request(tenant_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/tenants/<int:tenant_id>/rent', methods=['PUT'])
+@api.route('/api/tenants/<int:tenant_id>/rent', methods=['PUT'])
 def update_rent_status(tenant_id):
     data = request.get_json()
     rent_status = data.get('rent_status')
@@ -803,8 +1347,8 @@ def update_rent_status(tenant_id):
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
-        # Check tenant and fetch old status
-        cursor.execute("SELECT RentStatus FROM Tenants WHERE TenantID = %s", (tenant_id,))
+        # Check tenant and fetch old status; locked so concurrent updates count each change once
+        cursor.execute("SELECT RentStatus, PropertyID FROM Tenants WHERE TenantID = %s FOR UPDATE", (tenant_id,))
         tenant = cursor.fetchone()
 
         if not tenant:
@@ -826,6 +1370,9 @@ def update_rent_status(tenant_id):
             VALUES (%s, %s, %s, %s)
         """, (tenant_id, old_status, rent_status, now))
 
+        # Keep the per-property dashboard counters in step, in the same transaction
+        adjust_rent_counts(cursor, [(tenant['PropertyID'], old_status, rent_status)])
+
         conn.commit()
 
         return jsonify({
@@ -890,8 +1437,114 @@ def update_rent_status(tenant_id):
             conn.close()
 
 
+# Paid/unpaid tenant counts per property (one page, by PropertyID) and per manager, read from the
+# PropertyRentSummary counters instead of scanning Tenants
+@api.route('/api/dashboard/rent', methods=['GET'])
+def get_rent_dashboard():
+    try:
+        limit, after = parse_page_args(request.args, 1)
+    except InvalidPageRequest as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    manager_id = request.args.get('manager_id')
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        query = """
+            SELECT
+                p.PropertyID,
+                p.Address,
+                p.ManagerID,
+                COALESCE(s.PaidCount, 0) AS PaidCount,
+                COALESCE(s.UnpaidCount, 0) AS UnpaidCount
+            FROM Properties p
+            LEFT JOIN PropertyRentSummary s ON s.PropertyID = p.PropertyID
+        """
+        page = " WHERE 1 = 1"
+        filters = []
+        if manager_id:
+            page += " AND p.ManagerID = %s"
+            filters.append(manager_id)
+        if after:
+            condition, condition_values = keyset_condition(["p.PropertyID"], after)
+            page += " AND " + condition
+            filters.extend(condition_values)
+        page += " ORDER BY p.PropertyID ASC LIMIT %s"
+        filters.append(limit + 1)
+
+        # The per-manager totals span every property, so any property or counter change is a new version
+        version = page_version(cursor, "SELECT p.PropertyID AS RowKey, p.UpdatedAt FROM Properties p" + page,
+                               filters, tables=("Properties", "PropertyRentSummary"), counts=("Properties",))
+        etag = make_etag("rent-dashboard", manager_id, limit, request.args.get('after'), version)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
+        cursor.execute(query + page, tuple(filters))
+        properties, next_cursor = split_page(cursor.fetchall(), limit, ("PropertyID",))
+
+        query = """
+            SELECT
+                p.ManagerID,
+                COUNT(*) AS PropertyCount,
+                COALESCE(SUM(s.PaidCount), 0) AS PaidCount,
+                COALESCE(SUM(s.UnpaidCount), 0) AS UnpaidCount
+            FROM Properties p
+            LEFT JOIN PropertyRentSummary s ON s.PropertyID = p.PropertyID
+        """
+        if manager_id:
+            query += " WHERE p.ManagerID = %s"
+        query += " GROUP BY p.ManagerID ORDER BY p.ManagerID"
+        cursor.execute(query, (manager_id,) if manager_id else ())
+        managers = cursor.fetchall()
+        for manager in managers:
+            manager['PaidCount'] = int(manager['PaidCount'])
+            manager['UnpaidCount'] = int(manager['UnpaidCount'])
+
+        totals = {
+            "paid": sum(manager['PaidCount'] for manager in managers),
+            "unpaid": sum(manager['UnpaidCount'] for manager in managers)
+        }
+
+        return with_validators(jsonify({
+            "success": True,
+            "totals": totals,
+            "managers": managers,
+            "properties": properties,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }), etag), 200
+
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Failed to load rent dashboard: {str(e)}"}), 500
+
+    finally:
+        if conn.is_connected():
+            cursor.close()
+            conn.close()
+
+
+# After a failed upload transaction: removes a blob the request added to the attachment store, unless
+# a committed row has meanwhile come to use the same content. Best effort; a leftover blob is harmless.
+def discard_new_attachment(conn, storage_key):
+    try:
+        conn.rollback()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1 FROM JobRequestFiles WHERE StorageKey = %s LIMIT 1", (storage_key,))
+            referenced = cursor.fetchone() is not None
+        finally:
+            cursor.close()
+        if not referenced:
+            get_attachment_store().delete(storage_key)
+    except Exception:
+        logging.getLogger("dpm.attachments").warning("Could not remove attachment %s after a failed upload", storage_key, exc_info=True)
+
+
 #JOBREQUEST CALLS
-@app.route('/api/jobrequests', methods=['POST'])
+@api.route('/api/jobrequests', methods=['POST'])
 def submit_job_request():
     tenant_id = request.form.get('tenant_id')
     property_id = request.form.get('property_id')
@@ -902,7 +1555,12 @@ def submit_job_request():
 
     if not all([tenant_id, property_id, job_type, description, urgency]):
         return jsonify({"success": False, "message": "All fields are required"}), 400
+    try:
+        tenant_id, property_id = int(tenant_id), int(property_id)
+    except ValueError:
+        return jsonify({"success": False, "message": "tenant_id and property_id must be integers"}), 400
 
+    new_storage_key = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
@@ -919,16 +1577,27 @@ def submit_job_request():
         """, (tenant_id, property_id, job_type, description, urgency))
         job_id = cursor.lastrowid
 
-        # Handle file upload
+        # Handle file upload: contents are streamed into the attachment store, the table keeps metadata
         if file:
             filename = secure_filename(file.filename)
-            file_data = file.read()
             file_type = file.content_type
+            storage_key, file_size, created = get_attachment_store().save_new(file.stream)
+            if created:
+                new_storage_key = storage_key
 
             cursor.execute("""
-                INSERT INTO JobRequestFiles (JobID, FileName, FileType, FileData)
-                VALUES (%s, %s, %s, %s)
-            """, (job_id, filename, file_type, file_data))
+                INSERT INTO JobRequestFiles (JobID, FileName, FileType, StorageKey, FileSize)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (job_id, filename, file_type, storage_key, file_size))
+
+        enqueue_event(cursor, "job_request.submitted", {
+            "job_id": job_id,
+            "tenant_id": tenant_id,
+            "property_id": property_id,
+            "job_type": job_type,
+            "urgency": urgency,
+            "status": "Pending"
+        })
 
         conn.commit()
 
@@ -939,6 +1608,8 @@ def submit_job_request():
         }), 201
 
     except Exception as e:
+        if new_storage_key is not None:
+            discard_new_attachment(conn, new_storage_key)
         return jsonify({"success": False, "message": f"Failed to submit request: {str(e)}"}), 500
 
     finally:
@@ -946,14 +1617,110 @@ def submit_job_request():
             cursor.close()
             conn.close()
 
-@app.route('/api/files/<int:file_id>/download', methods=['GET'])
+# Creates many job requests in one transaction: one query validates every tenant/property pair,
+# the inserts go out as multi-row INSERTs, and each item gets its own result
+@api.route('/api/jobrequests/batch', methods=['POST'])
+def submit_job_requests_batch():
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    atomic = bool(data.get('atomic', False))  # reject the whole batch if any item is invalid
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"success": False, "message": "'requests' must be a non-empty list"}), 400
+    if len(items) > Config.MAX_BATCH_ITEMS:
+        return jsonify({"success": False, "message": f"At most {Config.MAX_BATCH_ITEMS} requests per batch"}), 400
+
+    required = ('tenant_id', 'property_id', 'job_type', 'description', 'urgency')
+    results = [None] * len(items)
+    valid = []  # (index, row)
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not all(item.get(name) not in (None, '') for name in required):
+            results[index] = {"index": index, "success": False, "message": "All fields are required"}
+            continue
+        try:
+            row = (int(item['tenant_id']), int(item['property_id']), item['job_type'], item['description'], int(item['urgency']))
+        except (TypeError, ValueError):
+            results[index] = {"index": index, "success": False, "message": "tenant_id, property_id and urgency must be integers"}
+            continue
+        valid.append((index, row))
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        tenant_ids = sorted({row[0] for _, row in valid})
+        linked = set()
+        for i in range(0, len(tenant_ids), Config.BATCH_INSERT_CHUNK):
+            chunk = tenant_ids[i:i + Config.BATCH_INSERT_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"SELECT TenantID, PropertyID FROM Tenants WHERE TenantID IN ({placeholders})", chunk)
+            linked.update(cursor.fetchall())
+
+        rows = []
+        for index, row in valid:
+            if (row[0], row[1]) in linked:
+                rows.append((index, row))
+            else:
+                results[index] = {"index": index, "success": False, "message": "Tenant not linked to this property"}
+
+        failed = len(items) - len(rows)
+        if atomic and failed:
+            return jsonify({
+                "success": False,
+                "message": f"{failed} of {len(items)} requests are invalid; nothing was created",
+                "results": [result for result in results if result is not None]
+            }), 400
+
+        for i in range(0, len(rows), Config.BATCH_INSERT_CHUNK):
+            chunk = rows[i:i + Config.BATCH_INSERT_CHUNK]
+            # AUTO_INCREMENT values of a multi-row INSERT need not be consecutive, so every row is tagged
+            # with this chunk's key and its position, and the JobIDs are read back by that tag
+            batch_key = uuid.uuid4().hex
+            cursor.executemany("""
+                INSERT INTO JobRequests (TenantID, PropertyID, JobType, Description, RequestedTime, Urgency, Status, BatchKey, BatchSeq)
+                VALUES (%s, %s, %s, %s, NOW(), %s, 'Pending', %s, %s)
+            """, [row + (batch_key, seq) for seq, (_, row) in enumerate(chunk)])
+            cursor.execute("SELECT BatchSeq, JobID FROM JobRequests WHERE BatchKey = %s", (batch_key,))
+            job_ids = dict(cursor.fetchall())
+
+            for seq, (index, _) in enumerate(chunk):
+                results[index] = {"index": index, "success": True, "job_id": job_ids[seq]}
+
+            enqueue_events(cursor, [("job_request.submitted", {
+                "job_id": job_ids[seq],
+                "tenant_id": row[0],
+                "property_id": row[1],
+                "job_type": row[2],
+                "urgency": row[4],
+                "status": "Pending"
+            }) for seq, (_, row) in enumerate(chunk)])
+
+        conn.commit()
+
+        return jsonify({
+            "success": failed == 0,
+            "message": f"Created {len(rows)} of {len(items)} job requests",
+            "created": len(rows),
+            "failed": failed,
+            "results": results
+        }), 201 if rows else 400
+
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Failed to submit requests: {str(e)}"}), 500
+
+    finally:
+        if conn.is_connected():
+            cursor.close()
+            conn.close()
+
+@api.route('/api/files/<int:file_id>/download', methods=['GET'])
 def download_job_file(file_id):
     try:
         conn = get_connection()
         cursor = conn.cursor()
 
         cursor.execute("""
-            SELECT FileName, FileType, FileData
+            SELECT FileName, FileType, StorageKey, FileSize, UploadedAt
             FROM JobRequestFiles
             WHERE FileID = %s
         """, (file_id,))
@@ -962,7 +1729,31 @@ def download_job_file(file_id):
         if not result:
             return jsonify({"success": False, "message": "File not found"}), 404
 
-        filename, filetype, filedata = result
+        filename, filetype, storage_key, file_size, uploaded_at = result
+
+        if storage_key:
+            # Streamed from the store in chunks; the content hash doubles as a strong ETag
+            stream = get_attachment_store().open(storage_key)
+            try:
+                response = send_file(
+                    stream,
+                    mimetype=filetype,
+                    as_attachment=True,
+                    download_name=filename,
+                    conditional=False,
+                    etag=storage_key,
+                    last_modified=uploaded_at
+                )
+                response.content_length = file_size
+                return response.make_conditional(request, accept_ranges=True, complete_length=file_size)
+            except BaseException:
+                # e.g. 416 for an unsatisfiable Range: the response never reaches the server to close it
+                stream.close()
+                raise
+
+        # Not yet migrated out of MySQL (python Manage.py migrate-attachments)
+        cursor.execute("SELECT FileData FROM JobRequestFiles WHERE FileID = %s", (file_id,))
+        filedata = cursor.fetchone()[0]
 
         return Response(
             filedata,
@@ -972,6 +1763,8 @@ def download_job_file(file_id):
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({"success": False, "message": f"Failed to download file: {str(e)}"}), 500
 
@@ -980,38 +1773,69 @@ def download_job_file(file_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/jobrequests', methods=['GET'])
+JOB_REQUEST_LIST_QUERY = """
+    SELECT 
+        j.JobID,
+        j.TenantID,
+        j.PropertyID,
+        j.JobType,
+        j.Description,
+        j.Urgency,
+        j.Status,
+        j.RequestedTime,
+        u.FirstName AS TenantFirstName,
+        u.LastName AS TenantLastName,
+        p.Address AS PropertyAddress
+    FROM JobRequests j
+    JOIN Tenants t ON j.TenantID = t.TenantID
+    JOIN Users u ON t.UserID = u.UserID
+    JOIN Properties p ON j.PropertyID = p.PropertyID
+    WHERE 1 = 1
+"""
+JOB_REQUEST_KEYS_QUERY = "SELECT j.JobID AS RowKey, j.UpdatedAt FROM JobRequests j WHERE 1 = 1"
+
+@api.route('/api/jobrequests', methods=['GET'])
 def view_all_job_requests():
+    # Full export for reconciliation, streamed as NDJSON instead of one page at a time
+    if request.args.get('format') == 'ndjson':
+        return ndjson_response(JOB_REQUEST_LIST_QUERY + " ORDER BY j.RequestedTime DESC, j.JobID DESC")
+
+    try:
+        limit, after = parse_page_args(request.args, 2)
+    except InvalidPageRequest as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
-        cursor.execute("""
-            SELECT 
-                j.JobID,
-                j.TenantID,
-                j.PropertyID,
-                j.JobType,
-                j.Description,
-                j.Urgency,
-                j.Status,
-                j.RequestedTime,
-                u.FirstName AS TenantFirstName,
-                u.LastName AS TenantLastName,
-                p.Address AS PropertyAddress
-            FROM JobRequests j
-            JOIN Tenants t ON j.TenantID = t.TenantID
-            JOIN Users u ON t.UserID = u.UserID
-            JOIN Properties p ON j.PropertyID = p.PropertyID
-            ORDER BY j.RequestedTime DESC
-        """)
+        page = ""
+        values = []
 
-        jobs = cursor.fetchall()
+        if after:
+            condition, condition_values = keyset_condition(
+                ["j.RequestedTime", "j.JobID"], after, descending=True, nullable=("j.RequestedTime",))
+            page += " AND " + condition
+            values.extend(condition_values)
 
-        return jsonify({
+        page += " ORDER BY j.RequestedTime DESC, j.JobID DESC LIMIT %s"
+        values.append(limit + 1)
+
+        version = page_version(cursor, JOB_REQUEST_KEYS_QUERY + page, values, tables=("Properties", "Users"))
+        etag = make_etag("job-requests", limit, request.args.get('after'), version)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
+        cursor.execute(JOB_REQUEST_LIST_QUERY + page, tuple(values))
+        jobs, next_cursor = split_page(cursor.fetchall(), limit, ("RequestedTime", "JobID"))
+
+        return with_validators(jsonify({
             "success": True,
-            "job_requests": jobs
-        }), 200
+            "job_requests": jobs,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }), etag), 200
 
     except Exception as e:
         return jsonify({
@@ -1024,12 +1848,35 @@ def view_all_job_requests():
             cursor.close()
             conn.close()
 
-@app.route('/api/jobrequests/<int:job_id>', methods=['GET'])
+@api.route('/api/jobrequests/<int:job_id>', methods=['GET'])
 def get_job_request_details(job_id):
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
+        # Primary-key lookups only: if the client's copy is current, the joins below never run
+        cursor.execute("""
+            SELECT
+                GREATEST(j.UpdatedAt, t.UpdatedAt, u.UpdatedAt, p.UpdatedAt) AS UpdatedAt,
+                (SELECT COUNT(*) FROM JobRequestFiles f WHERE f.JobID = j.JobID) AS FileCount,
+                (SELECT MAX(f.FileID) FROM JobRequestFiles f WHERE f.JobID = j.JobID) AS LastFileID
+            FROM JobRequests j
+            JOIN Tenants t ON j.TenantID = t.TenantID
+            JOIN Users u ON t.UserID = u.UserID
+            JOIN Properties p ON j.PropertyID = p.PropertyID
+            WHERE j.JobID = %s
+        """, (job_id,))
+        version = cursor.fetchone()
+
+        if not version:
+            return jsonify({"success": False, "message": "Job request not found"}), 404
+
+        updated_at = version['UpdatedAt']
+        etag = make_etag("job", job_id, updated_at, version['FileCount'], version['LastFileID'])
+        cached_response = not_modified(etag, updated_at)
+        if cached_response is not None:
+            return cached_response
+
         # Get main job info with tenant and property
         cursor.execute("""
             SELECT 
@@ -1065,10 +1912,10 @@ def get_job_request_details(job_id):
         """, (job_id,))
         job["Files"] = cursor.fetchall()
 
-        return jsonify({
+        return with_validators(jsonify({
             "success": True,
             "job": job
-        }), 200
+        }), etag, updated_at), 200
 
     except Exception as e:
         return jsonify({"success": False, "message": f"Failed to fetch job details: {str(e)}"}), 500
@@ -1078,7 +1925,7 @@ def get_job_request_details(job_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/jobrequests/<int:job_id>/assign', methods=['POST'])
+@api.route('/api/jobrequests/<int:job_id>/assign', methods=['POST'])
 def assign_technician(job_id):
     data = request.get_json()
     technician_id = data.get('technician_id')
@@ -1091,8 +1938,14 @@ def assign_technician(job_id):
         cursor = conn.cursor()
 
         # Check if job exists
-        cursor.execute("SELECT * FROM JobRequests WHERE JobID = %s", (job_id,))
-        if not cursor.fetchone():
+        cursor.execute("""
+            SELECT j.PropertyID, p.Latitude, p.Longitude
+            FROM JobRequests j
+            LEFT JOIN Properties p ON j.PropertyID = p.PropertyID
+            WHERE j.JobID = %s
+        """, (job_id,))
+        job = cursor.fetchone()
+        if not job:
             return jsonify({"success": False, "message": "Job request not found."}), 404
 
         # Check if technician exists
@@ -1105,6 +1958,7 @@ def assign_technician(job_id):
             INSERT INTO Assignments (TechnicianID, JobID, AssignedTime, Status)
             VALUES (%s, %s, %s, 'Assigned')
         """, (technician_id, job_id, datetime.now()))
+        assignment_id = cursor.lastrowid
 
         # Optionally update JobRequest status
         cursor.execute("""
@@ -1113,7 +1967,17 @@ def assign_technician(job_id):
             WHERE JobID = %s
         """, (job_id,))
 
+        enqueue_event(cursor, "assignment.created", {
+            "assignment_id": assignment_id,
+            "job_id": job_id,
+            "technician_id": int(technician_id),
+            "property_id": job[0],
+            "status": "Assigned"
+        })
+
         conn.commit()
+        location = (float(job[1]), float(job[2])) if job[1] is not None and job[2] is not None else None
+        technician_index.record_assignment(int(technician_id), 1, location)
 
         return jsonify({
             "success": True,
@@ -1128,7 +1992,68 @@ def assign_technician(job_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/assignments/<int:assignment_id>', methods=['PATCH'])
+# Ranks every technician for a job in one pass over the in-memory dispatch index
+@api.route('/api/jobrequests/<int:job_id>/candidates', methods=['GET'])
+def get_dispatch_candidates(job_id):
+    try:
+        window_start = parse_datetime(request.args.get('from')) or datetime.now()
+        window_end = parse_datetime(request.args.get('to')) or window_start + timedelta(hours=Config.DISPATCH_WINDOW_HOURS)
+        if window_end <= window_start:
+            raise ValueError("'to' must be after 'from'")
+        limit = int(request.args.get('limit', 10))
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        limit = min(limit, Config.MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    require_skill = request.args.get('require_skill', 'false').lower() == 'true'
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        cursor.execute("""
+            SELECT j.JobID, j.JobType, j.Status, j.PropertyID, p.Latitude, p.Longitude
+            FROM JobRequests j
+            JOIN Properties p ON j.PropertyID = p.PropertyID
+            WHERE j.JobID = %s
+        """, (job_id,))
+        job = cursor.fetchone()
+
+        if not job:
+            return jsonify({"success": False, "message": "Job request not found"}), 404
+
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Failed to fetch job request: {str(e)}"}), 500
+
+    finally:
+        if conn.is_connected():
+            cursor.close()
+            conn.close()
+
+    try:
+        location = None
+        if job['Latitude'] is not None and job['Longitude'] is not None:
+            location = (float(job['Latitude']), float(job['Longitude']))
+
+        candidates = technician_index.rank(job['JobType'], location, window_start, window_end, limit, require_skill)
+
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "job_type": job['JobType'],
+            "window": {
+                "from": window_start.isoformat(),
+                "to": window_end.isoformat()
+            },
+            "candidates": candidates
+        }), 200
+
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Failed to rank technicians: {str(e)}"}), 500
+
+@api.route('/api/assignments/<int:assignment_id>', methods=['PATCH'])
 def update_assignment(assignment_id):
     data = request.get_json()
     action = data.get('action')  # "start" or "complete"
@@ -1140,6 +2065,12 @@ def update_assignment(assignment_id):
         conn = get_connection()
         cursor = conn.cursor()
 
+        # The status before the change decides whether the technician's open load moves
+        cursor.execute("SELECT Status FROM Assignments WHERE AssignmentID = %s FOR UPDATE", (assignment_id,))
+        previous = cursor.fetchone()
+        if not previous:
+            return jsonify({"success": False, "message": "Assignment not found"}), 404
+
         if action == 'start':
             cursor.execute("""
                 UPDATE Assignments
@@ -1158,7 +2089,25 @@ def update_assignment(assignment_id):
         if cursor.rowcount == 0:
             return jsonify({"success": False, "message": "Assignment not found"}), 404
 
+        cursor.execute("""
+            SELECT a.TechnicianID, a.JobID, a.Status, j.PropertyID
+            FROM Assignments a
+            JOIN JobRequests j ON a.JobID = j.JobID
+            WHERE a.AssignmentID = %s
+        """, (assignment_id,))
+        technician_id, job_id, status, property_id = cursor.fetchone()
+        enqueue_event(cursor, "assignment.updated", {
+            "assignment_id": assignment_id,
+            "job_id": job_id,
+            "technician_id": technician_id,
+            "property_id": property_id,
+            "status": status
+        })
+
         conn.commit()
+        open_delta = (status in OPEN_STATUSES) - (previous[0] in OPEN_STATUSES)
+        if open_delta:
+            technician_index.record_assignment(technician_id, open_delta)
         return jsonify({
             "success": True,
             "message": f"Assignment {assignment_id} marked {action}"
@@ -1172,12 +2121,17 @@ def update_assignment(assignment_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/assignments', methods=['GET'])
+@api.route('/api/assignments', methods=['GET'])
 def list_assignments():
     tech_id = request.args.get('technician_id')
     job_id = request.args.get('job_id')
     include_completed = request.args.get('include_completed', 'false').lower() == 'true'
 
+    try:
+        limit, after = parse_page_args(request.args, 2)
+    except InvalidPageRequest as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
@@ -1192,33 +2146,48 @@ def list_assignments():
                 EndTime,
                 Status
             FROM Assignments
-            WHERE 1=1
         """
+        page = " WHERE 1=1"
         params = []
 
         if tech_id:
-            query += " AND TechnicianID = %s"
+            page += " AND TechnicianID = %s"
             params.append(tech_id)
         if job_id:
-            query += " AND JobID = %s"
+            page += " AND JobID = %s"
             params.append(job_id)
         if not include_completed:
-            query += " AND Status != 'Completed'"
+            page += " AND Status != 'Completed'"
 
-        query += " ORDER BY AssignedTime DESC"
+        if after:
+            condition, condition_params = keyset_condition(
+                ["AssignedTime", "AssignmentID"], after, descending=True, nullable=("AssignedTime",))
+            page += " AND " + condition
+            params.extend(condition_params)
 
-        cursor.execute(query, tuple(params))
-        rows = cursor.fetchall()
+        page += " ORDER BY AssignedTime DESC, AssignmentID DESC LIMIT %s"
+        params.append(limit + 1)
 
-        return jsonify({
+        version = page_version(cursor, "SELECT AssignmentID AS RowKey, UpdatedAt FROM Assignments" + page, params)
+        etag = make_etag("assignments", tech_id, job_id, include_completed, limit, request.args.get('after'), version)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
+        cursor.execute(query + page, tuple(params))
+        rows, next_cursor = split_page(cursor.fetchall(), limit, ("AssignedTime", "AssignmentID"))
+
+        return with_validators(jsonify({
             "success": True,
             "filters": {
                 "technician_id": tech_id,
                 "job_id": job_id,
                 "include_completed": include_completed
             },
-            "assignments": rows
-        }), 200
+            "assignments": rows,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }), etag), 200
 
     except Exception as e:
         return jsonify({"success": False, "message": f"Failed to list assignments: {str(e)}"}), 500
@@ -1228,7 +2197,7 @@ def list_assignments():
             cursor.close()
             conn.close()
 
-@app.route('/api/jobrequests/<int:job_id>/assign', methods=['PUT'])
+@api.route('/api/jobrequests/<int:job_id>/assign', methods=['PUT'])
 def reassign_job(job_id):
     data = request.get_json()
     new_tech = data.get('technician_id')
@@ -1240,15 +2209,29 @@ def reassign_job(job_id):
         cursor = conn.cursor()
 
         # 1) Verify job & tech exist
-        cursor.execute("SELECT * FROM JobRequests WHERE JobID = %s", (job_id,))
-        if not cursor.fetchone():
+        cursor.execute("""
+            SELECT j.PropertyID, j.AssignedTechnicianID, p.Latitude, p.Longitude
+            FROM JobRequests j
+            LEFT JOIN Properties p ON j.PropertyID = p.PropertyID
+            WHERE j.JobID = %s
+        """, (job_id,))
+        job = cursor.fetchone()
+        if not job:
             return jsonify({"success": False, "message": "Job not found"}), 404
 
         cursor.execute("SELECT * FROM Technicians WHERE TechnicianID = %s", (new_tech,))
         if not cursor.fetchone():
             return jsonify({"success": False, "message": "Technician not found"}), 404
 
-        # 2) Cancel any active assignment(s)
+        # 2) Cancel any active assignment(s), noting whose open load drops
+        placeholders = ", ".join(["%s"] * len(OPEN_STATUSES))
+        cursor.execute(f"""
+            SELECT TechnicianID
+            FROM Assignments
+            WHERE JobID = %s AND Status IN ({placeholders})
+            FOR UPDATE
+        """, (job_id,) + OPEN_STATUSES)
+        released = [row[0] for row in cursor.fetchall()]
         cursor.execute("""
             UPDATE Assignments
             SET Status = 'Cancelled',
@@ -1262,6 +2245,7 @@ def reassign_job(job_id):
             INSERT INTO Assignments (TechnicianID, JobID, AssignedTime, Status)
             VALUES (%s, %s, %s, 'Assigned')
         """, (new_tech, job_id, datetime.now()))
+        assignment_id = cursor.lastrowid
 
         # 4) Update the JobRequests pointer & status
         cursor.execute("""
@@ -1271,7 +2255,20 @@ def reassign_job(job_id):
             WHERE JobID = %s
         """, (new_tech, job_id))
 
+        enqueue_event(cursor, "assignment.reassigned", {
+            "assignment_id": assignment_id,
+            "job_id": job_id,
+            "technician_id": int(new_tech),
+            "previous_technician_id": job[1],
+            "property_id": job[0],
+            "status": "Assigned"
+        })
+
         conn.commit()
+        for previous_technician_id in released:
+            technician_index.record_assignment(previous_technician_id, -1)
+        location = (float(job[2]), float(job[3])) if job[2] is not None and job[3] is not None else None
+        technician_index.record_assignment(int(new_tech), 1, location)
         return jsonify({
             "success": True,
             "message": f"Job {job_id} reassigned to technician {new_tech}"
@@ -1288,7 +2285,7 @@ def reassign_job(job_id):
 
 
 #Ratings calls
-@app.route('/api/ratings', methods=['POST'])
+@api.route('/api/ratings', methods=['POST'])
 def submit_rating():
     data = request.get_json()
     tenant_id     = data.get('tenant_id')
@@ -1338,21 +2335,26 @@ def submit_rating():
             VALUES (%s, %s, %s, %s, %s, NOW())
         """, (job_id, technician_id, tenant_id, rating, comment))
 
-        # 4) Recalculate and update technician's average rating
+        # 4) Fold the rating into the technician's running sum/count; the row lock keeps concurrent
+        #    ratings consistent and MySQL applies the assignments left to right, so AvgRating sees the new totals
         cursor.execute("""
-            SELECT AVG(Rating) AS avg_rating
-            FROM Ratings
+            UPDATE Technicians
+            SET RatingSum = RatingSum + %s,
+                RatingCount = RatingCount + 1,
+                AvgRating = RatingSum / RatingCount
             WHERE TechnicianID = %s
-        """, (technician_id,))
-        avg = cursor.fetchone()['avg_rating']
+        """, (rating, technician_id))
 
         cursor.execute("""
-            UPDATE Technicians
-            SET AvgRating = %s
+            SELECT RatingSum, RatingCount
+            FROM Technicians
             WHERE TechnicianID = %s
-        """, (avg, technician_id))
+        """, (technician_id,))
+        totals = cursor.fetchone()
+        avg = totals['RatingSum'] / totals['RatingCount']
 
         conn.commit()
+        technician_index.record_rating(technician_id, float(avg), totals['RatingCount'])
 
         return jsonify({
             "success": True,
@@ -1368,24 +2370,22 @@ def submit_rating():
             cursor.close()
             conn.close()
 
-@app.route('/api/technicians/<int:technician_id>/rating', methods=['GET'])
+@api.route('/api/technicians/<int:technician_id>/rating', methods=['GET'])
 def get_technician_rating(technician_id):
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
-        # Compute average and count of ratings
+        # Read the running aggregates kept up to date by submit_rating
         cursor.execute("""
-            SELECT 
-                AVG(Rating)   AS avg_rating,
-                COUNT(*)      AS rating_count
-            FROM Ratings
+            SELECT RatingSum, RatingCount
+            FROM Technicians
             WHERE TechnicianID = %s
         """, (technician_id,))
         result = cursor.fetchone()
 
-        avg = result['avg_rating']
-        count = result['rating_count']
+        count = result['RatingCount'] if result else 0
+        avg = result['RatingSum'] / count if count else None
 
         # If no ratings yet, avg will be None
         return jsonify({
@@ -1409,7 +2409,7 @@ def get_technician_rating(technician_id):
 
 
 #INVOICES
-@app.route('/api/invoices', methods=['POST'])
+@api.route('/api/invoices', methods=['POST'])
 def submit_invoice():
     data = request.get_json()
     technician_id = data.get('technician_id')
@@ -1478,7 +2478,7 @@ def submit_invoice():
             cursor.close()
             conn.close()
 
-@app.route('/api/invoices/<int:invoice_id>/status', methods=['PUT'])
+@api.route('/api/invoices/<int:invoice_id>/status', methods=['PUT'])
 def update_invoice_status(invoice_id):
     data = request.get_json()
     status = data.get('status')
@@ -1513,40 +2513,61 @@ def update_invoice_status(invoice_id):
             cursor.close()
             conn.close()
 
-@app.route('/api/invoices', methods=['GET'])
+@api.route('/api/invoices', methods=['GET'])
 def list_invoices():
     tech_id = request.args.get('technician_id')
     job_id  = request.args.get('job_id')
 
+    query = "SELECT InvoiceID, TechnicianID, JobID, Amount, SentTime, Status FROM Invoices"
+    page = " WHERE 1=1"
+    params = []
+    if tech_id:
+        page += " AND TechnicianID = %s"
+        params.append(tech_id)
+    if job_id:
+        page += " AND JobID = %s"
+        params.append(job_id)
+
+    if request.args.get('format') == 'ndjson':
+        return ndjson_response(query + page + " ORDER BY SentTime DESC, InvoiceID DESC", tuple(params))
+
+    try:
+        limit, after = parse_page_args(request.args, 2)
+    except InvalidPageRequest as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
-        query = """
-            SELECT InvoiceID, TechnicianID, JobID, Amount, SentTime, Status
-            FROM Invoices
-            WHERE 1=1
-        """
-        params = []
-        if tech_id:
-            query += " AND TechnicianID = %s"
-            params.append(tech_id)
-        if job_id:
-            query += " AND JobID = %s"
-            params.append(job_id)
-        query += " ORDER BY SentTime DESC"
+        if after:
+            condition, condition_params = keyset_condition(
+                ["SentTime", "InvoiceID"], after, descending=True, nullable=("SentTime",))
+            page += " AND " + condition
+            params.extend(condition_params)
 
-        cursor.execute(query, tuple(params))
-        invoices = cursor.fetchall()
+        page += " ORDER BY SentTime DESC, InvoiceID DESC LIMIT %s"
+        params.append(limit + 1)
 
-        return jsonify({
+        version = page_version(cursor, "SELECT InvoiceID AS RowKey, UpdatedAt FROM Invoices" + page, params)
+        etag = make_etag("invoices", tech_id, job_id, limit, request.args.get('after'), version)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
+        cursor.execute(query + page, tuple(params))
+        invoices, next_cursor = split_page(cursor.fetchall(), limit, ("SentTime", "InvoiceID"))
+
+        return with_validators(jsonify({
             "success": True,
             "filters": {
                 "technician_id": tech_id,
                 "job_id": job_id
             },
-            "invoices": invoices
-        }), 200
+            "invoices": invoices,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }), etag), 200
 
     except Exception as e:
         return jsonify({"success": False, "message": f"Failed to fetch invoices: {str(e)}"}), 500
@@ -1557,5 +2578,182 @@ def list_invoices():
             conn.close()
 
 
+#MONITORING
+def collect_pool_and_cache_metrics():
+    pool = get_pool().stats()
+    metrics = [
+        ("dpm_db_pool_connections", "gauge", "Pooled connections by state.", ("state",),
+         {("open",): pool["open"], ("idle",): pool["idle"], ("in_use",): pool["in_use"]}),
+        ("dpm_db_pool_max_size", "gauge", "Maximum pooled connections per process.", (), {(): pool["max_size"]}),
+        ("dpm_db_pool_checkouts_total", "counter", "Connections handed out by the pool.", (), {(): pool["checkouts"]}),
+        ("dpm_db_pool_waits_total", "counter", "Checkouts that had to wait for a free connection.", (), {(): pool["waits"]}),
+        ("dpm_db_pool_timeouts_total", "counter", "Checkouts that gave up waiting.", (), {(): pool["timeouts"]}),
+        ("dpm_db_pool_health_check_failures_total", "counter", "Idle connections found dead on checkout.", (),
+         {(): pool["health_check_failures"]}),
+        ("dpm_db_pool_evictions_total", "counter", "Idle connections closed after the idle timeout.", (), {(): pool["evicted_idle"]}),
+    ]
+
+    caches = {"property": property_cache.stats(), "property_list": property_list_cache.stats(), "session": session_cache.stats()}
+    for field in ("hits", "misses", "evictions", "invalidations"):
+        metrics.append((f"dpm_cache_{field}_total", "counter", f"Cache {field}.", ("cache",),
+                        {(name,): stats[field] for name, stats in caches.items()}))
+    metrics.append(("dpm_cache_entries", "gauge", "Entries currently cached.", ("cache",),
+                    {(name,): stats["size"] for name, stats in caches.items()}))
+    return metrics
+
+Metrics.register_collector(collect_pool_and_cache_metrics)
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(Metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/api/pool/stats', methods=['GET'])
+def get_pool_stats():
+    return jsonify({"success": True, "pool": get_pool().stats()}), 200
+
+@api.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({
+        "success": True,
+        "caches": {
+            "property": property_cache.stats(),
+            "property_list": property_list_cache.stats(),
+            "session": session_cache.stats()
+        }
+    }), 200
+
+
+#LIVE UPDATES
+# Server-sent events for job and assignment changes, replacing polling of the job lists.
+# Subscribe with ?technician_id=..&property_id=.. (each repeatable or comma-separated). Browsers
+# reconnect on their own and send Last-Event-ID, so events missed in between are replayed.
+# Each open stream holds a server thread; run gunicorn with DPM_WORKER_CLASS=gevent for many clients.
+@api.route('/api/events/stream', methods=['GET'])
+def stream_events():
+    try:
+        topics = [f"{name}:{int(value)}"
+                  for name in ('technician', 'property')
+                  for arg in request.args.getlist(f'{name}_id')
+                  for value in arg.split(',') if value.strip()]
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"success": False, "message": "technician_id, property_id and Last-Event-ID must be integers"}), 400
+
+    if not topics:
+        return jsonify({"success": False, "message": "Subscribe to at least one technician_id or property_id"}), 400
+
+    try:
+        subscription = feed_publisher.subscribe(topics, last_event_id)
+    except FeedFull:
+        return jsonify({"success": False, "message": "Too many open event streams, please retry"}), 503, {"Retry-After": "5"}
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            # Streams are recycled now and then so sync workers get their threads back; the client resumes via Last-Event-ID
+            deadline = time.monotonic() + Config.SSE_MAX_STREAM_SECONDS if Config.SSE_MAX_STREAM_SECONDS else None
+            while True:
+                if subscription.needs_reset:
+                    yield "event: reset\ndata: {}\n\n"
+                    return
+                events = subscription.get(Config.SSE_KEEPALIVE_SECONDS)
+                for event_id, event_type, _, payload in events:
+                    yield f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(payload)}\n\n"
+                if not events:
+                    yield ": keep-alive\n\n"
+                if deadline and time.monotonic() >= deadline:
+                    return
+        finally:
+            feed_publisher.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    # A client gone before the first chunk never starts generate(), so its finally would not free the slot
+    response.call_on_close(lambda: feed_publisher.unsubscribe(subscription))
+    return response
+
+
+#EVENT HANDLERS
+# Side effects of job and assignment changes, run by the outbox workers once the change has committed
+notification_log = logging.getLogger("dpm.events.notifications")
+
+@Events.handler("job_request.submitted")
+def notify_property_manager(payload):
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT u.Email, p.Address
+            FROM Properties p
+            JOIN Users u ON p.ManagerID = u.UserID
+            WHERE p.PropertyID = %s
+        """, (payload['property_id'],))
+        manager = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+    if manager:
+        notification_log.info("To %s: new %s request #%s at %s (urgency %s)",
+                              manager['Email'], payload['job_type'], payload['job_id'], manager['Address'], payload['urgency'])
+
+@Events.handler("assignment.created")
+def notify_technician(payload):
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT u.Email, j.JobType, p.Address
+            FROM Technicians t
+            JOIN Users u ON t.UserID = u.UserID
+            JOIN JobRequests j ON j.JobID = %s
+            JOIN Properties p ON j.PropertyID = p.PropertyID
+            WHERE t.TechnicianID = %s
+        """, (payload['job_id'], payload['technician_id']))
+        job = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+    if job:
+        notification_log.info("To %s: assigned %s job #%s at %s", job['Email'], job['JobType'], payload['job_id'], job['Address'])
+
+
+#APP FACTORY
+# Opens the per-process state (pooled connections) before the first request arrives
+def warm_up():
+    get_pool().warm(Config.POOL_MIN_IDLE)
+    technician_index.ensure_loaded()
+    availability_engine.ensure_loaded()
+
+# Background threads are per process and must be started after gunicorn forks its workers
+def start_background_workers():
+    Events.outbox_worker.start()
+
+def stop_background_workers():
+    Events.outbox_worker.stop(timeout=Config.GRACEFUL_TIMEOUT)
+
+def create_app(warm=True):
+    app = Flask(__name__)
+    if Config.PROXY_HOPS:
+        # Take the client address PROXY_HOPS entries from the right of X-Forwarded-For; the entries
+        # further left are whatever the client sent and cannot be trusted
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.PROXY_HOPS)
+    FastJSON.init_app(app)
+    Metrics.init_app(app)
+    Compression.init_app(app)
+    app.register_blueprint(api)
+    if warm:
+        warm_up()
+        start_background_workers()
+    return app
+
+
+# Development server only; production runs under gunicorn (gunicorn -c gunicorn.conf.py wsgi:app)
 if __name__ == '__main__':
-    app.run(debug=True ,host = '0.0.0.0', port = 5150)
+    app = create_app(warm=False)
+    start_background_workers()
+    app.run(debug=Config.DEBUG, host=Config.HOST, port=Config.PORT)
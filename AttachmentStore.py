@@ -0,0 +1,119 @@
+# Pluggable storage for job attachments.
+# The database only keeps metadata (name, type, size, storage key); file contents live in a store
+# and are addressed by the SHA-256 of their bytes, so identical uploads are stored once.
+import hashlib
+import os
+import re
+import tempfile
+import threading
+
+import Config
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class AttachmentStore:
+    # save() reads the stream in chunks and returns (key, size); open() returns a binary file object.
+    # save_new() also returns whether the content was new to the store, so a caller whose
+    # transaction fails knows whether the blob is its own to remove.
+    def save(self, stream):
+        key, size, _ = self.save_new(stream)
+        return key, size
+
+    def save_new(self, stream):
+        raise NotImplementedError
+
+    def open(self, key):
+        raise NotImplementedError
+
+    def size(self, key):
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+class LocalAttachmentStore(AttachmentStore):
+    def __init__(self, root, chunk_size=64 * 1024):
+        self.root = root
+        self.chunk_size = chunk_size
+        self._tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def _path(self, key):
+        if not _KEY_PATTERN.match(key or ""):
+            raise ValueError(f"Invalid attachment key: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def save_new(self, stream):
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+
+            key = digest.hexdigest()
+            path = self._path(key)
+            created = not os.path.exists(path)
+            if created:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            else:
+                # Same content is already stored
+                os.remove(tmp_path)
+            return key, size, created
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def open(self, key):
+        return open(self._path(key), "rb")
+
+    def size(self, key):
+        return os.path.getsize(self._path(key))
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+# Other backends (object storage etc.) register a factory under their name and are picked with
+# DPM_ATTACHMENT_BACKEND
+_backends = {
+    "local": lambda: LocalAttachmentStore(Config.ATTACHMENT_ROOT, Config.ATTACHMENT_CHUNK_SIZE),
+}
+_store = None
+_store_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+    _backends[name] = factory
+
+
+def get_attachment_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    factory = _backends[Config.ATTACHMENT_BACKEND]
+                except KeyError:
+                    raise ValueError(f"Unknown attachment backend: {Config.ATTACHMENT_BACKEND}")
+                _store = factory()
+    return _store
@@ -0,0 +1,242 @@
+# Technician availability engine.
+# Keeps every technician's upcoming 'Available' slots in memory as disjoint, sorted intervals, plus one
+# interval tree across all technicians, so "who is free for the whole of [T1, T2)" and "how much of
+# [T1, T2) is this technician free" are answered with bisects instead of scanning TechnicianSchedule.
+# Writes go to the database first; the handler then patches this copy with apply(). Writes made by
+# other worker processes are picked up when the engine reloads after AVAILABILITY_INDEX_TTL seconds.
+import bisect
+import random
+import threading
+
+import Config
+from Cache import ReloadingIndex
+from Helper import get_connection
+
+
+class IntervalSet:
+    # Disjoint [start, end) intervals sorted by start. Overlapping or touching input is merged,
+    # which keeps the ends sorted as well, so every lookup is a bisect on one of the two lists.
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def covers(self, start, end):
+        i = bisect.bisect_right(self.starts, start) - 1
+        return i >= 0 and self.ends[i] >= end
+
+    def overlapping(self, start, end):
+        lo = bisect.bisect_right(self.ends, start)   # first interval ending after start
+        hi = bisect.bisect_left(self.starts, end)    # first interval starting at or after end
+        return [(self.starts[i], self.ends[i]) for i in range(lo, hi)]
+
+    def overlap_seconds(self, start, end):
+        return sum((min(e, end) - max(s, start)).total_seconds() for s, e in self.overlapping(start, end))
+
+
+class _Node:
+    __slots__ = ("key", "end", "value", "priority", "max_end", "left", "right")
+
+    def __init__(self, start, end, value, priority):
+        self.key = (start, end, value)
+        self.end = end
+        self.value = value
+        self.priority = priority
+        self.max_end = end
+        self.left = None
+        self.right = None
+
+
+def _update(node):
+    node.max_end = node.end
+    if node.left is not None and node.left.max_end > node.max_end:
+        node.max_end = node.left.max_end
+    if node.right is not None and node.right.max_end > node.max_end:
+        node.max_end = node.right.max_end
+
+
+def _rotate_right(node):
+    top = node.left
+    node.left, top.right = top.right, node
+    _update(node)
+    _update(top)
+    return top
+
+
+def _rotate_left(node):
+    top = node.right
+    node.right, top.left = top.left, node
+    _update(node)
+    _update(top)
+    return top
+
+
+def _join(left, right):
+    # Every key in left is below every key in right
+    if left is None or right is None:
+        return left if right is None else right
+    if left.priority > right.priority:
+        left.right = _join(left.right, right)
+        _update(left)
+        return left
+    right.left = _join(left, right.left)
+    _update(right)
+    return right
+
+
+class IntervalTree:
+    # Interval tree as a treap ordered by start, each node carrying the maximum end in its subtree.
+    # covering() only descends into subtrees whose maximum end reaches the window end, so a query
+    # costs O((k + 1) log n) for k matches; insert() and remove() patch single intervals in O(log n).
+    # Not thread-safe: the engine serialises access with its lock.
+    def __init__(self, intervals=()):
+        self._root = None
+        self._size = 0
+        self._random = random.Random()
+        for start, end, value in intervals:
+            self.insert(start, end, value)
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, start, end, value):
+        self._root = self._insert(self._root, _Node(start, end, value, self._random.random()))
+        self._size += 1
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if new.key < node.key:
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                return _rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                return _rotate_left(node)
+        _update(node)
+        return node
+
+    def remove(self, start, end, value):
+        self._root = self._remove(self._root, (start, end, value))
+
+    def _remove(self, node, key):
+        if node is None:
+            return None
+        if key < node.key:
+            node.left = self._remove(node.left, key)
+        elif key > node.key:
+            node.right = self._remove(node.right, key)
+        else:
+            self._size -= 1
+            return _join(node.left, node.right)
+        _update(node)
+        return node
+
+    # Values of every interval with start <= window_start and end >= window_end
+    def covering(self, window_start, window_end):
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end < window_end:
+                continue
+            stack.append(node.left)
+            # Everything to the right starts later still, so it only matters if this node starts in time
+            if node.key[0] <= window_start:
+                if node.end >= window_end:
+                    found.append(node.value)
+                stack.append(node.right)
+        return found
+
+
+_EMPTY = IntervalSet()
+
+
+class AvailabilityEngine(ReloadingIndex):
+    def __init__(self, ttl=None):
+        super().__init__(Config.AVAILABILITY_INDEX_TTL if ttl is None else ttl)
+        self._slots = {}   # technician -> {schedule_id: (start, end)} of 'Available' rows
+        self._free = {}    # technician -> IntervalSet built from _slots
+        self._tree = None  # IntervalTree over every technician's free intervals, patched by apply()
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        writes = self._writes
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT ScheduleID, TechnicianID, StartTime, EndTime
+                FROM TechnicianSchedule
+                WHERE Status = 'Available' AND EndTime > NOW()
+            """)
+            slots = {}
+            for row in cursor.fetchall():
+                slots.setdefault(row['TechnicianID'], {})[row['ScheduleID']] = (row['StartTime'], row['EndTime'])
+        finally:
+            cursor.close()
+            conn.close()
+
+        free = {technician_id: IntervalSet(rows.values()) for technician_id, rows in slots.items()}
+        tree = IntervalTree((start, end, technician_id) for technician_id, intervals in free.items() for start, end in intervals)
+
+        with self._lock:
+            self._slots = slots
+            self._free = free
+            self._tree = tree
+            # A write applied while we were reading may be missing from this snapshot
+            if self._writes != writes:
+                self._stale = True
+
+    # Patches one technician after a committed write. added holds (schedule_id, start, end, status).
+    def apply(self, technician_id, removed=(), added=()):
+        with self._lock:
+            slots = dict(self._slots.get(technician_id, {}))
+            for schedule_id in removed:
+                slots.pop(schedule_id, None)
+            for schedule_id, start, end, status in added:
+                if status == 'Available':
+                    slots[schedule_id] = (start, end)
+                else:
+                    slots.pop(schedule_id, None)
+            old = set(self._free.get(technician_id, _EMPTY))
+            free = IntervalSet(slots.values())
+            self._slots[technician_id] = slots
+            self._free[technician_id] = free
+            # Only the merged intervals that actually changed move in the tree
+            if self._tree is not None:
+                new = set(free)
+                for start, end in old - new:
+                    self._tree.remove(start, end, technician_id)
+                for start, end in new - old:
+                    self._tree.insert(start, end, technician_id)
+            self._writes += 1
+
+    # Technicians free for the whole window
+    def free_between(self, window_start, window_end):
+        self.ensure_loaded()
+        with self._lock:
+            if self._tree is None:
+                return []
+            return sorted(self._tree.covering(window_start, window_end))
+
+    def free_intervals(self, technician_id):
+        return self._free.get(technician_id, _EMPTY)
+
+
+availability_engine = AvailabilityEngine()
@@ -0,0 +1,106 @@
+# Small in-process cache with per-entry TTL and LRU eviction, safe to share between request threads
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, max_size=1024, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def delete_where(self, predicate):
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Base for per-process indexes built from the database in one go. Subclasses implement _load().
+# The index is rebuilt after `ttl` seconds or once invalidate() marks it stale; while one thread
+# rebuilds, the others keep reading the previous version instead of waiting.
+class ReloadingIndex:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._loaded_at = None
+        self._stale = True
+        self._reload_lock = threading.Lock()
+
+    def _load(self):
+        raise NotImplementedError
+
+    def invalidate(self):
+        self._stale = True
+
+    def _needs_reload(self):
+        return self._stale or self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def ensure_loaded(self):
+        if not self._needs_reload():
+            return
+        # Only the very first load makes readers wait
+        if not self._reload_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self._needs_reload():
+                self._stale = False
+                self._load()
+                self._loaded_at = time.monotonic()
+        except Exception:
+            self._stale = True
+            raise
+        finally:
+            self._reload_lock.release()
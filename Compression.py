@@ -0,0 +1,56 @@
+# Negotiated response compression (brotli when the client accepts it and the module is installed,
+# otherwise gzip) for buffered text responses above COMPRESSION_MIN_SIZE bytes. Streamed
+# responses (NDJSON exports, file downloads, SSE) are left alone.
+import gzip
+
+from flask import request
+
+import Config
+
+try:
+    import brotli
+except ImportError:  # optional dependency: pip install brotli
+    brotli = None
+
+COMPRESSIBLE_TYPES = {"application/json", "application/x-ndjson", "text/plain", "text/csv", "text/html"}
+
+
+def choose_encoding(accept_encodings):
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=Config.BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=Config.GZIP_LEVEL)
+
+
+def init_app(app):
+    if not Config.COMPRESSION_MIN_SIZE:
+        return
+
+    @app.after_request
+    def _compress(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed or
+                response.mimetype not in COMPRESSIBLE_TYPES or "Content-Encoding" in response.headers):
+            return response
+        if (response.content_length or 0) < Config.COMPRESSION_MIN_SIZE:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers["Content-Encoding"] = encoding
+        # The compressed bytes differ from the identity representation, so a strong ETag becomes weak;
+        # If-None-Match is compared weakly, so revalidation keeps working
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
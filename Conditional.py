@@ -0,0 +1,56 @@
+# Conditional GET support: ETag / Last-Modified validators and 304 Not Modified answers.
+# Handlers work out the validator before serialising anything, so a client that already holds
+# the current version gets its 304 without the JSON body ever being built.
+import hashlib
+from datetime import timezone
+
+from flask import Response, request
+
+
+# Validator for any repr()-able data (a version tuple, or the rows of a list page)
+def make_etag(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+# Version of one list page, read before the page itself so a client holding the current page gets
+# its 304 without the joins and wide columns being read. `keys_sql` selects only `RowKey` (the
+# base table's ID) and `UpdatedAt`, with the page's own WHERE, ORDER BY and LIMIT: the count, key sum
+# and newest update over it change whenever a row enters, leaves or changes within the page. Joined
+# columns are covered by the newest UpdatedAt of each table in `tables` (indexed, see
+# migrations/013_list_versions.sql), and a table in `counts` also contributes its row count, for
+# aggregates that a delete elsewhere changes. The version is read before the page, so a body is
+# never older than the ETag it is served with.
+def page_version(cursor, keys_sql, values, tables=(), counts=()):
+    columns = ["COUNT(*) AS RowCount", "SUM(page.RowKey) AS KeySum", "MAX(page.UpdatedAt) AS UpdatedAt"]
+    columns += [f"(SELECT MAX(UpdatedAt) FROM {table}) AS {table}UpdatedAt" for table in tables]
+    columns += [f"(SELECT COUNT(*) FROM {table}) AS {table}Count" for table in counts]
+    cursor.execute(f"SELECT {', '.join(columns)} FROM ({keys_sql}) page", tuple(values))
+    return tuple(cursor.fetchone().values())
+
+
+def _http_time(value):
+    # Stored DATETIMEs are naive local time; HTTP dates are whole seconds in UTC
+    return value.astimezone(timezone.utc).replace(microsecond=0) if value else None
+
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = _http_time(last_modified)
+    # Cacheable, but clients must revalidate, which is cheap now
+    response.cache_control.no_cache = True
+    return response
+
+
+# The 304 response if the client's copy is current, otherwise None
+def not_modified(etag, last_modified=None):
+    if request.if_none_match:
+        # If-None-Match wins over If-Modified-Since when both are sent
+        current = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        current = _http_time(last_modified) <= request.if_modified_since
+    else:
+        current = False
+    if not current:
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
@@ -0,0 +1,135 @@
+# Runtime settings for the DPM API.
+# Every value can be overridden with an environment variable of the same name prefixed with DPM_.
+import os
+
+
+def _env(name, default, cast=str):
+    value = os.environ.get(f"DPM_{name}")
+    if value is None or value == "":
+        return default
+    return cast(value)
+
+
+# Database
+DB_HOST = _env("DB_HOST", "localhost")
+DB_PORT = _env("DB_PORT", 3306, int)
+DB_USER = _env("DB_USER", "root")
+DB_PASSWORD = _env("DB_PASSWORD", "Configure1738")
+DB_NAME = _env("DB_NAME", "dpm2")
+
+# Connection pool
+POOL_SIZE = _env("POOL_SIZE", 10, int)                      # max open connections per process
+POOL_MIN_IDLE = _env("POOL_MIN_IDLE", 2, int)               # idle connections kept through eviction
+POOL_CHECKOUT_TIMEOUT = _env("POOL_CHECKOUT_TIMEOUT", 10.0, float)  # seconds to wait for a free connection
+POOL_IDLE_TIMEOUT = _env("POOL_IDLE_TIMEOUT", 300.0, float)  # seconds before an idle connection is closed
+POOL_PING_INTERVAL = _env("POOL_PING_INTERVAL", 30.0, float)  # only ping connections idle longer than this
+
+# List endpoints (keyset pagination)
+DEFAULT_PAGE_SIZE = _env("DEFAULT_PAGE_SIZE", 100, int)
+MAX_PAGE_SIZE = _env("MAX_PAGE_SIZE", 1000, int)
+
+# NDJSON exports
+EXPORT_CHUNK_SIZE = _env("EXPORT_CHUNK_SIZE", 500, int)     # rows pulled from the cursor per write
+
+# Job attachments
+ATTACHMENT_BACKEND = _env("ATTACHMENT_BACKEND", "local")
+ATTACHMENT_ROOT = _env("ATTACHMENT_ROOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "attachments"))
+ATTACHMENT_CHUNK_SIZE = _env("ATTACHMENT_CHUNK_SIZE", 64 * 1024, int)
+
+# Property read cache (per process; the TTL bounds how stale other workers can be after a write)
+PROPERTY_CACHE_TTL = _env("PROPERTY_CACHE_TTL", 60.0, float)
+PROPERTY_CACHE_SIZE = _env("PROPERTY_CACHE_SIZE", 10000, int)
+PROPERTY_LIST_CACHE_SIZE = _env("PROPERTY_LIST_CACHE_SIZE", 1000, int)
+
+# Metrics / slow query log
+SLOW_QUERY_MS = _env("SLOW_QUERY_MS", 0.0, float)           # log queries slower than this; 0 disables
+SLOW_QUERY_LOG_FILE = _env("SLOW_QUERY_LOG_FILE", None)     # defaults to stderr
+
+# Serving (gunicorn.conf.py / python API.py)
+HOST = _env("HOST", "0.0.0.0")
+PORT = _env("PORT", 5150, int)
+DEBUG = _env("DEBUG", "true").lower() == "true"              # development server only
+WORKERS = _env("WORKERS", (os.cpu_count() or 1) * 2 + 1, int)  # processes
+THREADS = _env("THREADS", 4, int)                            # threads per process; keep POOL_SIZE >= THREADS
+WORKER_CLASS = _env("WORKER_CLASS", "gthread")
+KEEPALIVE = _env("KEEPALIVE", 5, int)                        # seconds an idle keep-alive connection is held
+TIMEOUT = _env("TIMEOUT", 30, int)                           # seconds before a stuck worker is restarted
+GRACEFUL_TIMEOUT = _env("GRACEFUL_TIMEOUT", 30, int)         # seconds workers get to finish on reload/shutdown
+MAX_REQUESTS = _env("MAX_REQUESTS", 10000, int)              # recycle workers after this many requests (0 = never)
+MAX_REQUESTS_JITTER = _env("MAX_REQUESTS_JITTER", 1000, int)
+PRELOAD_APP = _env("PRELOAD_APP", "false").lower() == "true"
+
+# Property radius search
+MAX_SEARCH_RADIUS_KM = _env("MAX_SEARCH_RADIUS_KM", 200.0, float)
+
+# Dispatch recommender
+DISPATCH_INDEX_TTL = _env("DISPATCH_INDEX_TTL", 60.0, float)      # seconds before the in-memory index is reloaded
+DISPATCH_WINDOW_HOURS = _env("DISPATCH_WINDOW_HOURS", 24.0, float)  # default availability window from now
+DISPATCH_WEIGHT_AVAILABILITY = _env("DISPATCH_WEIGHT_AVAILABILITY", 0.30, float)
+DISPATCH_WEIGHT_DISTANCE = _env("DISPATCH_WEIGHT_DISTANCE", 0.25, float)
+DISPATCH_WEIGHT_SKILL = _env("DISPATCH_WEIGHT_SKILL", 0.20, float)
+DISPATCH_WEIGHT_LOAD = _env("DISPATCH_WEIGHT_LOAD", 0.15, float)
+DISPATCH_WEIGHT_RATING = _env("DISPATCH_WEIGHT_RATING", 0.10, float)
+DISPATCH_DISTANCE_SCALE_KM = _env("DISPATCH_DISTANCE_SCALE_KM", 10.0, float)  # distance at which the score halves
+
+# Availability engine
+AVAILABILITY_INDEX_TTL = _env("AVAILABILITY_INDEX_TTL", 60.0, float)  # seconds before slots written by other workers show up
+
+# Bulk endpoints
+MAX_BATCH_ITEMS = _env("MAX_BATCH_ITEMS", 1000, int)        # items accepted per batch request
+BATCH_INSERT_CHUNK = _env("BATCH_INSERT_CHUNK", 500, int)   # rows per multi-row INSERT
+
+# Outbox / background events
+OUTBOX_WORKERS = _env("OUTBOX_WORKERS", 4, int)                  # handler threads per process; 0 disables the worker
+OUTBOX_BATCH_SIZE = _env("OUTBOX_BATCH_SIZE", 50, int)           # events claimed per poll
+OUTBOX_POLL_INTERVAL = _env("OUTBOX_POLL_INTERVAL", 1.0, float)  # seconds between polls when idle
+OUTBOX_LEASE_SECONDS = _env("OUTBOX_LEASE_SECONDS", 60, int)     # claimed events are retried after this if the worker dies
+OUTBOX_MAX_ATTEMPTS = _env("OUTBOX_MAX_ATTEMPTS", 8, int)
+OUTBOX_RETRY_BASE_SECONDS = _env("OUTBOX_RETRY_BASE_SECONDS", 2, int)  # doubled after every failed attempt
+OUTBOX_RETENTION_HOURS = _env("OUTBOX_RETENTION_HOURS", 72, int)  # processed events are purged after this
+
+# Live updates (server-sent events)
+SSE_POLL_INTERVAL = _env("SSE_POLL_INTERVAL", 0.5, float)          # seconds between Outbox reads while anyone is subscribed
+SSE_KEEPALIVE_SECONDS = _env("SSE_KEEPALIVE_SECONDS", 15.0, float)  # comment line sent on idle streams
+SSE_MAX_STREAM_SECONDS = _env("SSE_MAX_STREAM_SECONDS", 300, int)   # streams are closed after this and the client reconnects; 0 = never
+SSE_REPLAY_EVENTS = _env("SSE_REPLAY_EVENTS", 10000, int)           # recent events kept for Last-Event-ID replay
+SSE_QUEUE_SIZE = _env("SSE_QUEUE_SIZE", 1000, int)                  # undelivered events per client before it is told to reset
+SSE_GAP_SECONDS = _env("SSE_GAP_SECONDS", 10.0, float)              # how long to wait for an uncommitted Outbox ID
+SSE_IDLE_RESUME_SECONDS = _env("SSE_IDLE_RESUME_SECONDS", 300.0, float)  # idle longer than this and the feed restarts from the newest event
+# Open streams per process; beyond this clients get 503. Under gthread every stream holds one of the
+# THREADS request threads, so by default at most half of them go to streams; async workers have no such limit.
+SSE_MAX_STREAMS = _env("SSE_MAX_STREAMS", 1000 if WORKER_CLASS in ("gevent", "eventlet") else max(THREADS // 2, 1), int)
+
+# Response encoding
+FAST_JSON = _env("FAST_JSON", "true").lower() == "true"                     # use orjson for jsonify() when installed
+JSON_ISO_DATETIMES = _env("JSON_ISO_DATETIMES", "false").lower() == "true"  # ISO 8601 instead of HTTP dates (faster, changes output)
+COMPRESSION_MIN_SIZE = _env("COMPRESSION_MIN_SIZE", 1024, int)              # bytes; 0 disables compression
+GZIP_LEVEL = _env("GZIP_LEVEL", 5, int)
+BROTLI_QUALITY = _env("BROTLI_QUALITY", 4, int)
+
+# Password hashing (scrypt)
+PASSWORD_SCRYPT_N = _env("PASSWORD_SCRYPT_N", 2 ** 14, int)   # CPU/memory cost, power of two; raise as hardware allows
+PASSWORD_SCRYPT_R = _env("PASSWORD_SCRYPT_R", 8, int)
+PASSWORD_SCRYPT_P = _env("PASSWORD_SCRYPT_P", 1, int)
+PASSWORD_HASH_WORKERS = _env("PASSWORD_HASH_WORKERS", 2, int)          # hashing threads per process
+PASSWORD_HASH_MAX_PENDING = _env("PASSWORD_HASH_MAX_PENDING", 32, int)  # running + queued hashes before logins get 503
+PASSWORD_BULK_HASH_WORKERS = _env("PASSWORD_BULK_HASH_WORKERS", 1, int)  # hashing threads per process for bulk provisioning
+MAX_BATCH_USERS = _env("MAX_BATCH_USERS", 200, int)   # users per /api/users/batch call; ~60 ms of scrypt each must fit in TIMEOUT
+PASSWORD_HASH_QUEUE_TIMEOUT = _env("PASSWORD_HASH_QUEUE_TIMEOUT", 2.0, float)  # seconds to wait for a queue slot
+PASSWORD_VERIFY_CACHE_TTL = _env("PASSWORD_VERIFY_CACHE_TTL", 300.0, float)    # remember successful logins; 0 disables
+PASSWORD_VERIFY_CACHE_SIZE = _env("PASSWORD_VERIFY_CACHE_SIZE", 10000, int)
+
+# Sessions (bearer tokens from /api/login)
+SESSION_SECRET = _env("SESSION_SECRET", "")                   # HMAC key for tokens; must be the same in every process
+SESSION_TTL = _env("SESSION_TTL", 8 * 3600, int)              # seconds a token stays valid
+SESSION_CACHE_TTL = _env("SESSION_CACHE_TTL", 30.0, float)    # seconds a validated session is trusted before rechecking Sessions
+SESSION_CACHE_SIZE = _env("SESSION_CACHE_SIZE", 100000, int)
+REQUIRE_AUTH = _env("REQUIRE_AUTH", "false").lower() == "true"  # reject API calls without a valid bearer token
+
+# Login rate limiting (per process, sliding window)
+LOGIN_RATE_LIMIT = _env("LOGIN_RATE_LIMIT", "true").lower() == "true"
+LOGIN_WINDOW_SECONDS = _env("LOGIN_WINDOW_SECONDS", 300, int)
+LOGIN_IP_LIMIT = _env("LOGIN_IP_LIMIT", 50, int)              # attempts per client address per window
+LOGIN_EMAIL_LIMIT = _env("LOGIN_EMAIL_LIMIT", 10, int)        # attempts per email per window, cleared by a successful login
+LOGIN_LIMITER_MAX_KEYS = _env("LOGIN_LIMITER_MAX_KEYS", 100000, int)  # tracked addresses/emails each; least recent evicted
+PROXY_HOPS = _env("PROXY_HOPS", 0, int)   # reverse proxies in front of the app that append to X-Forwarded-For; 0 = none
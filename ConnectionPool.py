@@ -0,0 +1,228 @@
+# Thread-safe MySQL connection pool used behind Helper.get_connection()
+import os
+import threading
+import time
+from collections import deque
+
+from mysql.connector.errors import PoolError
+
+
+class PooledConnection:
+    # Proxy handed out by the pool. Everything is forwarded to the real connection
+    # except close(), which hands the connection back to the pool instead of dropping it.
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._returned = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        wrapper = self._pool.cursor_wrapper
+        return wrapper(cursor) if wrapper else cursor
+
+    def is_connected(self):
+        # Handlers call this in their finally blocks; answering locally avoids a ping round trip
+        return not self._returned
+
+    def close(self):
+        if self._returned:
+            return
+        self._returned = True
+        self._pool.release(self._raw)
+
+
+class ConnectionPool:
+    def __init__(self, factory, max_size=10, min_idle=0, checkout_timeout=10.0,
+                 idle_timeout=300.0, ping_interval=30.0, cursor_wrapper=None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.min_idle = min(min_idle, max_size)
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.cursor_wrapper = cursor_wrapper  # e.g. Metrics.InstrumentedCursor
+
+        self._cond = threading.Condition()
+        self._reset_state()
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._idle = deque()  # (connection, last_used), most recently used on the right
+        self._open = 0
+        self._checkouts = 0
+        self._created = 0
+        self._closed = 0
+        self._evicted = 0
+        self._health_failures = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _check_fork(self):
+        # Sockets inherited from a parent process must never be reused; start over in the child
+        if self._pid != os.getpid():
+            self._reset_state()
+
+    def get(self, timeout=None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            expired = []
+            raw = None
+            create = False
+
+            with self._cond:
+                self._check_fork()
+                while True:
+                    expired.extend(self._collect_expired(time.monotonic()))
+                    if self._idle:
+                        raw, last_used = self._idle.pop()
+                        break
+                    if self._open < self.max_size:
+                        self._open += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        self._close_all(expired)
+                        raise PoolError(f"No connection available within {timeout:.1f}s (pool size {self.max_size})")
+                    if not waited:
+                        waited = True
+                        self._waits += 1
+                    self._cond.wait(remaining)
+
+            self._close_all(expired)
+
+            if create:
+                try:
+                    raw = self.factory()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._created += 1
+            elif time.monotonic() - last_used > self.ping_interval and not self._is_healthy(raw):
+                # Dead connection: drop it and go round again, a fresh one will be opened in its slot
+                self._discard(raw, health_failure=True)
+                continue
+
+            elapsed = time.monotonic() - start
+            with self._cond:
+                self._checkouts += 1
+                self._wait_total += elapsed
+                self._wait_max = max(self._wait_max, elapsed)
+            return PooledConnection(self, raw)
+
+    def release(self, raw):
+        with self._cond:
+            if self._pid != os.getpid():
+                return
+        try:
+            # An abandoned unbuffered result would have to be drained row by row; cheaper to reconnect
+            if getattr(raw, "unread_result", False):
+                self._discard(raw)
+                return
+            # End whatever transaction the handler left open so the next user gets a fresh snapshot
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        with self._cond:
+            self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    def _is_healthy(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, raw, health_failure=False):
+        with self._cond:
+            self._open -= 1
+            self._closed += 1
+            if health_failure:
+                self._health_failures += 1
+            self._cond.notify()
+        self._close_quietly(raw)
+
+    def _collect_expired(self, now):
+        # Idle connections are ordered oldest first, so eviction only ever looks at the left end
+        expired = []
+        while len(self._idle) > self.min_idle and now - self._idle[0][1] > self.idle_timeout:
+            raw, _ = self._idle.popleft()
+            expired.append(raw)
+            self._open -= 1
+            self._closed += 1
+            self._evicted += 1
+        return expired
+
+    def _close_all(self, connections):
+        for raw in connections:
+            self._close_quietly(raw)
+        connections.clear()
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def warm(self, count=None):
+        # Open connections up front so the first requests don't pay for the handshake
+        count = self.min_idle if count is None else min(count, self.max_size)
+        held = []
+        try:
+            for _ in range(count):
+                held.append(self.get())
+        finally:
+            for conn in held:
+                conn.close()
+
+    def evict_idle(self):
+        with self._cond:
+            expired = self._collect_expired(time.monotonic())
+        self._close_all(expired)
+
+    def close(self):
+        with self._cond:
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+            self._closed += len(idle)
+        self._close_all(idle)
+
+    def stats(self):
+        with self._cond:
+            self._check_fork()
+            return {
+                "max_size": self.max_size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "checkouts": self._checkouts,
+                "created": self._created,
+                "closed": self._closed,
+                "evicted_idle": self._evicted,
+                "health_check_failures": self._health_failures,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_seconds_total": round(self._wait_total, 6),
+                "wait_seconds_max": round(self._wait_max, 6),
+            }
@@ -0,0 +1,183 @@
+# Technician dispatch recommender.
+# Keeps a per-process, in-memory index of every technician (skills, rating, open assignment load
+# and last known location) so ranking all of them for a job is a single pass in Python with no
+# per-candidate queries; availability comes from the availability engine. Assignment and rating
+# writes patch the affected technician in place; the index is reloaded after DISPATCH_INDEX_TTL
+# seconds (picking up other processes' writes) or when a write handler marks it stale.
+import re
+import threading
+
+import Config
+from Availability import availability_engine
+from Cache import ReloadingIndex
+from Geo import haversine_km
+from Helper import get_connection
+
+_SKILL_SPLIT = re.compile(r"[,;/|]+")
+
+# Assignment statuses that count towards a technician's open load
+OPEN_STATUSES = ("Assigned", "In Progress")
+
+
+def parse_skills(skillset):
+    return {skill.strip().lower() for skill in _SKILL_SPLIT.split(skillset or "") if skill.strip()}
+
+
+class TechnicianEntry:
+    __slots__ = ("technician_id", "name", "skills", "avg_rating", "rating_count", "open_assignments", "location")
+
+    def __init__(self, technician_id, name, skills, avg_rating, rating_count):
+        self.technician_id = technician_id
+        self.name = name
+        self.skills = skills
+        self.avg_rating = avg_rating
+        self.rating_count = rating_count
+        self.open_assignments = 0
+        self.location = None  # (lat, lng) of the property of the technician's latest assignment
+
+
+class TechnicianIndex(ReloadingIndex):
+    def __init__(self, ttl=None):
+        super().__init__(Config.DISPATCH_INDEX_TTL if ttl is None else ttl)
+        self._entries = {}
+        self._by_skill = {}
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        writes = self._writes
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT t.TechnicianID, t.Skillset, t.AvgRating, t.RatingCount, u.FirstName, u.LastName
+                FROM Technicians t
+                JOIN Users u ON t.UserID = u.UserID
+            """)
+            entries = {}
+            for row in cursor.fetchall():
+                name = " ".join(part for part in (row['FirstName'], row['LastName']) if part)
+                entries[row['TechnicianID']] = TechnicianEntry(
+                    row['TechnicianID'], name, parse_skills(row['Skillset']),
+                    float(row['AvgRating']) if row['AvgRating'] is not None else None, row['RatingCount'] or 0)
+
+            cursor.execute("""
+                SELECT TechnicianID, COUNT(*) AS OpenAssignments
+                FROM Assignments
+                WHERE Status IN ('Assigned', 'In Progress')
+                GROUP BY TechnicianID
+            """)
+            for row in cursor.fetchall():
+                entry = entries.get(row['TechnicianID'])
+                if entry:
+                    entry.open_assignments = row['OpenAssignments']
+
+            cursor.execute("""
+                SELECT a.TechnicianID, p.Latitude, p.Longitude
+                FROM Assignments a
+                JOIN (
+                    SELECT TechnicianID, MAX(AssignmentID) AS AssignmentID
+                    FROM Assignments
+                    GROUP BY TechnicianID
+                ) latest ON latest.AssignmentID = a.AssignmentID
+                JOIN JobRequests j ON a.JobID = j.JobID
+                JOIN Properties p ON j.PropertyID = p.PropertyID
+            """)
+            for row in cursor.fetchall():
+                entry = entries.get(row['TechnicianID'])
+                if entry and row['Latitude'] is not None and row['Longitude'] is not None:
+                    entry.location = (float(row['Latitude']), float(row['Longitude']))
+        finally:
+            cursor.close()
+            conn.close()
+
+        by_skill = {}
+        for entry in entries.values():
+            for skill in entry.skills:
+                by_skill.setdefault(skill, set()).add(entry.technician_id)
+
+        with self._lock:
+            self._entries = entries
+            self._by_skill = by_skill
+            # A patch applied while we were reading may be missing from this snapshot
+            if self._writes != writes:
+                self._stale = True
+
+    def _patch(self, technician_id, change):
+        with self._lock:
+            self._writes += 1
+            entry = self._entries.get(technician_id)
+            if entry is None:
+                # Not loaded yet (e.g. a technician created in another process): pick it up on reload
+                self._stale = True
+                return
+            change(entry)
+
+    # open_delta is +1 for a new open assignment, -1 for one that completed or was cancelled.
+    # location is the (lat, lng) of the property of a newly assigned job, if known.
+    def record_assignment(self, technician_id, open_delta, location=None):
+        def change(entry):
+            entry.open_assignments = max(entry.open_assignments + open_delta, 0)
+            if location is not None:
+                entry.location = location
+        self._patch(technician_id, change)
+
+    def record_rating(self, technician_id, avg_rating, rating_count):
+        def change(entry):
+            entry.avg_rating = avg_rating
+            entry.rating_count = rating_count
+        self._patch(technician_id, change)
+
+    def skilled_for(self, job_type):
+        job_type = (job_type or "").strip().lower()
+        matched = set(self._by_skill.get(job_type, ()))
+        # Also accept partial matches such as "plumbing" for "Emergency Plumbing"
+        for skill, technicians in self._by_skill.items():
+            if skill != job_type and (skill in job_type or job_type in skill):
+                matched |= technicians
+        return matched
+
+    def rank(self, job_type, location, window_start, window_end, limit=10, require_skill=False):
+        self.ensure_loaded()
+        availability_engine.ensure_loaded()
+        entries = self._entries
+        skilled = self.skilled_for(job_type)
+        candidates = (entries[i] for i in skilled) if require_skill else entries.values()
+        window_seconds = max((window_end - window_start).total_seconds(), 1.0)
+
+        ranked = []
+        for entry in candidates:
+            free = availability_engine.free_intervals(entry.technician_id)
+            availability = min(free.overlap_seconds(window_start, window_end) / window_seconds, 1.0)
+
+            distance_km = None
+            distance_score = 0.5  # unknown location: neutral
+            if location and entry.location:
+                distance_km = haversine_km(location[0], location[1], entry.location[0], entry.location[1])
+                distance_score = Config.DISPATCH_DISTANCE_SCALE_KM / (Config.DISPATCH_DISTANCE_SCALE_KM + distance_km)
+
+            skill_match = entry.technician_id in skilled
+            load_score = 1.0 / (1 + entry.open_assignments)
+            rating_score = entry.avg_rating / 5 if entry.rating_count and entry.avg_rating is not None else 0.5
+
+            score = (Config.DISPATCH_WEIGHT_AVAILABILITY * availability +
+                     Config.DISPATCH_WEIGHT_DISTANCE * distance_score +
+                     Config.DISPATCH_WEIGHT_SKILL * (1.0 if skill_match else 0.0) +
+                     Config.DISPATCH_WEIGHT_LOAD * load_score +
+                     Config.DISPATCH_WEIGHT_RATING * rating_score)
+            ranked.append((score, entry, availability, distance_km, skill_match))
+
+        ranked.sort(key=lambda item: (-item[0], item[1].technician_id))
+        return [{
+            "TechnicianID": entry.technician_id,
+            "Name": entry.name,
+            "Score": round(score, 4),
+            "AvailabilityOverlap": round(availability, 4),
+            "DistanceKm": round(distance_km, 3) if distance_km is not None else None,
+            "SkillMatch": skill_match,
+            "OpenAssignments": entry.open_assignments,
+            "AvgRating": round(entry.avg_rating, 2) if entry.rating_count and entry.avg_rating is not None else None,
+        } for score, entry, availability, distance_km, skill_match in ranked[:limit]]
+
+
+technician_index = TechnicianIndex()
@@ -0,0 +1,234 @@
+# Transactional outbox and background event workers.
+# A handler records an event with enqueue_event() on the same cursor as the change it describes, so
+# the event exists exactly when the change committed. OutboxWorker then claims pending events
+# (FOR UPDATE SKIP LOCKED, so every worker process can share the table), runs the registered
+# handlers on a thread pool off the request path, and retries failures with exponential backoff.
+# Delivery is at-least-once: handlers must be safe to run twice for the same event.
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import after_this_request, has_request_context
+
+import Config
+import Metrics
+from Helper import get_connection
+
+log = logging.getLogger("dpm.events")
+
+events_processed = Metrics.register(Metrics.Counter(
+    "dpm_outbox_events_total", "Outbox events handled, by outcome.", ("event_type", "outcome")))
+
+_handlers = {}  # event type -> [callable(payload)]
+
+
+def handler(event_type):
+    def register(func):
+        _handlers.setdefault(event_type, []).append(func)
+        return func
+    return register
+
+
+def enqueue_events(cursor, events):
+    if not events:
+        return
+    cursor.executemany("""
+        INSERT INTO Outbox (EventType, Payload)
+        VALUES (%s, %s)
+    """, [(event_type, json.dumps(payload, default=str)) for event_type, payload in events])
+
+    # Wake the local worker once the response (and so the commit) is done instead of waiting for its next poll
+    if has_request_context():
+        @after_this_request
+        def _wake_worker(response):
+            outbox_worker.notify()
+            return response
+
+
+def enqueue_event(cursor, event_type, payload):
+    enqueue_events(cursor, [(event_type, payload)])
+
+
+class OutboxWorker:
+    def __init__(self, workers=None, batch_size=None, poll_interval=None, lease_seconds=None, max_attempts=None):
+        self.workers = Config.OUTBOX_WORKERS if workers is None else workers
+        self.batch_size = batch_size or Config.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or Config.OUTBOX_POLL_INTERVAL
+        self.lease_seconds = lease_seconds or Config.OUTBOX_LEASE_SECONDS
+        self.max_attempts = max_attempts or Config.OUTBOX_MAX_ATTEMPTS
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._slots = None  # one per idle pool thread; events are only claimed when a thread is free to run them
+        self._pid = None
+
+    def start(self):
+        if self.workers <= 0:
+            return
+        with self._lock:
+            # Threads do not survive a fork, so a forked child starts its own
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if not log.handlers:
+                handler = logging.StreamHandler()
+                handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+                log.addHandler(handler)
+                log.setLevel(logging.INFO)
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._slots = threading.BoundedSemaphore(self.workers)
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="dpm-outbox")
+            self._thread = threading.Thread(target=self._run, name="dpm-outbox-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        with self._lock:
+            thread, executor = self._thread, self._executor
+            self._thread = self._executor = None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        thread.join(timeout)
+        executor.shutdown(wait=True)
+
+    def notify(self):
+        self._wake.set()
+
+    def _run(self):
+        last_purge = 0.0
+        while not self._stopping.is_set():
+            free = 0
+            while free < self.batch_size and self._slots.acquire(blocking=False):
+                free += 1
+            if not free:
+                # Every pool thread is busy; wait for one rather than claiming events nobody can run yet
+                if self._slots.acquire(timeout=self.poll_interval):
+                    self._slots.release()
+                continue
+
+            try:
+                claimed = self._claim(free)
+            except Exception as e:
+                log.warning("Outbox claim failed: %s", e)
+                claimed = []
+            for _ in range(free - len(claimed)):
+                self._slots.release()
+            for event in claimed:
+                self._executor.submit(self._process, event)
+
+            if time.monotonic() - last_purge > 3600:
+                last_purge = time.monotonic()
+                try:
+                    self._purge()
+                except Exception as e:
+                    log.warning("Outbox purge failed: %s", e)
+
+            # A full batch means there is probably more waiting
+            if len(claimed) < free:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _claim(self, limit):
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT EventID, EventType, Payload, Attempts
+                FROM Outbox
+                WHERE Status = 'Pending' AND AvailableAt <= NOW(6)
+                ORDER BY AvailableAt, EventID
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            """, (limit,))
+            events = cursor.fetchall()
+            if events:
+                # The lease: if this process dies mid-event, the event becomes claimable again when it runs out
+                placeholders = ", ".join(["%s"] * len(events))
+                cursor.execute(f"""
+                    UPDATE Outbox
+                    SET Attempts = Attempts + 1, AvailableAt = NOW(6) + INTERVAL %s SECOND
+                    WHERE EventID IN ({placeholders})
+                """, [self.lease_seconds] + [event['EventID'] for event in events])
+            conn.commit()
+            return events
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _process(self, event):
+        try:
+            payload = json.loads(event['Payload'])
+            for func in _handlers.get(event['EventType'], ()):
+                func(payload)
+        except Exception as e:
+            self._failed(event, e)
+        else:
+            self._done(event)
+        finally:
+            self._slots.release()
+
+    def _done(self, event):
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                UPDATE Outbox
+                SET Status = 'Done', ProcessedAt = NOW(6), LastError = NULL
+                WHERE EventID = %s
+            """, (event['EventID'],))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        events_processed.inc(1, event['EventType'], "done")
+
+    def _failed(self, event, error):
+        attempts = event['Attempts'] + 1
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            if attempts >= self.max_attempts:
+                log.error("Event %s (%s) failed for good after %d attempts: %s", event['EventID'], event['EventType'], attempts, error)
+                cursor.execute("""
+                    UPDATE Outbox
+                    SET Status = 'Failed', ProcessedAt = NOW(6), LastError = %s
+                    WHERE EventID = %s
+                """, (str(error), event['EventID']))
+                outcome = "failed"
+            else:
+                delay = min(Config.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600)
+                log.warning("Event %s (%s) failed, retrying in %ss: %s", event['EventID'], event['EventType'], delay, error)
+                cursor.execute("""
+                    UPDATE Outbox
+                    SET AvailableAt = NOW(6) + INTERVAL %s SECOND, LastError = %s
+                    WHERE EventID = %s
+                """, (delay, str(error), event['EventID']))
+                outcome = "retried"
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        events_processed.inc(1, event['EventType'], outcome)
+
+    def _purge(self):
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                DELETE FROM Outbox
+                WHERE Status = 'Done' AND ProcessedAt < NOW(6) - INTERVAL %s HOUR
+                LIMIT 10000
+            """, (Config.OUTBOX_RETENTION_HOURS,))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+
+outbox_worker = OutboxWorker()
@@ -0,0 +1,41 @@
+# Streams query results as newline-delimited JSON (one row per line) without building the
+# whole result set in memory. Used by the ?format=ndjson export mode of the list endpoints.
+from flask import Response, json, stream_with_context
+
+import Config
+from Helper import get_connection
+
+
+def ndjson_response(query, params=(), chunk_size=None):
+    chunk_size = chunk_size or Config.EXPORT_CHUNK_SIZE
+
+    def generate():
+        # Send the headers straight away, before the database has produced anything
+        yield ""
+
+        conn = get_connection()
+        if conn is None:
+            yield json.dumps({"success": False, "message": "Database unavailable"}) + "\n"
+            return
+
+        cursor = None
+        try:
+            # Unbuffered cursor: rows stay on the socket until fetched, so memory is one chunk at a time
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield "".join(json.dumps(row) + "\n" for row in rows)
+        finally:
+            # If the client went away mid-stream the cursor still has unread rows; closing it can fail,
+            # in which case the pool discards the connection instead of reusing it
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
@@ -0,0 +1,53 @@
+# Flask JSON provider backed by orjson, used for every jsonify() when orjson is installed.
+# Output decodes to the same values as Flask's default provider (sorted keys, HTTP-date datetimes,
+# Decimals as strings) unless DPM_JSON_ISO_DATETIMES is set, in which case datetimes use orjson's
+# native ISO 8601 encoding, which is the fastest path. It is not byte-identical: non-ASCII text is
+# written as UTF-8 where Flask escapes it as \uXXXX (so response sizes differ and a client that
+# ignores the charset of application/json could misread it), and NaN/Infinity become null rather
+# than Flask's non-standard NaN/Infinity tokens. Set DPM_FAST_JSON=false if byte-for-byte output matters.
+from flask.json.provider import DefaultJSONProvider
+
+import Config
+
+try:
+    import orjson
+except ImportError:  # optional dependency: pip install orjson
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    def _option(self):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if not Config.JSON_ISO_DATETIMES:
+            # Hand datetimes to default(), which formats them as HTTP dates like Flask does
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        compact = self.compact if self.compact is not None else not self._app.debug
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self._option())
+
+    def dumps(self, obj, **kwargs):
+        # Callers asking for json.dumps-specific arguments get the standard library
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Straight to bytes, skipping the str round trip of the default provider
+        return self._app.response_class(self._encode(obj) + b"\n", mimetype=self.mimetype)
+
+
+def init_app(app):
+    if Config.FAST_JSON and orjson is not None:
+        app.json = OrjsonProvider(app)
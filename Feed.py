@@ -0,0 +1,204 @@
+# Server-sent event feed of job and assignment changes (GET /api/events/stream).
+# One publisher thread per process tails the Outbox table and fans each new event out to the
+# subscriptions registered for its topics ("technician:<id>", "property:<id>"). A connected client
+# costs one small queue and a blocked wait; nothing queries the database per client. Under threaded
+# workers that wait still occupies a request thread, so open streams are capped per process
+# (SSE_MAX_STREAMS) and subscribe() raises FeedFull beyond that.
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+import Config
+from Helper import get_connection
+
+log = logging.getLogger("dpm.events.feed")
+
+
+class FeedFull(Exception):
+    pass
+
+
+def event_topics(payload):
+    topics = []
+    for key in ('technician_id', 'previous_technician_id'):
+        if payload.get(key) is not None:
+            topics.append(f"technician:{payload[key]}")
+    if payload.get('property_id') is not None:
+        topics.append(f"property:{payload['property_id']}")
+    return topics
+
+
+class Subscription:
+    def __init__(self, topics, max_queued):
+        self.topics = frozenset(topics)
+        self.needs_reset = False  # events were lost; the client has to refetch its state
+        self.closed = False
+        self._events = collections.deque()
+        self._max_queued = max_queued
+        self._ready = threading.Event()
+
+    def push(self, event):
+        if len(self._events) >= self._max_queued:
+            self.needs_reset = True
+        else:
+            self._events.append(event)
+        self._ready.set()
+
+    # Everything queued so far, waiting up to `timeout` seconds when nothing is
+    def get(self, timeout):
+        if not self._events and not self._ready.wait(timeout):
+            return []
+        self._ready.clear()
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+
+class FeedPublisher:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # topic -> set of Subscription
+        self._count = 0
+        self._active = threading.Event()  # set while anyone is subscribed
+        self._recent = collections.deque(maxlen=Config.SSE_REPLAY_EVENTS)  # (event_id, type, topics, payload)
+        self._start_id = None  # events after this ID are in _recent, up to its maxlen
+        self._floor = None     # every event up to here has been published
+        self._seen = set()     # published IDs above _floor
+        self._gaps = {}        # ID -> first time it was found missing above _floor
+        self._idle_since = None  # when the last subscriber left
+        self._restart = False    # set to make the publisher thread start over from the newest event
+        self._thread = None
+        self._pid = None
+
+    def subscribe(self, topics, last_event_id=None):
+        self._ensure_started()
+        subscription = Subscription(topics, Config.SSE_QUEUE_SIZE)
+        with self._lock:
+            if self._count >= Config.SSE_MAX_STREAMS:
+                raise FeedFull()
+            if not self._count and self._idle_since is not None and \
+                    time.monotonic() - self._idle_since > Config.SSE_IDLE_RESUME_SECONDS:
+                # Idle too long to catch up from where tailing stopped: drop the replay buffer, so
+                # reconnecting clients are told to reset, and let the thread restart from the newest event
+                self._start_id = None
+                self._recent.clear()
+                self._restart = True
+            self._idle_since = None
+            if last_event_id is not None:
+                # Replay what the client missed while reconnecting, if the buffer still reaches back that far
+                covered = (self._start_id is not None and last_event_id >= self._start_id and
+                           (len(self._recent) < self._recent.maxlen or self._recent[0][0] <= last_event_id))
+                if covered:
+                    for event in self._recent:
+                        if event[0] > last_event_id and subscription.topics.intersection(event[2]):
+                            subscription.push(event)
+                else:
+                    subscription.needs_reset = True
+            for topic in subscription.topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+            self._count += 1
+            self._active.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription.closed:
+                return
+            subscription.closed = True
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+            self._count -= 1
+            if not self._count:
+                self._idle_since = time.monotonic()
+                self._active.clear()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="dpm-feed-publisher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            if not self._active.is_set():
+                # Nobody listening: stop tailing. The position is kept, so a client that reconnects soon
+                # gets the events committed meanwhile; after a long pause subscribe() asks for a restart.
+                self._active.wait()
+            with self._lock:
+                if self._restart:
+                    self._restart = False
+                    self._floor = None
+            try:
+                self._poll()
+            except Exception as e:
+                log.warning("Feed poll failed: %s", e)
+            time.sleep(Config.SSE_POLL_INTERVAL)
+
+    def _poll(self):
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            if self._floor is None:
+                cursor.execute("SELECT COALESCE(MAX(EventID), 0) AS EventID FROM Outbox")
+                start_id = cursor.fetchone()['EventID']
+                with self._lock:
+                    self._floor = self._start_id = start_id
+                    self._recent.clear()
+                self._seen.clear()
+                self._gaps.clear()
+                return
+            cursor.execute("""
+                SELECT EventID, EventType, Payload
+                FROM Outbox
+                WHERE EventID > %s
+                ORDER BY EventID
+                LIMIT 1000
+            """, (self._floor,))
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+
+        with self._lock:
+            for row in rows:
+                if row['EventID'] in self._seen:
+                    continue
+                self._seen.add(row['EventID'])
+                payload = json.loads(row['Payload'])
+                event = (row['EventID'], row['EventType'], event_topics(payload), payload)
+                self._recent.append(event)
+                receivers = set()
+                for topic in event[2]:
+                    receivers.update(self._subscribers.get(topic, ()))
+                for subscription in receivers:
+                    subscription.push(event)
+
+        # IDs are allocated at INSERT but become visible at COMMIT, so a missing ID may still show up.
+        # Keep re-reading from the first gap until it fills or is older than SSE_GAP_SECONDS (rolled back).
+        now = time.monotonic()
+        if rows:
+            for event_id in range(self._floor + 1, rows[-1]['EventID']):
+                if event_id not in self._seen:
+                    self._gaps.setdefault(event_id, now)
+        while True:
+            next_id = self._floor + 1
+            if next_id in self._seen:
+                self._seen.discard(next_id)
+            elif next_id in self._gaps and now - self._gaps[next_id] > Config.SSE_GAP_SECONDS:
+                del self._gaps[next_id]
+            else:
+                break
+            self._floor = next_id
+
+
+feed_publisher = FeedPublisher()
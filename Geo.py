@@ -0,0 +1,54 @@
+# Geo helpers for radius search over Properties.
+# Properties carry generated GridLat/GridLng columns (migrations/004) that bucket coordinates into
+# GRID_CELL_DEGREES cells; a radius search reads the covering cells through their index and then
+# refines the candidates with the exact great-circle distance.
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GRID_CELL_DEGREES = 0.1  # must match the GridLat/GridLng column definitions
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# "lat,lng" -> (lat, lng)
+def parse_point(value):
+    try:
+        lat, lng = (float(part) for part in value.split(","))
+    except (AttributeError, ValueError):
+        raise ValueError("Expected 'lat,lng'")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Coordinates out of range")
+    return lat, lng
+
+
+def grid_cell(degrees):
+    return math.floor(degrees / GRID_CELL_DEGREES)
+
+
+# Grid cells covering the bounding box of a circle: ((lat_lo, lat_hi), [(lng_lo, lng_hi), ...]).
+# The longitude list has two ranges when the box crosses the antimeridian and is empty when the box
+# spans every longitude (near the poles). Ranges are padded by one cell so float rounding at the
+# edges can never drop a row MySQL bucketed with exact decimals.
+def covering_cells(lat, lng, radius_km):
+    dlat = radius_km / KM_PER_DEGREE
+    lat_lo, lat_hi = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    lat_cells = (grid_cell(lat_lo) - 1, grid_cell(lat_hi) + 1)
+
+    widest = math.cos(math.radians(max(abs(lat_lo), abs(lat_hi))))
+    if widest <= 0 or radius_km / (KM_PER_DEGREE * widest) >= 180:
+        return lat_cells, []
+    dlng = radius_km / (KM_PER_DEGREE * widest)
+
+    lng_lo, lng_hi = lng - dlng, lng + dlng
+    if lng_lo < -180:
+        ranges = [(grid_cell(lng_lo + 360) - 1, grid_cell(180.0) + 1), (grid_cell(-180.0) - 1, grid_cell(lng_hi) + 1)]
+    elif lng_hi > 180:
+        ranges = [(grid_cell(lng_lo) - 1, grid_cell(180.0) + 1), (grid_cell(-180.0) - 1, grid_cell(lng_hi - 360) + 1)]
+    else:
+        ranges = [(grid_cell(lng_lo) - 1, grid_cell(lng_hi) + 1)]
+    return lat_cells, ranges
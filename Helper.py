@@ -5,18 +5,48 @@ from typing import Dict
 import re
 from email_validator import validate_email, EmailNotValidError
 import string, random
+import threading
+from datetime import datetime
+import time
+import Config
+from ConnectionPool import ConnectionPool
+from Metrics import InstrumentedCursor, record_connection_acquire
 
+_pool = None
+_pool_lock = threading.Lock()
+
+def connect():
+    return mysql.connector.connect(
+        host = Config.DB_HOST,
+        port = Config.DB_PORT,
+        user = Config.DB_USER,
+        password = Config.DB_PASSWORD,
+        database = Config.DB_NAME)
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    connect,
+                    max_size = Config.POOL_SIZE,
+                    min_idle = Config.POOL_MIN_IDLE,
+                    checkout_timeout = Config.POOL_CHECKOUT_TIMEOUT,
+                    idle_timeout = Config.POOL_IDLE_TIMEOUT,
+                    ping_interval = Config.POOL_PING_INTERVAL,
+                    cursor_wrapper = InstrumentedCursor)
+    return _pool
+
+# Connections come from the shared pool; conn.close() hands them back instead of disconnecting
 def get_connection():
+    start = time.perf_counter()
     try:
-        return mysql.connector.connect(
-            host = "localhost",
-            user = "root",
-            password = "Configure1738",
-            database = "dpm2")
-
-        cursor = db.cursor(dictionary = True)
+        return get_pool().get()
     except mysql.connector.Error as err:
         print (f'Error:{err}')
+    finally:
+        record_connection_acquire(time.perf_counter() - start)
         
 def is_valid_email(email):
     try:
@@ -28,3 +58,16 @@ def is_valid_email(email):
 # Random password generator
 def generate_password(length=10):
     return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+
+# Parses client-supplied timestamps ("2025-05-01 09:00", ISO 8601); None passes through
+def parse_datetime(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Invalid date/time: {value}")
+    # Stored times are naive local DATETIMEs
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
@@ -1,5 +1,15 @@
+import argparse
+import csv
 import json
 import os
+import sys
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 USERS_FILE = 'users.json'
 
@@ -19,10 +29,212 @@ class User:
         return self.privilege
 
 
+# Users live in memory, keyed by username. users.json stays the snapshot, in the same format as
+# before; every change since the last snapshot is appended to users.json.log as one JSON line.
+# Each operation first catches up on lines other processes appended (a stat plus whatever is new),
+# so lookups and registrations cost O(1) rather than a parse and rewrite of the whole file.
+# Once the log holds more entries than half the users, it is folded into a new snapshot (compaction),
+# which keeps the amortised cost per write constant. The log's first line is a generation header
+# ({"op": "generation", "n": ...}) that compaction increments, which is how other processes notice
+# that the snapshot moved on; a log without one (an older store) is generation 0.
+# A lock file serialises writers across processes; readers take it shared where the OS allows.
+class UserStore:
+    def __init__(self, path=USERS_FILE, min_compact=1000, sync=False):
+        self.path = path
+        self.log_path = path + ".log"
+        self.lock_path = path + ".lock"
+        self.min_compact = min_compact
+        self.sync = sync
+        self.users = {}
+        self._generation = None  # generation of the log we have read, to notice compaction
+        self._log_offset = 0     # bytes of the log already applied
+        self._log_entries = 0
+        if not os.path.exists(self.path) or not os.path.exists(self.log_path):
+            with self._locked(exclusive=True):
+                if not os.path.exists(self.path):
+                    self._write_snapshot({})
+                if not os.path.exists(self.log_path):
+                    self._new_log(0)
+        with self._locked(exclusive=False):
+            self._reload()
+
+    @contextmanager
+    def _locked(self, exclusive):
+        with open(self.lock_path, "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            else:
+                # msvcrt only has exclusive byte-range locks; LK_LOCK gives up after ~10s, so keep trying
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def _read_header(file):
+        # Returns (generation, header length in bytes) of an open log
+        line = file.readline()
+        if line.endswith(b"\n"):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                entry = None
+            if isinstance(entry, dict) and entry.get("op") == "generation":
+                return entry["n"], len(line)
+        return 0, 0
+
+    def _new_log(self, generation):
+        # Swaps in an empty log carrying just its header; returns the header length
+        header = json.dumps({"op": "generation", "n": generation}, separators=(",", ":")).encode("utf-8") + b"\n"
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(header)
+        os.replace(tmp_path, self.log_path)
+        return len(header)
+
+    def _reload(self):
+        with open(self.path, "r") as file:
+            self.users = json.load(file)
+        self._generation, self._log_offset, self._log_entries = None, 0, 0
+        self._catch_up()
+
+    def _catch_up(self):
+        with open(self.log_path, "rb") as file:
+            generation, header_size = self._read_header(file)
+            compacted = self._generation is not None and generation != self._generation
+            if not compacted:
+                if self._generation is None:
+                    self._generation, self._log_offset = generation, header_size
+                file.seek(self._log_offset)
+                data = file.read()
+        if compacted:
+            # Another process compacted: the snapshot now holds what the old log did
+            self._reload()
+            return
+        if not data:
+            return
+        # A line without its newline is a write still in progress (or torn by a crash); leave it
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # blank, or the remains of a torn write
+            self._apply(entry)
+            self._log_entries += 1
+        self._log_offset += end
+
+    def _apply(self, entry):
+        if entry["op"] == "put":
+            self.users[entry["username"]] = {"password": entry["password"], "privilege": entry["privilege"]}
+        elif entry["op"] == "delete":
+            self.users.pop(entry["username"], None)
+
+    def _append(self, entries):
+        for entry in entries:
+            self._apply(entry)
+        if self._log_entries + len(entries) > max(self.min_compact, len(self.users) // 2):
+            # Would be compacted right after anyway (always the case for a big batch): one snapshot write
+            self._compact()
+            return
+
+        size = os.path.getsize(self.log_path)
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries).encode("utf-8")
+        if size > self._log_offset:
+            data = b"\n" + data  # terminate a torn line so it is skipped rather than merged into ours
+        with open(self.log_path, "ab") as file:
+            file.write(data)
+            file.flush()
+            if self.sync:
+                os.fsync(file.fileno())
+        self._log_offset = size + len(data)
+        self._log_entries += len(entries)
+
+    def _write_snapshot(self, users):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(users, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _compact(self):
+        # Called with the exclusive lock held and the index caught up
+        self._write_snapshot(self.users)
+        generation = self._generation + 1
+        self._log_offset = self._new_log(generation)
+        self._generation, self._log_entries = generation, 0
+
+    def get(self, username):
+        with self._locked(exclusive=False):
+            self._catch_up()
+            return self.users.get(username)
+
+    def get_many(self, usernames):
+        # One lock and one catch-up for a whole batch of lookups
+        with self._locked(exclusive=False):
+            self._catch_up()
+            return [self.users.get(username) for username in usernames]
+
+    def add(self, username, password, privilege):
+        # Returns False if the username is taken
+        with self._locked(exclusive=True):
+            self._catch_up()
+            if username in self.users:
+                return False
+            self._append([{"op": "put", "username": username, "password": password, "privilege": privilege}])
+            return True
+
+    def add_many(self, users):
+        # users: iterable of (username, password, privilege); one lock and one append for the lot.
+        # Returns one flag per user: False where the username was taken (or repeated in the batch).
+        with self._locked(exclusive=True):
+            self._catch_up()
+            entries, added, seen = [], [], set()
+            for username, password, privilege in users:
+                if username in self.users or username in seen:
+                    added.append(False)
+                    continue
+                seen.add(username)
+                added.append(True)
+                entries.append({"op": "put", "username": username, "password": password, "privilege": privilege})
+            if entries:
+                self._append(entries)
+            return added
+
+    def delete(self, username):
+        with self._locked(exclusive=True):
+            self._catch_up()
+            if username not in self.users:
+                return False
+            self._append([{"op": "delete", "username": username}])
+            return True
+
+    def all(self):
+        with self._locked(exclusive=False):
+            self._catch_up()
+            return dict(self.users)
+
+    def compact(self):
+        with self._locked(exclusive=True):
+            self._catch_up()
+            self._compact()
+
+
 class LoginSystem:
-    def __init__(self):
+    def __init__(self, store=None):
         self.current_user = None
-        self.initialize_users_file()
+        self.store = store or UserStore()
 
     def run(self):
         while True:
@@ -45,32 +257,11 @@ class LoginSystem:
             if self.current_user:
                 self.show_user_menu()
 
-    def initialize_users_file(self):
-        if not os.path.exists(USERS_FILE):
-            with open(USERS_FILE, 'w') as file:
-                json.dump({}, file)
-
-    def load_users(self):
-        try:
-            with open(USERS_FILE, 'r') as file:
-                return json.load(file)
-        except Exception as e:
-            print(f"Error loading users: {e}")
-            return {}
-
-    def save_users(self, users):
-        try:
-            with open(USERS_FILE, 'w') as file:
-                json.dump(users, file, indent=4)
-        except Exception as e:
-            print(f"Error saving users: {e}")
-
     def register_user(self):
         print("\n--- Registration ---")
         username = input("Enter username: ").strip()
 
-        users = self.load_users()
-        if username in users:
+        if self.store.get(username) is not None:
             print("Username already exists!")
             return
 
@@ -85,11 +276,9 @@ class LoginSystem:
             print("Invalid account type!")
             return
 
-        users[username] = {
-            "password": password,
-            "privilege": int(account_type)
-        }
-        self.save_users(users)
+        if not self.store.add(username, password, int(account_type)):
+            print("Username already exists!")
+            return
         print("Registration successful!")
 
     def login_user(self):
@@ -97,12 +286,11 @@ class LoginSystem:
         username = input("Enter username: ").strip()
         password = input("Enter password: ")
 
-        users = self.load_users()
-        if username not in users:
+        user_data = self.store.get(username)
+        if user_data is None:
             print("User not found!")
             return
 
-        user_data = users[username]
         if user_data["password"] == password:
             self.current_user = User(username, password, user_data["privilege"])
             print("Login successful!")
@@ -136,12 +324,17 @@ class LoginSystem:
         print(f"Account Type: {self.get_account_type_name(self.current_user.get_privilege())}")
         print(f"Privilege Level: {self.current_user.get_privilege()}")
 
-    def list_all_users(self):
-        users = self.load_users()
-        print("\n--- All Users ---")
-        for username, data in users.items():
-            privilege = data["privilege"]
-            print(f"Username: {username} | Type: {self.get_account_type_name(privilege)} | Privilege: {privilege}")
+    def list_all_users(self, page_size=20):
+        users = list(self.store.all().items())
+        print(f"\n--- All Users ({len(users)}) ---")
+        for start in range(0, len(users), page_size):
+            for username, data in users[start:start + page_size]:
+                privilege = data["privilege"]
+                print(f"Username: {username} | Type: {self.get_account_type_name(privilege)} | Privilege: {privilege}")
+            if start + page_size < len(users):
+                shown = min(start + page_size, len(users))
+                if input(f"-- {shown}/{len(users)} shown, Enter for more, q to stop: ").strip().lower() == 'q':
+                    break
 
     def get_account_type_name(self, privilege):
         return {
@@ -151,6 +344,101 @@ class LoginSystem:
         }.get(privilege, "Unknown")
 
 
+# Non-interactive batch mode: python LoginSystem.py <register|verify|list> ...
+# register/verify read a CSV (header row: username,password,privilege) or JSON Lines file and write
+# one JSON result per line; register takes the store's lock once and appends every new user in one write.
+
+def read_records(path):
+    with open(path, newline="") as f:
+        if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson"):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+
+def batch_register(store, records):
+    results = []
+    accepted = []  # (result, (username, password, privilege))
+    for index, record in enumerate(records):
+        username = (record.get("username") or "").strip()
+        password = record.get("password") or ""
+        try:
+            privilege = int(record.get("privilege"))
+        except (TypeError, ValueError):
+            privilege = None
+        if not username or not password:
+            results.append({"index": index, "username": username or None, "success": False, "message": "Username and password are required"})
+        elif privilege not in (1, 2, 3):
+            results.append({"index": index, "username": username, "success": False, "message": "Privilege must be 1, 2 or 3"})
+        else:
+            result = {"index": index, "username": username, "success": True}
+            results.append(result)
+            accepted.append((result, (username, password, privilege)))
+
+    for (result, _), added in zip(accepted, store.add_many([user for _, user in accepted])):
+        if not added:
+            result.update(success=False, message="Username already exists")
+    return results
+
+
+def batch_verify(store, records):
+    usernames = [(record.get("username") or "").strip() for record in records]
+    results = []
+    for index, (record, username, user) in enumerate(zip(records, usernames, store.get_many(usernames))):
+        ok = user is not None and user["password"] == (record.get("password") or "")
+        result = {"index": index, "username": username, "success": ok}
+        if ok:
+            result["privilege"] = user["privilege"]
+        else:
+            result["message"] = "User not found" if user is None else "Incorrect password"
+        results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DPM login system (interactive when run without a command)")
+    parser.add_argument("--users-file", default=USERS_FILE)
+    commands = parser.add_subparsers(dest="command")
+
+    for name, help_text in (("register", "Register users from a CSV or JSON Lines file"),
+                            ("verify", "Check username/password pairs from a CSV or JSON Lines file")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("input", help="CSV with a header row (username,password,privilege), or .jsonl")
+        command.add_argument("--output", default="-", help="where to write the results (default: stdout)")
+
+    listing = commands.add_parser("list", help="List users as JSON Lines")
+    listing.add_argument("--offset", type=int, default=0)
+    listing.add_argument("--limit", type=int, default=100, help="users per page; 0 for all")
+
+    args = parser.parse_args(argv)
+    store = UserStore(args.users_file)
+
+    if args.command is None:
+        LoginSystem(store).run()
+        return 0
+
+    if args.command == "list":
+        users = list(store.all().items())
+        end = args.offset + args.limit if args.limit else len(users)
+        for username, data in users[args.offset:end]:
+            print(json.dumps({"username": username, "privilege": data["privilege"]}))
+        print(f"Showing {min(end, len(users)) - min(args.offset, len(users))} of {len(users)} users.", file=sys.stderr)
+        return 0
+
+    records = read_records(args.input)
+    results = batch_register(store, records) if args.command == "register" else batch_verify(store, records)
+
+    out = open(args.output, "w") if args.output != "-" else sys.stdout
+    try:
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    succeeded = sum(1 for result in results if result["success"])
+    print(f"Done: {succeeded} of {len(results)} {'registered' if args.command == 'register' else 'verified'}.", file=sys.stderr)
+    return 0 if succeeded == len(results) else 1
+
+
 if __name__ == "__main__":
-    login_system = LoginSystem()
-    login_system.run()
+    sys.exit(main())
@@ -0,0 +1,199 @@
+# Maintenance commands for the DPM database.
+# Usage: python Manage.py <command> [options]
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+
+from Helper import connect
+from AttachmentStore import get_attachment_store
+from Provisioning import provision_users
+from RentSummary import rebuild_rent_counts
+
+
+# Moves attachment blobs still stored in JobRequestFiles.FileData into the attachment store,
+# one file at a time so memory never holds more than a single blob
+def migrate_attachments(args):
+    store = get_attachment_store()
+    conn = connect()
+    cursor = conn.cursor()
+    moved = 0
+    moved_bytes = 0
+    last_id = 0
+
+    try:
+        while True:
+            cursor.execute("""
+                SELECT FileID
+                FROM JobRequestFiles
+                WHERE StorageKey IS NULL AND FileID > %s
+                ORDER BY FileID
+                LIMIT %s
+            """, (last_id, args.batch_size))
+            file_ids = [row[0] for row in cursor.fetchall()]
+            if not file_ids:
+                break
+
+            for file_id in file_ids:
+                cursor.execute("SELECT FileData FROM JobRequestFiles WHERE FileID = %s", (file_id,))
+                data = cursor.fetchone()[0] or b""
+                storage_key, file_size = store.save(io.BytesIO(data))
+                del data
+
+                if args.keep_blobs:
+                    cursor.execute("""
+                        UPDATE JobRequestFiles SET StorageKey = %s, FileSize = %s
+                        WHERE FileID = %s
+                    """, (storage_key, file_size, file_id))
+                else:
+                    cursor.execute("""
+                        UPDATE JobRequestFiles SET StorageKey = %s, FileSize = %s, FileData = NULL
+                        WHERE FileID = %s
+                    """, (storage_key, file_size, file_id))
+                conn.commit()
+
+                moved += 1
+                moved_bytes += file_size
+                last_id = file_id
+
+            print(f"Moved {moved} files ({moved_bytes} bytes) so far...")
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"Done: {moved} files, {moved_bytes} bytes moved to the attachment store.")
+
+
+# Recomputes every technician's rating aggregates from the Ratings table (fixes drift)
+def rebuild_ratings(args):
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            UPDATE Technicians t
+            LEFT JOIN (
+                SELECT TechnicianID, SUM(Rating) AS RatingSum, COUNT(*) AS RatingCount
+                FROM Ratings
+                GROUP BY TechnicianID
+            ) r ON r.TechnicianID = t.TechnicianID
+            SET t.RatingSum = COALESCE(r.RatingSum, 0),
+                t.RatingCount = COALESCE(r.RatingCount, 0),
+                t.AvgRating = IF(r.RatingCount > 0, r.RatingSum / r.RatingCount, 0)
+        """)
+        updated = cursor.rowcount
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"Done: rating aggregates rebuilt, {updated} technicians changed.")
+
+
+# Recomputes PropertyRentSummary from Tenants (fixes drift in the rent dashboard counters)
+def rebuild_rent_summary(args):
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        updated = rebuild_rent_counts(cursor)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"Done: rent summary rebuilt ({updated} rows affected).")
+
+
+# Reads users from a CSV (header row: email,role,first_name,last_name,phone_number,skillset,property_id)
+# or JSON Lines file
+def read_users(path):
+    with open(path, newline="") as f:
+        if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson"):
+            return [json.loads(line) for line in f if line.strip()]
+        return [{key: value for key, value in row.items() if value != ""} for row in csv.DictReader(f)]
+
+
+# Bulk-creates users in one transaction and writes their generated credentials as JSON Lines
+def create_users(args):
+    users = read_users(args.input)
+    conn = connect()
+    conn.autocommit = False
+    cursor = conn.cursor()
+    try:
+        results = provision_users(cursor, users, args.batch_size)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    out = open(args.output, "w") if args.output != "-" else sys.stdout
+    try:
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    created = sum(1 for result in results if result['success'])
+    for result in results:
+        if not result['success']:
+            print(f"Skipped user {result['index'] + 1} ({result['email']}): {result['message']}", file=sys.stderr)
+    print(f"Done: {created} users created, {len(results) - created} skipped.", file=sys.stderr)
+
+
+# Deletes sessions that expired (or were revoked) more than --days ago, in small batches
+def purge_sessions(args):
+    conn = connect()
+    cursor = conn.cursor()
+    purged = 0
+    try:
+        while True:
+            cursor.execute("""
+                DELETE FROM Sessions
+                WHERE ExpiresAt < NOW() - INTERVAL %s DAY
+                   OR RevokedAt < NOW() - INTERVAL %s DAY
+                LIMIT 10000
+            """, (args.days, args.days))
+            conn.commit()
+            purged += cursor.rowcount
+            if cursor.rowcount < 10000:
+                break
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"Done: {purged} sessions purged.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DPM maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate-attachments", help="Move attachment blobs out of MySQL into the attachment store")
+    migrate.add_argument("--batch-size", type=int, default=100)
+    migrate.add_argument("--keep-blobs", action="store_true", help="Leave FileData in place after copying")
+    migrate.set_defaults(func=migrate_attachments)
+
+    ratings = commands.add_parser("rebuild-ratings", help="Recompute technician rating sums/counts from Ratings")
+    ratings.set_defaults(func=rebuild_ratings)
+
+    rent = commands.add_parser("rebuild-rent-summary", help="Recompute per-property paid/unpaid tenant counts from Tenants")
+    rent.set_defaults(func=rebuild_rent_summary)
+
+    users = commands.add_parser("create-users", help="Bulk-create users from a CSV or JSON Lines file")
+    users.add_argument("input", help="CSV with a header row, or .jsonl")
+    users.add_argument("--output", default="-", help="where to write the generated credentials (default: stdout)")
+    users.add_argument("--batch-size", type=int, default=500, help="rows per multi-row INSERT")
+    users.set_defaults(func=create_users)
+
+    sessions = commands.add_parser("purge-sessions", help="Delete expired and revoked sessions")
+    sessions.add_argument("--days", type=int, default=7, help="keep sessions that ended within this many days")
+    sessions.set_defaults(func=purge_sessions)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
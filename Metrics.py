@@ -0,0 +1,245 @@
+# Request, SQL and connection-pool instrumentation, exported in Prometheus text format at /metrics.
+# SQL timing comes from InstrumentedCursor, which wraps every cursor the pool hands out,
+# so handlers get it without any changes.
+import logging
+import threading
+import time
+
+from flask import g, has_request_context, request
+
+import Config
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 1000)
+
+slow_query_log = logging.getLogger("dpm.sql.slow")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = f'le="{_format_number(float(bound))}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {count}")
+                inf = _format_labels(self.labels, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_number(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+_metrics = []
+_collectors = []
+
+
+def register(metric):
+    _metrics.append(metric)
+    return metric
+
+
+# A collector is a callable returning [(name, type, help, label names, {label values: value})] computed at scrape time,
+# for values that already live elsewhere (pool and cache stats)
+def register_collector(collector):
+    _collectors.append(collector)
+
+
+def render():
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        for name, metric_type, help_text, label_names, samples in collector():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for label_values, value in samples.items():
+                lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+request_duration = register(Histogram(
+    "dpm_http_request_duration_seconds", "Time spent handling a request.", ("endpoint", "method", "status")))
+request_queries = register(Histogram(
+    "dpm_http_request_sql_queries", "SQL statements executed per request.", ("endpoint",), COUNT_BUCKETS))
+sql_duration = register(Histogram(
+    "dpm_sql_query_duration_seconds", "SQL statement execution time.", ("endpoint", "statement")))
+sql_rows = register(Histogram(
+    "dpm_sql_query_rows", "Rows returned or affected per SQL statement.", ("endpoint", "statement"), ROW_BUCKETS))
+slow_queries = register(Counter(
+    "dpm_sql_slow_queries_total", "SQL statements slower than the slow query threshold.", ("endpoint", "statement")))
+connection_acquire = register(Histogram(
+    "dpm_db_connection_acquire_seconds", "Time spent waiting for a pooled connection."))
+
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or "unmatched"
+    return "background"
+
+
+def _statement_type(operation):
+    if isinstance(operation, bytes):
+        operation = operation.decode(errors="replace")
+    words = operation.lstrip(" \t\r\n(").split(None, 1)
+    verb = words[0].upper() if words else ""
+    return verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE") else "OTHER"
+
+
+def record_connection_acquire(seconds):
+    connection_acquire.observe(seconds)
+
+
+class InstrumentedCursor:
+    # Times execute()/executemany() and counts the rows each statement returns or affects.
+    # Rows of a SELECT are only known once fetched, so they are recorded at the next execute() or close().
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._pending = None  # [endpoint, statement, rows]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count(1)
+            yield row
+
+    def _count(self, rows):
+        if self._pending is not None:
+            self._pending[2] += rows
+
+    def _flush(self):
+        if self._pending is not None:
+            endpoint, statement, rows = self._pending
+            sql_rows.observe(rows, endpoint, statement)
+            self._pending = None
+
+    def _run(self, method, operation, *args, **kwargs):
+        self._flush()
+        endpoint = _endpoint()
+        statement = _statement_type(operation)
+        start = time.perf_counter()
+        try:
+            return method(operation, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            sql_duration.observe(elapsed, endpoint, statement)
+            if has_request_context():
+                g.dpm_sql_queries = g.get("dpm_sql_queries", 0) + 1
+
+            if Config.SLOW_QUERY_MS and elapsed * 1000 >= Config.SLOW_QUERY_MS:
+                slow_queries.inc(1, endpoint, statement)
+                slow_query_log.warning("%.1f ms [%s] %s", elapsed * 1000, endpoint, " ".join(str(operation).split()))
+
+            rows = 0
+            if not getattr(self._cursor, "with_rows", False):
+                rows = max(getattr(self._cursor, "rowcount", 0) or 0, 0)
+            self._pending = [endpoint, statement, rows]
+
+    def execute(self, operation, *args, **kwargs):
+        return self._run(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._run(self._cursor.executemany, operation, *args, **kwargs)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count(len(rows))
+        return rows
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+
+def init_app(app):
+    if Config.SLOW_QUERY_MS and not slow_query_log.handlers:
+        handler = logging.FileHandler(Config.SLOW_QUERY_LOG_FILE) if Config.SLOW_QUERY_LOG_FILE else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s slow-query %(message)s"))
+        slow_query_log.addHandler(handler)
+        slow_query_log.setLevel(logging.WARNING)
+
+    @app.before_request
+    def _start_timer():
+        g.dpm_request_start = time.perf_counter()
+        g.dpm_sql_queries = 0
+
+    @app.after_request
+    def _record_request(response):
+        start = g.get("dpm_request_start")
+        if start is not None:
+            endpoint = request.endpoint or "unmatched"
+            request_duration.observe(time.perf_counter() - start, endpoint, request.method, str(response.status_code))
+            request_queries.observe(g.get("dpm_sql_queries", 0), endpoint)
+        return response
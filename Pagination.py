@@ -0,0 +1,114 @@
+# Keyset (cursor) pagination helpers for the list endpoints.
+# A cursor is the ORDER BY key of the last row of a page, so the next page is an index range scan
+# that starts right after it instead of an OFFSET that re-reads every earlier row.
+import base64
+import json
+from datetime import date, datetime
+
+import Config
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    payload = []
+    for value in values:
+        if isinstance(value, datetime):
+            payload.append({"dt": value.isoformat()})
+        elif isinstance(value, date):
+            payload.append({"d": value.isoformat()})
+        else:
+            payload.append(value)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, key_count):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidPageRequest("Invalid cursor")
+
+    if not isinstance(payload, list) or len(payload) != key_count:
+        raise InvalidPageRequest("Invalid cursor")
+
+    values = []
+    for value in payload:
+        try:
+            if isinstance(value, dict) and "dt" in value:
+                value = datetime.fromisoformat(value["dt"])
+            elif isinstance(value, dict) and "d" in value:
+                value = date.fromisoformat(value["d"])
+        except (TypeError, ValueError):
+            raise InvalidPageRequest("Invalid cursor")
+        if not isinstance(value, (int, str, float, datetime, date, type(None))) or isinstance(value, bool):
+            raise InvalidPageRequest("Invalid cursor")
+        values.append(value)
+    return values
+
+
+# Reads ?limit= and ?after= from the query string, capping limit at the server maximum
+def parse_page_args(args, key_count):
+    limit = args.get('limit')
+    if limit is None or limit == '':
+        limit = Config.DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidPageRequest("limit must be an integer")
+        if limit < 1:
+            raise InvalidPageRequest("limit must be at least 1")
+    limit = min(limit, Config.MAX_PAGE_SIZE)
+
+    after = args.get('after')
+    after = decode_cursor(after, key_count) if after else None
+    return limit, after
+
+
+# Builds the "rows strictly after the cursor" predicate for a (possibly composite) ORDER BY key,
+# e.g. (a < %s OR (a = %s AND b < %s)) for ORDER BY a DESC, b DESC.
+# MySQL sorts NULL before every value: first ascending, last descending. Columns listed in nullable
+# get the IS NULL branches that ordering needs, and a NULL cursor value is compared with IS NULL,
+# never "= NULL" or "> NULL" (which match nothing and would end the listing early).
+def keyset_condition(columns, after, descending=False, nullable=()):
+    op = "<" if descending else ">"
+    terms = []
+    params = []
+    for i, column in enumerate(columns):
+        parts = []
+        term_params = []
+        for prev, value in zip(columns[:i], after[:i]):
+            if value is None:
+                parts.append(f"{prev} IS NULL")
+            else:
+                parts.append(f"{prev} = %s")
+                term_params.append(value)
+        value = after[i]
+        if value is None:
+            if descending:
+                continue  # nothing sorts after NULL
+            parts.append(f"{column} IS NOT NULL")
+        elif descending and column in nullable:
+            parts.append(f"({column} {op} %s OR {column} IS NULL)")
+            term_params.append(value)
+        else:
+            parts.append(f"{column} {op} %s")
+            term_params.append(value)
+        terms.append("(" + " AND ".join(parts) + ")")
+        params.extend(term_params)
+    if not terms:
+        return "FALSE", params
+    return "(" + " OR ".join(terms) + ")", params
+
+
+# Callers fetch limit + 1 rows; the extra row only tells us whether another page exists
+def split_page(rows, limit, key_fields):
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([last[field] for field in key_fields])
@@ -0,0 +1,136 @@
+# Password hashing with scrypt (standard library, no extra dependency).
+# Stored format: scrypt$<n>$<r>$<p>$<salt>$<hash>, base64 salt and hash. Rows still holding a
+# plaintext password (from before hashing) verify against the plaintext and report needs_rehash,
+# as do hashes made with older cost settings, so login upgrades them in place.
+# Hashing is deliberately slow, so it runs on a small bounded thread pool (scrypt releases the GIL):
+# a burst of logins queues there, up to PASSWORD_HASH_MAX_PENDING, instead of tying up every request thread.
+# Bulk provisioning hashes on a separate pool, so a large batch never queues in front of logins.
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import Config
+from Cache import TTLCache
+
+PREFIX = "scrypt"
+
+
+class HasherBusy(Exception):
+    pass
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _scrypt(password, salt, n, r, p):
+    # scrypt needs 128 * r * n bytes; leave headroom over OpenSSL's 32 MiB default limit
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, dklen=32, maxmem=256 * r * n + 1024 * 1024)
+
+
+def hash_password(password, n=None, r=None, p=None):
+    n = n or Config.PASSWORD_SCRYPT_N
+    r = r or Config.PASSWORD_SCRYPT_R
+    p = p or Config.PASSWORD_SCRYPT_P
+    salt = secrets.token_bytes(16)
+    return f"{PREFIX}${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def is_hashed(stored):
+    return bool(stored) and stored.startswith(PREFIX + "$")
+
+
+def needs_rehash(stored):
+    if not is_hashed(stored):
+        return True
+    _, n, r, p, _, _ = stored.split("$")
+    return (int(n), int(r), int(p)) != (Config.PASSWORD_SCRYPT_N, Config.PASSWORD_SCRYPT_R, Config.PASSWORD_SCRYPT_P)
+
+
+def verify_password(password, stored):
+    if not stored:
+        return False
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    try:
+        _, n, r, p, salt, expected = stored.split("$")
+        computed = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(computed, base64.b64decode(expected))
+
+
+# Remembers recent successful verifications so repeat logins skip scrypt. Keys are an HMAC of the
+# password under a per-process secret plus the stored hash, so a password change misses naturally.
+_cache_key = secrets.token_bytes(32)
+_verified = TTLCache(Config.PASSWORD_VERIFY_CACHE_SIZE, Config.PASSWORD_VERIFY_CACHE_TTL)
+
+
+def _verified_key(password, stored):
+    return hmac.new(_cache_key, password.encode("utf-8") + b"\0" + stored.encode("utf-8"), hashlib.sha256).digest()
+
+
+# A stand-in hash so unknown emails cost as much as wrong passwords. Only its cost settings matter,
+# so it is made from random bytes here rather than by running scrypt on a request thread.
+_dummy_hash = (f"{PREFIX}${Config.PASSWORD_SCRYPT_N}${Config.PASSWORD_SCRYPT_R}${Config.PASSWORD_SCRYPT_P}$"
+               f"{_b64(secrets.token_bytes(16))}${_b64(secrets.token_bytes(32))}")
+
+_executor = None
+_executor_pid = None
+_bulk_executor = None
+_bulk_executor_pid = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(max(Config.PASSWORD_HASH_MAX_PENDING, 1))
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(Config.PASSWORD_HASH_WORKERS, thread_name_prefix="dpm-password")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _get_bulk_executor():
+    global _bulk_executor, _bulk_executor_pid
+    with _executor_lock:
+        if _bulk_executor is None or _bulk_executor_pid != os.getpid():
+            _bulk_executor = ThreadPoolExecutor(Config.PASSWORD_BULK_HASH_WORKERS, thread_name_prefix="dpm-password-bulk")
+            _bulk_executor_pid = os.getpid()
+        return _bulk_executor
+
+
+def run_bounded(func, *args):
+    # Refuse instead of queueing without limit; the caller answers 503 and the client retries
+    if not _pending.acquire(timeout=Config.PASSWORD_HASH_QUEUE_TIMEOUT):
+        raise HasherBusy("Too many password operations in progress")
+    try:
+        return _get_executor().submit(func, *args).result()
+    finally:
+        _pending.release()
+
+
+def hash_passwords(passwords):
+    # Bulk provisioning: its own pool, so logins keep their threads however big the batch
+    return list(_get_bulk_executor().map(hash_password, passwords))
+
+
+# Returns (ok, needs_rehash) for a login attempt; stored is None for unknown emails
+def check_password(password, stored):
+    if stored is None:
+        run_bounded(verify_password, password, _dummy_hash)
+        return False, False
+
+    key = _verified_key(password, stored) if Config.PASSWORD_VERIFY_CACHE_TTL else None
+    if key is not None and _verified.get(key):
+        return True, needs_rehash(stored)
+
+    ok = run_bounded(verify_password, password, stored) if is_hashed(stored) else verify_password(password, stored)
+    if ok and key is not None:
+        _verified.set(key, True)
+    return ok, ok and needs_rehash(stored)
@@ -0,0 +1,131 @@
+# Bulk user provisioning, shared by POST /api/users/batch and `python Manage.py create-users`.
+# Existing emails are found with one IN query per chunk, then Users and the role tables are filled
+# with multi-row INSERTs. Nothing is committed here: the caller commits once for the whole batch.
+import Config
+from Helper import generate_password
+from Passwords import hash_passwords
+from RentSummary import adjust_rent_counts
+
+ROLES = ("Manager", "Technician", "Tenant")
+
+
+def _failure(index, email, message):
+    return {"index": index, "success": False, "email": email, "message": message}
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+# Creates the accounts described by `users` (dicts with email, role, first_name, last_name,
+# phone_number and, per role, skillset or property_id). Returns one result per input item,
+# in input order; created items carry user_id and the generated password.
+def provision_users(cursor, users, chunk_size=None):
+    chunk_size = chunk_size or Config.BATCH_INSERT_CHUNK
+    results = [None] * len(users)
+    candidates = []  # (index, normalised user)
+    seen = set()
+
+    for index, item in enumerate(users):
+        if not isinstance(item, dict):
+            results[index] = _failure(index, None, "Each user must be an object")
+            continue
+        email = (item.get('email') or '').strip()
+        role = item.get('role')
+        if not email or not role:
+            results[index] = _failure(index, email or None, "Email and role are required")
+            continue
+        if role not in ROLES:
+            results[index] = _failure(index, email, f"Role must be one of {', '.join(ROLES)}")
+            continue
+        if email.lower() in seen:
+            results[index] = _failure(index, email, "Duplicate email in batch")
+            continue
+        property_id = item.get('property_id')
+        if role == "Tenant" and property_id not in (None, ''):
+            try:
+                property_id = int(property_id)
+            except (TypeError, ValueError):
+                results[index] = _failure(index, email, "property_id must be an integer")
+                continue
+        else:
+            property_id = None
+        seen.add(email.lower())
+        candidates.append((index, {
+            "email": email,
+            "role": role,
+            "first_name": item.get('first_name'),
+            "last_name": item.get('last_name'),
+            "phone_number": item.get('phone_number'),
+            "skillset": item.get('skillset') or '',
+            "property_id": property_id,
+        }))
+
+    existing = set()
+    for chunk in _chunks([user['email'] for _, user in candidates], chunk_size):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"SELECT Email FROM Users WHERE Email IN ({placeholders})", chunk)
+        existing.update(row[0].lower() for row in cursor.fetchall())
+
+    property_ids = sorted({user['property_id'] for _, user in candidates if user['property_id'] is not None})
+    known_properties = set()
+    for chunk in _chunks(property_ids, chunk_size):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"SELECT PropertyID FROM Properties WHERE PropertyID IN ({placeholders})", chunk)
+        known_properties.update(row[0] for row in cursor.fetchall())
+
+    accepted = []
+    for index, user in candidates:
+        if user['email'].lower() in existing:
+            results[index] = _failure(index, user['email'], "User already exists")
+        elif user['property_id'] is not None and user['property_id'] not in known_properties:
+            results[index] = _failure(index, user['email'], "Property not found")
+        else:
+            user['password'] = generate_password()
+            accepted.append((index, user))
+
+    # scrypt is the slow part of a large batch; spread it over the hashing pool
+    for (_, user), password_hash in zip(accepted, hash_passwords([user['password'] for _, user in accepted])):
+        user['password_hash'] = password_hash
+
+    for chunk in _chunks(accepted, chunk_size):
+        cursor.executemany("""
+            INSERT INTO Users (Email, PasswordHash, Role, FirstName, LastName, PhoneNumber)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [(user['email'], user['password_hash'], user['role'], user['first_name'], user['last_name'], user['phone_number'])
+              for _, user in chunk])
+        # AUTO_INCREMENT values need not be consecutive, so read the IDs back by email, which is unique
+        # (an email registered concurrently makes the INSERT above fail and the caller roll back)
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"SELECT UserID, Email FROM Users WHERE Email IN ({placeholders})",
+                       [user['email'] for _, user in chunk])
+        user_ids = {email.lower(): user_id for user_id, email in cursor.fetchall()}
+        for _, user in chunk:
+            user['user_id'] = user_ids[user['email'].lower()]
+
+        technicians = [(user['user_id'], user['skillset'], 0.0) for _, user in chunk if user['role'] == "Technician"]
+        if technicians:
+            cursor.executemany("""
+                INSERT INTO Technicians (UserID, Skillset, AvgRating)
+                VALUES (%s, %s, %s)
+            """, technicians)
+
+        tenants = [(user['user_id'], user['property_id']) for _, user in chunk if user['role'] == "Tenant"]
+        if tenants:
+            cursor.executemany("""
+                INSERT INTO Tenants (UserID, PropertyID, MoveOutRequested, RentStatus)
+                VALUES (%s, %s, FALSE, 'Unpaid')
+            """, tenants)
+            adjust_rent_counts(cursor, [(property_id, None, 'Unpaid') for _, property_id in tenants])
+
+    for index, user in accepted:
+        results[index] = {
+            "index": index,
+            "success": True,
+            "user_id": user['user_id'],
+            "email": user['email'],
+            "role": user['role'],
+            "password": user['password'],
+        }
+    return results
@@ -0,0 +1,160 @@
+# Sliding-window rate limiting for /api/login, kept in process memory.
+# Each key holds three numbers: the start of the current fixed window and the counts of the current
+# and previous windows. The sliding count is the current count plus the previous one weighted by how
+# much of it still overlaps the window, which tracks a true sliding log closely without storing
+# timestamps. Keys live in an LRU of bounded size, so a flood of distinct emails or addresses cannot
+# grow memory; the least recently seen keys are evicted first.
+# Limits are per process: with N gunicorn workers an attacker gets up to N times the configured limit.
+import threading
+import time
+from collections import OrderedDict
+
+import Config
+import Metrics
+
+throttle_checks = Metrics.register(Metrics.Counter(
+    "dpm_login_throttle_total", "Login attempts checked by the rate limiter, by scope and outcome.", ("scope", "outcome")))
+
+
+class SlidingWindowLimiter:
+    def __init__(self, limit, window, max_keys):
+        self.limit = limit
+        self.window = float(window)
+        self.max_keys = max_keys
+        self._entries = OrderedDict()  # key -> [window start, previous count, current count]
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _roll(self, entry, now):
+        elapsed = int((now - entry[0]) // self.window)
+        if elapsed == 1:
+            entry[1], entry[2] = entry[2], 0
+        elif elapsed > 1:
+            entry[1] = entry[2] = 0
+        if elapsed:
+            entry[0] += elapsed * self.window
+
+    def _estimate(self, entry, now):
+        overlap = 1.0 - (now - entry[0]) / self.window
+        return entry[2] + entry[1] * overlap
+
+    def _wait(self, entry, now):
+        if self._estimate(entry, now) < self.limit:
+            return 0
+        if entry[2] >= self.limit:
+            # The current window alone is full: it has to become the previous one and then decay until
+            # entry[2] * (1 - elapsed / window) < limit, counted from the start of the next window
+            needed = 1.0 - self.limit / entry[2]
+            return max(1, int(entry[0] + (1.0 + needed) * self.window - now) + 1)
+        # Only the previous window's weight is in the way; it decays linearly over this window
+        needed = (entry[2] + entry[1] - self.limit + 1) / entry[1] if entry[1] else 1.0
+        return max(1, int(entry[0] + needed * self.window - now) + 1)
+
+    def _entry(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [now - now % self.window, 0, 0]
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._roll(entry, now)
+            self._entries.move_to_end(key)
+        return entry
+
+    def retry_after(self, key, now=None):
+        # Seconds until another attempt would be allowed, or 0 if it is allowed now
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0
+            self._roll(entry, now)
+            return self._wait(entry, now)
+
+    def hit(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._entry(key, now)[2] += 1
+
+    def acquire(self, key, now=None):
+        # Checks and counts in one step, so parallel attempts cannot all pass before any is counted.
+        # Returns 0 if the attempt was counted, otherwise the seconds to wait (nothing is counted).
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entry(key, now)
+            wait = self._wait(entry, now)
+            if not wait:
+                entry[2] += 1
+            return wait
+
+    def refund(self, key, now=None):
+        # Takes back one acquire()d attempt
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            self._roll(entry, now)
+            if entry[2]:
+                entry[2] -= 1
+            elif entry[1]:
+                entry[1] -= 1
+
+    def reset(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "keys": len(self._entries),
+                "max_keys": self.max_keys,
+                "limit": self.limit,
+                "window_seconds": self.window,
+                "evictions": self.evictions,
+            }
+
+
+# Every attempt counts against the client address. Attempts against an email are counted before the
+# password check too (a burst of parallel guesses would otherwise all pass before the first failure
+# is recorded), and a successful login clears them, so users are never locked out by their successes.
+ip_limiter = SlidingWindowLimiter(Config.LOGIN_IP_LIMIT, Config.LOGIN_WINDOW_SECONDS, Config.LOGIN_LIMITER_MAX_KEYS)
+email_limiter = SlidingWindowLimiter(Config.LOGIN_EMAIL_LIMIT, Config.LOGIN_WINDOW_SECONDS, Config.LOGIN_LIMITER_MAX_KEYS)
+
+
+# Returns the number of seconds to tell a blocked client to wait, or 0 if the attempt may proceed.
+# An allowed attempt is counted against both the address and the email immediately.
+def check_login(ip, email):
+    if not Config.LOGIN_RATE_LIMIT:
+        return 0
+    wait = ip_limiter.acquire(ip)
+    if wait:
+        throttle_checks.inc(1, "ip", "blocked")
+        return wait
+    wait = email_limiter.acquire(email)
+    if wait:
+        # Blocked attempts do not use up the address's allowance
+        ip_limiter.refund(ip)
+        throttle_checks.inc(1, "email", "blocked")
+        return wait
+    throttle_checks.inc(1, "ip", "allowed")
+    return 0
+
+
+def record_login_success(email):
+    if Config.LOGIN_RATE_LIMIT:
+        email_limiter.reset(email)
+
+
+def collect_limiter_metrics():
+    stats = {"ip": ip_limiter.stats(), "email": email_limiter.stats()}
+    return [
+        ("dpm_login_throttle_keys", "gauge", "Keys currently tracked by the login rate limiter.", ("scope",),
+         {(scope,): s["keys"] for scope, s in stats.items()}),
+        ("dpm_login_throttle_evictions_total", "counter", "Keys evicted from the login rate limiter to bound memory.", ("scope",),
+         {(scope,): s["evictions"] for scope, s in stats.items()}),
+    ]
+
+
+Metrics.register_collector(collect_limiter_metrics)
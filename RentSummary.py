@@ -0,0 +1,47 @@
+# Paid/unpaid tenant counts per property, kept in PropertyRentSummary so the rent dashboard reads
+# one row per property instead of scanning Tenants. Every write that adds, removes or changes a
+# tenant's rent status calls adjust_rent_counts() on its own cursor, inside its own transaction.
+# Recompute with: python Manage.py rebuild-rent-summary
+from collections import defaultdict
+
+STATUSES = ("Paid", "Unpaid")
+
+
+# changes: iterable of (property_id, old_status, new_status); None for a tenant being added or removed
+def adjust_rent_counts(cursor, changes):
+    deltas = defaultdict(lambda: [0, 0])  # property id -> [paid delta, unpaid delta]
+    for property_id, old_status, new_status in changes:
+        if property_id is None or old_status == new_status:
+            continue
+        if old_status in STATUSES:
+            deltas[property_id][STATUSES.index(old_status)] -= 1
+        if new_status in STATUSES:
+            deltas[property_id][STATUSES.index(new_status)] += 1
+
+    rows = [(property_id, paid, unpaid) for property_id, (paid, unpaid) in sorted(deltas.items()) if paid or unpaid]
+    if not rows:
+        return
+    # Sorted by property so concurrent writers take the counter row locks in the same order
+    cursor.executemany("""
+        INSERT INTO PropertyRentSummary (PropertyID, PaidCount, UnpaidCount)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            PaidCount = PaidCount + VALUES(PaidCount),
+            UnpaidCount = UnpaidCount + VALUES(UnpaidCount)
+    """, rows)
+
+
+def rebuild_rent_counts(cursor):
+    cursor.execute("""
+        INSERT INTO PropertyRentSummary (PropertyID, PaidCount, UnpaidCount)
+        SELECT p.PropertyID,
+               COALESCE(SUM(t.RentStatus = 'Paid'), 0),
+               COALESCE(SUM(t.RentStatus = 'Unpaid'), 0)
+        FROM Properties p
+        LEFT JOIN Tenants t ON t.PropertyID = p.PropertyID
+        GROUP BY p.PropertyID
+        ON DUPLICATE KEY UPDATE
+            PaidCount = VALUES(PaidCount),
+            UnpaidCount = VALUES(UnpaidCount)
+    """)
+    return cursor.rowcount
@@ -0,0 +1,133 @@
+# Bearer tokens for the API. /api/login stores a row in Sessions and hands back
+# "<user id>.<session id>.<signature>", the signature being an HMAC-SHA256 under SESSION_SECRET,
+# so forged or mangled tokens are turned away without a lookup. Validated sessions are cached per
+# process: the hot path is one HMAC and one cache hit, no database round trip.
+# Revocation marks the rows in the caller's transaction and drops them from this process's cache;
+# other processes stop accepting them once their cached copy expires (SESSION_CACHE_TTL).
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from datetime import datetime, timedelta
+
+from flask import after_this_request, g, has_request_context, request
+
+import Config
+from Cache import TTLCache
+from Helper import get_connection
+
+log = logging.getLogger("dpm.sessions")
+
+if Config.SESSION_SECRET:
+    _secret = Config.SESSION_SECRET.encode("utf-8")
+elif Config.REQUIRE_AUTH:
+    # A per-process secret would make most requests fail with 401 under more than one worker
+    raise RuntimeError("DPM_REQUIRE_AUTH is on but DPM_SESSION_SECRET is not set; "
+                       "set it to the same random value for every worker process")
+else:
+    # Tokens then only validate in the process that issued them (or its forks, with preload_app)
+    _secret = secrets.token_bytes(32)
+    log.warning("DPM_SESSION_SECRET is not set; using a random per-process secret")
+
+# (user id, session id) -> {"user_id", "role", "expires_at"}, or False for a revoked/unknown session
+session_cache = TTLCache(Config.SESSION_CACHE_SIZE, Config.SESSION_CACHE_TTL)
+
+
+def _sign(value):
+    digest = hmac.new(_secret, value.encode("ascii"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def parse_token(token):
+    # Returns (user id, session id) for a correctly signed token, None otherwise
+    try:
+        user_id, session_id, signature = token.split(".")
+        user_id = int(user_id)
+    except (AttributeError, ValueError):
+        return None
+    if not hmac.compare_digest(signature, _sign(f"{user_id}.{session_id}")):
+        return None
+    return user_id, session_id
+
+
+def create_session(cursor, user_id, role):
+    session_id = secrets.token_urlsafe(24)
+    expires_at = datetime.now() + timedelta(seconds=Config.SESSION_TTL)
+    cursor.execute("""
+        INSERT INTO Sessions (SessionID, UserID, Role, ExpiresAt)
+        VALUES (%s, %s, %s, %s)
+    """, (session_id, user_id, role, expires_at))
+    session_cache.set((user_id, session_id), {"user_id": user_id, "role": role, "expires_at": expires_at.timestamp()})
+    return f"{user_id}.{session_id}.{_sign(f'{user_id}.{session_id}')}", expires_at
+
+
+def _load_session(user_id, session_id):
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT Role, ExpiresAt
+            FROM Sessions
+            WHERE SessionID = %s AND UserID = %s AND RevokedAt IS NULL AND ExpiresAt > NOW()
+        """, (session_id, user_id))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    if row is None:
+        return False
+    return {"user_id": user_id, "role": row['Role'], "expires_at": row['ExpiresAt'].timestamp()}
+
+
+def validate_token(token):
+    parsed = parse_token(token)
+    if parsed is None:
+        return None
+    session = session_cache.get(parsed)
+    if session is None:
+        # Issued by another process, or fallen out of the cache: one lookup, then cached again
+        session = _load_session(*parsed)
+        session_cache.set(parsed, session)
+    if not session or session["expires_at"] <= time.time():
+        return None
+    return session
+
+
+# The session behind the request's Authorization header, or None; validated once per request
+def current_session():
+    if "session" not in g:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        g.session = validate_token(token.strip()) if scheme.lower() == "bearer" else None
+    return g.session
+
+
+def _forget(predicate):
+    session_cache.delete_where(predicate)
+    # Drop again once the response is out, in case a request re-cached the session before the commit
+    if has_request_context():
+        @after_this_request
+        def _forget_after_commit(response):
+            session_cache.delete_where(predicate)
+            return response
+
+
+def revoke_session(cursor, token):
+    parsed = parse_token(token)
+    if parsed is None:
+        return False
+    cursor.execute("""
+        UPDATE Sessions SET RevokedAt = NOW(6)
+        WHERE SessionID = %s AND UserID = %s AND RevokedAt IS NULL
+    """, (parsed[1], parsed[0]))
+    _forget(lambda key: key == parsed)
+    return cursor.rowcount > 0
+
+
+def revoke_user_sessions(cursor, user_id):
+    cursor.execute("""
+        UPDATE Sessions SET RevokedAt = NOW(6)
+        WHERE UserID = %s AND RevokedAt IS NULL
+    """, (user_id,))
+    _forget(lambda key: key[0] == user_id)
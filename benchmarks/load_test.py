@@ -0,0 +1,304 @@
+# Drives the real DPM API endpoints at a configurable concurrency and reports throughput,
+# p50/p95/p99 latency and DB round trips per request as JSON.
+#
+# Run the API against a database seeded by seed_data.py, then:
+#   python benchmarks/load_test.py --base-url http://localhost:5150 --concurrency 32 --duration 60 --output run.json
+#   python benchmarks/load_test.py ... --baseline last_release.json   # exits 1 on regression
+#
+# DB round trips come from the server's /metrics (dpm_http_request_sql_queries). /metrics is per
+# process, so run the server with a single worker process when that number matters.
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+# name -> (Flask endpoint measured in /metrics, default weight)
+SCENARIOS = {
+    "login": ("api.login", 10),
+    "list_tenants": ("api.get_all_tenants", 15),
+    "list_jobs": ("api.view_all_job_requests", 25),
+    "technician_jobs": ("api.get_assigned_jobs", 15),
+    "assign": ("api.reassign_job", 10),
+    "rate": ("api.submit_rating", 5),
+    "upload": ("api.submit_job_request", 5),
+    "download": ("api.download_job_file", 15),
+}
+
+
+class Client:
+    # One keep-alive HTTP connection per worker thread
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        for attempt in range(2):
+            if self.conn is None:
+                cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+                self.conn = cls(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                return response.status, data
+            except (http.client.HTTPException, OSError):
+                # Includes timeouts: the connection may still have a response in flight, so drop it
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+
+def multipart(fields, file_field, filename, content):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append((f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                  f'Content-Type: application/octet-stream\r\n\r\n').encode() + content + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+class Workload:
+    def __init__(self, manifest, args):
+        self.manifest = manifest
+        self.args = args
+        self.rateable = list(manifest.get("rateable_jobs", []))
+        self.rateable_lock = threading.Lock()
+        self.upload_body = os.urandom(args.upload_size)
+
+    def run(self, name, client, rng):
+        m = self.manifest
+        if name == "login":
+            return client.request("POST", "/api/login", {"email": rng.choice(m["login_emails"]), "password": m["password"]})
+        if name == "list_tenants":
+            return client.request("GET", "/api/tenants?limit=100")
+        if name == "list_jobs":
+            return client.request("GET", "/api/jobrequests?limit=100")
+        if name == "technician_jobs":
+            return client.request("GET", f"/api/technicians/{rng.choice(m['technician_ids'])}/jobs?limit=50")
+        if name == "assign":
+            job_id = rng.randint(*m["job_ids"])
+            return client.request("PUT", f"/api/jobrequests/{job_id}/assign", {"technician_id": rng.choice(m["technician_ids"])})
+        if name == "rate":
+            with self.rateable_lock:
+                job = self.rateable.pop() if self.rateable else None
+            if job is None:
+                return None
+            job_id, tenant_id, technician_id = job
+            return client.request("POST", "/api/ratings", {
+                "job_id": job_id, "tenant_id": tenant_id, "technician_id": technician_id, "rating": rng.randint(1, 5)})
+        if name == "upload":
+            tenant_id, property_id = rng.choice(m["tenants"])
+            body, headers = multipart({
+                "tenant_id": tenant_id, "property_id": property_id, "job_type": "Plumbing",
+                "description": "Load test upload", "urgency": rng.randint(1, 5)}, "file", "photo.jpg", self.upload_body)
+            return client.request("POST", "/api/jobrequests", body, headers)
+        if name == "download":
+            if not m.get("file_ids"):
+                return None
+            return client.request("GET", f"/api/files/{rng.randint(*m['file_ids'])}/download")
+        raise ValueError(name)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def scrape_query_counts(base_url, timeout):
+    # {endpoint: (sum of SQL statements, number of requests)} from dpm_http_request_sql_queries
+    try:
+        status, body = Client(base_url, timeout).request("GET", "/metrics")
+    except (OSError, http.client.HTTPException):
+        return {}
+    if status != 200:
+        return {}
+    totals = defaultdict(lambda: [0.0, 0.0])
+    pattern = re.compile(r'^dpm_http_request_sql_queries_(sum|count)\{endpoint="([^"]+)"\} ([0-9.e+-]+)$')
+    for line in body.decode().splitlines():
+        match = pattern.match(line)
+        if match:
+            kind, endpoint, value = match.groups()
+            totals[endpoint][0 if kind == "sum" else 1] += float(value)
+    return totals
+
+
+def summarise(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else None,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else None,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3) if count else None,
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3) if count else None,
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3) if count else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    weights = {name: weight for name, (_, weight) in SCENARIOS.items()}
+    for override in args.mix or []:
+        name, _, weight = override.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario: {name}")
+        weights[name] = float(weight)
+    names = [name for name, weight in weights.items() if weight > 0]
+    name_weights = [weights[name] for name in names]
+
+    workload = Workload(manifest, args)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    stop_at = time.monotonic() + args.warmup + args.duration
+    measure_from = time.monotonic() + args.warmup
+    before = {}
+
+    def worker(index):
+        rng = random.Random(args.seed + index)
+        client = Client(args.base_url, args.timeout)
+        local_latencies = defaultdict(list)
+        local_errors = defaultdict(int)
+        while time.monotonic() < stop_at:
+            name = rng.choices(names, name_weights)[0]
+            start = time.perf_counter()
+            try:
+                result = workload.run(name, client, rng)
+                failed = result is not None and result[0] >= 500
+            except (OSError, http.client.HTTPException):
+                result, failed = True, True
+            elapsed = time.perf_counter() - start
+            if result is None or time.monotonic() < measure_from:
+                continue
+            local_latencies[name].append(elapsed)
+            if failed:
+                local_errors[name] += 1
+        with lock:
+            for name, values in local_latencies.items():
+                latencies[name].extend(values)
+            for name, count in local_errors.items():
+                errors[name] += count
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    if args.warmup:
+        time.sleep(args.warmup)
+    before = scrape_query_counts(args.base_url, args.timeout)
+    started = time.monotonic()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    after = scrape_query_counts(args.base_url, args.timeout)
+
+    scenarios = {}
+    for name in names:
+        summary = summarise(latencies[name], errors[name], elapsed)
+        endpoint = SCENARIOS[name][0]
+        queries = after.get(endpoint, [0, 0])[0] - before.get(endpoint, [0, 0])[0]
+        served = after.get(endpoint, [0, 0])[1] - before.get(endpoint, [0, 0])[1]
+        summary["db_round_trips_per_request"] = round(queries / served, 2) if served else None
+        scenarios[name] = summary
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "meta": {
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 2),
+            "warmup_s": args.warmup,
+            "mix": dict(zip(names, name_weights)),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": git_revision(),
+        },
+        "overall": summarise(all_latencies, sum(errors.values()), elapsed),
+        "scenarios": scenarios,
+    }
+
+
+# Compares p95 latency and throughput with a previous run; returns a list of human-readable regressions
+def compare(result, baseline, tolerance):
+    regressions = []
+    for name, current in result["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not current["requests"] or not previous.get("requests"):
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s")
+        previous_trips = previous.get("db_round_trips_per_request")
+        current_trips = current.get("db_round_trips_per_request")
+        if previous_trips is not None and current_trips is not None and current_trips > previous_trips:
+            regressions.append(f"{name}: DB round trips {previous_trips} -> {current_trips} per request")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the DPM API")
+    parser.add_argument("--base-url", default="http://localhost:5150")
+    parser.add_argument("--manifest", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "seed_manifest.json"))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=60.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before the run")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--upload-size", type=int, default=512 * 1024)
+    parser.add_argument("--mix", nargs="*", metavar="SCENARIO=WEIGHT", help=f"override weights of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=1738)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="previous JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed regression fraction")
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# Measures password verification throughput (verifications per second) for several scrypt cost
+# settings and hashing pool sizes, to pick PASSWORD_SCRYPT_N / PASSWORD_HASH_WORKERS for a host.
+# Each run pushes --logins verifications through Passwords.run_bounded from --concurrency client
+# threads, the way a burst of concurrent /api/login requests would.
+#
+#   python benchmarks/login_hashing.py [--cost 8192 16384 32768] [--workers 1 2 4] [--output report.json]
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Config  # noqa: E402
+import Passwords  # noqa: E402
+
+PASSWORD = "bench-password-123"
+
+
+def reset_pool(workers):
+    Config.PASSWORD_HASH_WORKERS = workers
+    with Passwords._executor_lock:
+        if Passwords._executor is not None:
+            Passwords._executor.shutdown()
+        Passwords._executor = None
+
+
+def run_case(n, workers, args):
+    reset_pool(workers)
+    stored = Passwords.hash_password(PASSWORD, n=n)
+    latencies = []
+    busy = 0
+    lock = threading.Lock()
+
+    def attempt(_):
+        nonlocal busy
+        start = time.perf_counter()
+        try:
+            Passwords.run_bounded(Passwords.verify_password, PASSWORD, stored)
+        except Passwords.HasherBusy:
+            with lock:
+                busy += 1
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as clients:
+        list(clients.map(attempt, range(args.logins)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "scrypt_n": n,
+        "workers": workers,
+        "logins_per_second": round(len(latencies) / wall, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2) if latencies else None,
+        "rejected_busy": busy,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark password verification throughput per scrypt cost")
+    parser.add_argument("--cost", type=int, nargs="*", default=[2 ** 13, 2 ** 14, 2 ** 15], help="scrypt N values")
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4], help="hashing pool sizes")
+    parser.add_argument("--logins", type=int, default=200, help="verifications per case")
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous login threads")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Calls verify_password directly, so the verification cache in check_password never short-circuits a run
+    report = {"cpu_count": os.cpu_count(), "cases": []}
+    for n in args.cost:
+        for workers in args.workers:
+            report["cases"].append(run_case(n, workers, args))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Measures LoginSystem's user store at a given number of existing users: cold load, batch
+# register and verify (the CLI's single-pass paths), and one-at-a-time register and login the
+# way the interactive menu does them. Runs in a temporary directory; users.json is not touched.
+#
+#   python benchmarks/login_system.py [--users 10000 100000] [--ops 1000] [--output report.json]
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from LoginSystem import UserStore, batch_register, batch_verify  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run_case(users, ops, directory):
+    path = os.path.join(directory, f"users_{users}.json")
+    records = [{"username": f"bench-user-{i}", "password": f"pw-{i}", "privilege": str(i % 3 + 1)} for i in range(users)]
+
+    store = UserStore(path)
+    results, register_seconds = timed(lambda: batch_register(store, records))
+    assert all(result["success"] for result in results)
+    _, verify_seconds = timed(lambda: batch_verify(store, records))
+
+    # A new process opening a store of this size
+    store, load_seconds = timed(lambda: UserStore(path))
+
+    def single_registers():
+        for i in range(ops):
+            store.add(f"bench-extra-{i}", "pw", 1)
+
+    def single_logins():
+        for i in range(ops):
+            store.get(f"bench-user-{(i * 7919) % users}")
+
+    _, add_seconds = timed(single_registers)
+    _, get_seconds = timed(single_logins)
+
+    return {
+        "users": users,
+        "snapshot_bytes": os.path.getsize(path),
+        "load_seconds": round(load_seconds, 4),
+        "batch_register_per_second": round(users / register_seconds),
+        "batch_verify_per_second": round(users / verify_seconds),
+        "register_us": round(add_seconds / ops * 1e6, 1),
+        "login_us": round(get_seconds / ops * 1e6, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the LoginSystem user store")
+    parser.add_argument("--users", type=int, nargs="*", default=[10000, 100000], help="store sizes to test")
+    parser.add_argument("--ops", type=int, default=1000, help="single registers/logins timed per size")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="dpm-login-bench-")
+    try:
+        report = [run_case(users, args.ops, directory) for users in args.users]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
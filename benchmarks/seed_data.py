@@ -0,0 +1,242 @@
+# Seeds a local DPM database with benchmark-sized data and writes a manifest of the generated IDs
+# for load_test.py. Point it at a throwaway database (DPM_DB_NAME=dpm_bench), never production.
+#
+# Usage: python benchmarks/seed_data.py [--jobs 1000000] [--tenants 50000] ...
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Helper import connect  # noqa: E402
+from AttachmentStore import get_attachment_store  # noqa: E402
+from Passwords import hash_password  # noqa: E402
+from RentSummary import rebuild_rent_counts  # noqa: E402
+
+JOB_TYPES = ["Plumbing", "Electrical", "HVAC", "Appliance", "Carpentry", "Painting", "Pest Control", "Locksmith"]
+JOB_STATUSES = ["Pending", "Assigned", "In Progress", "Completed"]
+STREETS = ["Hope Road", "Constant Spring Road", "Barbican Road", "Old Hope Road", "Red Hills Road", "Molynes Road"]
+BENCH_PASSWORD = "bench-password"
+
+
+def next_id(cursor, table, column):
+    cursor.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+    return cursor.fetchone()[0] + 1
+
+
+def insert_rows(conn, cursor, sql, rows, batch_size, label):
+    start = time.perf_counter()
+    for i in range(0, len(rows), batch_size):
+        cursor.executemany(sql, rows[i:i + batch_size])
+        conn.commit()
+    print(f"  {label}: {len(rows)} rows in {time.perf_counter() - start:.1f}s")
+
+
+def insert_generated(conn, cursor, sql, generator, total, batch_size, label):
+    # Same as insert_rows but never holds more than one batch, for the million-row tables
+    start = time.perf_counter()
+    batch = []
+    for row in generator:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cursor.executemany(sql, batch)
+            conn.commit()
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        conn.commit()
+    print(f"  {label}: {total} rows in {time.perf_counter() - start:.1f}s")
+
+
+def seed(args):
+    rng = random.Random(args.seed)
+    conn = connect()
+    conn.autocommit = False
+    cursor = conn.cursor()
+
+    # Bulk-load settings for this session only
+    cursor.execute("SET SESSION unique_checks = 0")
+    cursor.execute("SET SESSION foreign_key_checks = 0")
+
+    user_base = next_id(cursor, "Users", "UserID")
+    property_base = next_id(cursor, "Properties", "PropertyID")
+    tenant_base = next_id(cursor, "Tenants", "TenantID")
+    technician_base = next_id(cursor, "Technicians", "TechnicianID")
+    job_base = next_id(cursor, "JobRequests", "JobID")
+    assignment_base = next_id(cursor, "Assignments", "AssignmentID")
+    file_base = next_id(cursor, "JobRequestFiles", "FileID")
+    run_tag = f"{int(time.time())}"
+    now = datetime.now().replace(microsecond=0)
+
+    print("Seeding users...")
+    manager_users = range(user_base, user_base + args.managers)
+    technician_users = range(manager_users.stop, manager_users.stop + args.technicians)
+    tenant_users = range(technician_users.stop, technician_users.stop + args.tenants)
+
+    # One hash shared by every bench user: same cost per login as real rows, without hashing 50k times
+    bench_hash = hash_password(BENCH_PASSWORD)
+    users = []
+    for user_id in manager_users:
+        users.append((user_id, f"bench-{run_tag}-manager-{user_id}@example.com", bench_hash, "Manager", "Bench", f"Manager{user_id}", "876-555-0000"))
+    for user_id in technician_users:
+        users.append((user_id, f"bench-{run_tag}-tech-{user_id}@example.com", bench_hash, "Technician", "Bench", f"Tech{user_id}", "876-555-0001"))
+    for user_id in tenant_users:
+        users.append((user_id, f"bench-{run_tag}-tenant-{user_id}@example.com", bench_hash, "Tenant", "Bench", f"Tenant{user_id}", "876-555-0002"))
+    insert_rows(conn, cursor, """
+        INSERT INTO Users (UserID, Email, PasswordHash, Role, FirstName, LastName, PhoneNumber)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, users, args.batch_size, "Users")
+    login_emails = [users[i][1] for i in rng.sample(range(len(users)), min(len(users), 1000))]
+    del users
+
+    print("Seeding properties...")
+    properties = []
+    for i in range(args.properties):
+        lat = 18.0 + rng.random() * 0.5
+        lng = -77.0 + rng.random() * 0.8
+        properties.append((property_base + i, f"{rng.randint(1, 200)} {rng.choice(STREETS)}, Unit {i}",
+                           round(lat, 6), round(lng, 6), rng.choice(manager_users), "Active"))
+    insert_rows(conn, cursor, """
+        INSERT INTO Properties (PropertyID, Address, Latitude, Longitude, ManagerID, Status)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, properties, args.batch_size, "Properties")
+    del properties
+
+    print("Seeding tenants and technicians...")
+    tenant_property = {}
+    tenants = []
+    for i, user_id in enumerate(tenant_users):
+        tenant_id = tenant_base + i
+        property_id = property_base + (i % args.properties)
+        tenant_property[tenant_id] = property_id
+        tenants.append((tenant_id, user_id, property_id, False, rng.choice(["Paid", "Unpaid"])))
+    insert_rows(conn, cursor, """
+        INSERT INTO Tenants (TenantID, UserID, PropertyID, MoveOutRequested, RentStatus)
+        VALUES (%s, %s, %s, %s, %s)
+    """, tenants, args.batch_size, "Tenants")
+    del tenants
+
+    technicians = []
+    for i, user_id in enumerate(technician_users):
+        skills = ",".join(rng.sample(JOB_TYPES, 3))
+        technicians.append((technician_base + i, user_id, skills, 0.0))
+    insert_rows(conn, cursor, """
+        INSERT INTO Technicians (TechnicianID, UserID, Skillset, AvgRating)
+        VALUES (%s, %s, %s, %s)
+    """, technicians, args.batch_size, "Technicians")
+    technician_ids = [row[0] for row in technicians]
+    del technicians
+
+    print("Seeding job requests...")
+    tenant_ids = list(tenant_property)
+    job_owner = {}   # only kept for jobs that get ratings/invoices or are handed to the load test
+
+    def jobs():
+        for i in range(args.jobs):
+            job_id = job_base + i
+            tenant_id = tenant_ids[rng.randrange(len(tenant_ids))]
+            status = rng.choice(JOB_STATUSES)
+            technician_id = rng.choice(technician_ids) if status != "Pending" else None
+            requested = now - timedelta(minutes=rng.randrange(60 * 24 * 365 * 3))
+            if technician_id is not None and i % 5 == 0:
+                job_owner[job_id] = (tenant_id, technician_id, requested)
+            yield (job_id, tenant_id, tenant_property[tenant_id], rng.choice(JOB_TYPES), "Benchmark job request",
+                   requested, rng.randint(1, 5), status, technician_id)
+    insert_generated(conn, cursor, """
+        INSERT INTO JobRequests (JobID, TenantID, PropertyID, JobType, Description, RequestedTime, Urgency, Status, AssignedTechnicianID)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, jobs(), args.jobs, args.batch_size, "JobRequests")
+
+    print("Seeding assignments, ratings and invoices...")
+    owned = list(job_owner.items())
+    rng.shuffle(owned)
+    rated = owned[:args.ratings]
+    invoiced = owned[:args.invoices]
+    # Jobs left without a rating are handed to the load test for POST /api/ratings
+    rateable = [(job_id, tenant_id, technician_id) for job_id, (tenant_id, technician_id, _) in owned[args.ratings:args.ratings + 20000]]
+
+    insert_generated(conn, cursor, """
+        INSERT INTO Assignments (AssignmentID, TechnicianID, JobID, AssignedTime, Status)
+        VALUES (%s, %s, %s, %s, 'Assigned')
+    """, ((assignment_base + i, technician_id, job_id, requested + timedelta(hours=2))
+          for i, (job_id, (_, technician_id, requested)) in enumerate(owned)), len(owned), args.batch_size, "Assignments")
+
+    insert_generated(conn, cursor, """
+        INSERT INTO Ratings (JobID, TechnicianID, TenantID, Rating, Comment, SubmittedTime)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, ((job_id, technician_id, tenant_id, rng.randint(1, 5), "", requested + timedelta(days=2))
+          for job_id, (tenant_id, technician_id, requested) in rated), len(rated), args.batch_size, "Ratings")
+
+    insert_generated(conn, cursor, """
+        INSERT INTO Invoices (TechnicianID, JobID, Amount, SentTime, Status)
+        VALUES (%s, %s, %s, %s, %s)
+    """, ((technician_id, job_id, round(rng.uniform(20, 800), 2), requested + timedelta(days=1), rng.choice(["Paid", "Unpaid"]))
+          for job_id, (_, technician_id, requested) in invoiced), len(invoiced), args.batch_size, "Invoices")
+
+    cursor.execute("""
+        UPDATE Technicians t
+        JOIN (
+            SELECT TechnicianID, SUM(Rating) AS RatingSum, COUNT(*) AS RatingCount
+            FROM Ratings
+            GROUP BY TechnicianID
+        ) r ON r.TechnicianID = t.TechnicianID
+        SET t.RatingSum = r.RatingSum, t.RatingCount = r.RatingCount, t.AvgRating = r.RatingSum / r.RatingCount
+    """)
+    # Tenants were bulk-inserted without touching PropertyRentSummary; the rent dashboard reads it
+    rebuild_rent_counts(cursor)
+    conn.commit()
+
+    print("Seeding attachments...")
+    store = get_attachment_store()
+    files = []
+    for i in range(args.files):
+        job_id, _ = owned[i % len(owned)] if owned else (job_base, None)
+        storage_key, file_size = store.save(io.BytesIO(rng.randbytes(args.file_size)))
+        files.append((file_base + i, job_id, f"bench-{i}.bin", "application/octet-stream", storage_key, file_size))
+    insert_rows(conn, cursor, """
+        INSERT INTO JobRequestFiles (FileID, JobID, FileName, FileType, StorageKey, FileSize)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, files, args.batch_size, "JobRequestFiles")
+
+    cursor.close()
+    conn.close()
+
+    manifest = {
+        "created_at": now.isoformat(),
+        "password": BENCH_PASSWORD,
+        "login_emails": login_emails,
+        "tenants": [[tenant_id, tenant_property[tenant_id]] for tenant_id in rng.sample(tenant_ids, min(len(tenant_ids), 5000))],
+        "technician_ids": technician_ids,
+        "job_ids": [job_base, job_base + args.jobs - 1],
+        "rateable_jobs": rateable,
+        "file_ids": [file_base, file_base + args.files - 1] if args.files else [],
+    }
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f)
+    print(f"Manifest written to {args.manifest}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a DPM database with benchmark data")
+    parser.add_argument("--managers", type=int, default=200)
+    parser.add_argument("--properties", type=int, default=10000)
+    parser.add_argument("--tenants", type=int, default=50000)
+    parser.add_argument("--technicians", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, default=1000000)
+    parser.add_argument("--ratings", type=int, default=100000)
+    parser.add_argument("--invoices", type=int, default=100000)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--file-size", type=int, default=256 * 1024)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1738)
+    parser.add_argument("--manifest", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "seed_manifest.json"))
+    seed(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
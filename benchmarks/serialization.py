@@ -0,0 +1,174 @@
+# Measures JSON serialization time and response size for pages shaped like the big list endpoints
+# (job requests: datetime-heavy, invoices: Decimal-heavy). It compares Flask's default provider
+# with the orjson provider from FastJSON.py, and identity with gzip and brotli encoding.
+#
+#   python benchmarks/serialization.py [--rows 100 1000 10000] [--repeat 20] [--output report.json]
+#   python benchmarks/serialization.py --base-url http://localhost:5150   # bytes on the wire from a running server
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import Compression  # noqa: E402
+import Config  # noqa: E402
+import FastJSON  # noqa: E402
+
+JOB_TYPES = ["Plumbing", "Electrical", "HVAC", "Appliance", "Carpentry", "Painting", "Pest Control", "Locksmith"]
+STREETS = ["Hope Road", "Constant Spring Road", "Barbican Road", "Old Hope Road", "Red Hills Road", "Molynes Road"]
+
+LIVE_ENDPOINTS = [
+    "/api/jobrequests?limit=1000",
+    "/api/invoices?limit=1000",
+    "/api/tenants?limit=1000",
+    "/api/assignments?limit=1000&include_completed=true",
+]
+
+
+def job_request_rows(count, rng):
+    now = datetime.now().replace(microsecond=0)
+    return [{
+        "JobID": 1000000 - i,
+        "TenantID": rng.randint(1, 50000),
+        "PropertyID": rng.randint(1, 10000),
+        "JobType": rng.choice(JOB_TYPES),
+        "Description": "Benchmark job request",
+        "Urgency": rng.randint(1, 5),
+        "Status": rng.choice(["Pending", "Assigned", "In Progress", "Completed"]),
+        "RequestedTime": now - timedelta(minutes=i * 7),
+        "TenantFirstName": "Bench",
+        "TenantLastName": f"Tenant{i}",
+        "PropertyAddress": f"{rng.randint(1, 200)} {rng.choice(STREETS)}, Unit {i}",
+    } for i in range(count)]
+
+
+def invoice_rows(count, rng):
+    now = datetime.now().replace(microsecond=0)
+    return [{
+        "InvoiceID": 500000 - i,
+        "TechnicianID": rng.randint(1, 1000),
+        "JobID": rng.randint(1, 1000000),
+        "Amount": Decimal(f"{rng.uniform(20, 800):.2f}"),
+        "SentTime": now - timedelta(hours=i),
+        "Status": rng.choice(["Paid", "Unpaid"]),
+    } for i in range(count)]
+
+
+PAYLOADS = {
+    "job_requests": job_request_rows,
+    "invoices": invoice_rows,
+}
+
+
+def encoders(app):
+    found = {"flask_default": DefaultJSONProvider(app)}
+    if FastJSON.orjson is not None:
+        found["orjson"] = FastJSON.OrjsonProvider(app)
+        found["orjson_iso_datetimes"] = FastJSON.OrjsonProvider(app)
+    return found
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, {"median_ms": round(statistics.median(timings) * 1000, 3), "min_ms": round(min(timings) * 1000, 3)}
+
+
+def run_local(args):
+    app = Flask(__name__)
+    rng = random.Random(args.seed)
+    report = {}
+    for payload_name, make_rows in PAYLOADS.items():
+        for rows in args.rows:
+            data = make_rows(rows, rng)
+            payload = {"success": True, payload_name: data, "limit": rows, "next_cursor": "eyJrIjpbMV19"}
+            case = {"serialize": {}, "encoding": {}}
+
+            body = None
+            for name, provider in encoders(app).items():
+                Config.JSON_ISO_DATETIMES = name == "orjson_iso_datetimes"
+                with app.app_context():
+                    response, timing = time_call(lambda: provider.response(payload).get_data(), args.repeat)
+                timing["bytes"] = len(response)
+                case["serialize"][name] = timing
+                if name == "flask_default":
+                    body = response
+            Config.JSON_ISO_DATETIMES = False
+
+            for encoding in ("gzip", "br"):
+                if encoding == "br" and Compression.brotli is None:
+                    continue
+                compressed, timing = time_call(lambda: Compression.compress(body, encoding), args.repeat)
+                timing["bytes"] = len(compressed)
+                timing["ratio"] = round(len(compressed) / len(body), 3)
+                case["encoding"][encoding] = timing
+            case["encoding"]["identity"] = {"bytes": len(body)}
+
+            report[f"{payload_name}_{rows}"] = case
+    return report
+
+
+def run_live(args):
+    parts = urlsplit(args.base_url)
+    report = {}
+    for path in args.endpoint or LIVE_ENDPOINTS:
+        results = {}
+        for encoding in ("identity", "gzip", "br"):
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=args.timeout)
+            timings = []
+            size = status = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                conn.request("GET", path, headers={"Accept-Encoding": encoding})
+                response = conn.getresponse()
+                body = response.read()
+                timings.append(time.perf_counter() - start)
+                size, status = len(body), response.status
+                applied = response.getheader("Content-Encoding") or "identity"
+            conn.close()
+            results[encoding] = {
+                "status": status,
+                "content_encoding": applied,
+                "bytes": size,
+                "median_ms": round(statistics.median(timings) * 1000, 3),
+            }
+        report[path] = results
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization and response compression")
+    parser.add_argument("--rows", type=int, nargs="*", default=[100, 1000, 10000], help="rows per page")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1738)
+    parser.add_argument("--base-url", help="measure a running server instead of in-process encoding")
+    parser.add_argument("--endpoint", action="append", help="path to fetch with --base-url (repeatable)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_live(args) if args.base_url else run_local(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# Production server settings: gunicorn -c gunicorn.conf.py wsgi:app
+# Values come from Config.py (DPM_* environment variables).
+# Graceful reload: kill -HUP <master pid> starts new workers and lets old ones finish
+# their in-flight requests within graceful_timeout.
+import Config
+
+# Fail in the master, with a clear message, rather than in every worker as it boots
+if Config.REQUIRE_AUTH and not Config.SESSION_SECRET:
+    raise RuntimeError("DPM_REQUIRE_AUTH is on but DPM_SESSION_SECRET is not set; "
+                       "every worker must share the same secret for bearer tokens to validate")
+
+bind = f"{Config.HOST}:{Config.PORT}"
+workers = Config.WORKERS
+worker_class = Config.WORKER_CLASS
+threads = Config.THREADS
+keepalive = Config.KEEPALIVE
+timeout = Config.TIMEOUT
+graceful_timeout = Config.GRACEFUL_TIMEOUT
+max_requests = Config.MAX_REQUESTS
+max_requests_jitter = Config.MAX_REQUESTS_JITTER
+preload_app = Config.PRELOAD_APP
+accesslog = "-"
+
+
+def post_worker_init(worker):
+    # Each worker opens its own pooled connections and background threads before it starts accepting requests
+    from API import start_background_workers, warm_up
+    try:
+        warm_up()
+    except Exception as e:
+        worker.log.warning(f"Warm-up failed, connections will be opened on demand: {e}")
+    start_background_workers()
+
+
+def worker_exit(server, worker):
+    # Let in-flight outbox events finish; anything unfinished is retried once its lease runs out
+    from API import stop_background_workers
+    stop_background_workers()
@@ -0,0 +1,7 @@
+-- Indexes backing the keyset-paginated list endpoints.
+-- Each one matches an endpoint's ORDER BY key so "next page" is a short index range scan.
+
+CREATE INDEX idx_jobrequests_requested ON JobRequests (RequestedTime, JobID);
+CREATE INDEX idx_jobrequests_technician_requested ON JobRequests (AssignedTechnicianID, RequestedTime, JobID);
+CREATE INDEX idx_assignments_assigned ON Assignments (AssignedTime, AssignmentID);
+CREATE INDEX idx_invoices_sent ON Invoices (SentTime, InvoiceID);
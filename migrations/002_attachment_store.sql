@@ -0,0 +1,10 @@
+-- Attachment contents move out of MySQL into the attachment store (see AttachmentStore.py).
+-- JobRequestFiles keeps metadata plus the content key; FileData stays only for rows that have not
+-- been migrated yet (python Manage.py migrate-attachments).
+
+ALTER TABLE JobRequestFiles
+    ADD COLUMN StorageKey CHAR(64) NULL,
+    ADD COLUMN FileSize BIGINT NULL,
+    MODIFY FileData LONGBLOB NULL;
+
+CREATE INDEX idx_jobrequestfiles_storagekey ON JobRequestFiles (StorageKey);
@@ -0,0 +1,16 @@
+-- Running rating aggregates per technician, maintained by POST /api/ratings in the same
+-- transaction as the Ratings insert. Recompute with: python Manage.py rebuild-ratings
+
+ALTER TABLE Technicians
+    ADD COLUMN RatingSum BIGINT NOT NULL DEFAULT 0,
+    ADD COLUMN RatingCount INT NOT NULL DEFAULT 0;
+
+UPDATE Technicians t
+LEFT JOIN (
+    SELECT TechnicianID, SUM(Rating) AS RatingSum, COUNT(*) AS RatingCount
+    FROM Ratings
+    GROUP BY TechnicianID
+) r ON r.TechnicianID = t.TechnicianID
+SET t.RatingSum = COALESCE(r.RatingSum, 0),
+    t.RatingCount = COALESCE(r.RatingCount, 0),
+    t.AvgRating = IF(r.RatingCount > 0, r.RatingSum / r.RatingCount, 0);
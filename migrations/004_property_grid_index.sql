@@ -0,0 +1,8 @@
+-- Grid buckets for radius search (GET /api/properties?near=lat,lng&radius_km=...).
+-- The cell size must match Geo.GRID_CELL_DEGREES. Generated columns keep the buckets correct for
+-- every writer without application changes.
+
+ALTER TABLE Properties
+    ADD COLUMN GridLat INT AS (FLOOR(Latitude / 0.1)) STORED,
+    ADD COLUMN GridLng INT AS (FLOOR(Longitude / 0.1)) STORED,
+    ADD INDEX idx_properties_grid (GridLat, GridLng);
@@ -0,0 +1,6 @@
+-- Indexes for schedule conflict checks and windowed schedule reads.
+-- (TechnicianID, StartTime, EndTime) bounds the locking read in POST /api/technicians/<id>/schedule
+-- to the slots next to the new one; (TechnicianID, EndTime) serves GET .../schedule?from=...
+
+CREATE INDEX idx_schedule_technician_start ON TechnicianSchedule (TechnicianID, StartTime, EndTime);
+CREATE INDEX idx_schedule_technician_end ON TechnicianSchedule (TechnicianID, EndTime);
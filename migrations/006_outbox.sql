@@ -0,0 +1,16 @@
+-- Transactional outbox for post-commit side effects (see Events.py).
+-- Rows are written in the same transaction as the change they describe and claimed by the
+-- outbox workers with FOR UPDATE SKIP LOCKED; AvailableAt doubles as the claim lease and retry time.
+
+CREATE TABLE Outbox (
+    EventID BIGINT AUTO_INCREMENT PRIMARY KEY,
+    EventType VARCHAR(64) NOT NULL,
+    Payload JSON NOT NULL,
+    Status ENUM('Pending', 'Done', 'Failed') NOT NULL DEFAULT 'Pending',
+    Attempts INT NOT NULL DEFAULT 0,
+    CreatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    AvailableAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    ProcessedAt DATETIME(6) NULL,
+    LastError TEXT NULL,
+    INDEX idx_outbox_pending (Status, AvailableAt, EventID)
+);
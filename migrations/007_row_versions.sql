@@ -0,0 +1,13 @@
+-- Row update timestamps used as ETag / Last-Modified validators by the single-resource GET endpoints.
+-- MySQL maintains them on every UPDATE that changes the row, so no writer needs to know about them.
+
+ALTER TABLE Users
+    ADD COLUMN UpdatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+ALTER TABLE Technicians
+    ADD COLUMN UpdatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+ALTER TABLE Tenants
+    ADD COLUMN UpdatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+ALTER TABLE Properties
+    ADD COLUMN UpdatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+ALTER TABLE JobRequests
+    ADD COLUMN UpdatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
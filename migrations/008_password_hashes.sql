@@ -0,0 +1,5 @@
+-- PasswordHash now holds scrypt hashes (scrypt$n$r$p$salt$hash, about 90 characters) instead of the
+-- plaintext password. Existing plaintext rows keep working and are rehashed on the user's next login.
+
+ALTER TABLE Users
+    MODIFY COLUMN PasswordHash VARCHAR(255) NOT NULL;
@@ -0,0 +1,14 @@
+-- Sessions behind the bearer tokens issued by /api/login. Tokens are checked against this table only
+-- when a process has no cached copy; revocation sets RevokedAt rather than deleting, so a revoked
+-- token stays rejected until it expires. Purge old rows with `python Manage.py purge-sessions`.
+
+CREATE TABLE Sessions (
+    SessionID VARCHAR(64) NOT NULL PRIMARY KEY,
+    UserID INT NOT NULL,
+    Role VARCHAR(20) NOT NULL,
+    CreatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    ExpiresAt DATETIME NOT NULL,
+    RevokedAt DATETIME(6) NULL,
+    INDEX idx_sessions_user (UserID, RevokedAt),
+    INDEX idx_sessions_expires (ExpiresAt)
+);
@@ -0,0 +1,19 @@
+-- Paid/unpaid tenant counts per property for GET /api/dashboard/rent, maintained by the handlers
+-- that change Tenants.RentStatus or add/remove tenants, in the same transaction.
+-- Recompute with: python Manage.py rebuild-rent-summary
+
+CREATE TABLE PropertyRentSummary (
+    PropertyID INT NOT NULL PRIMARY KEY,
+    PaidCount INT NOT NULL DEFAULT 0,
+    UnpaidCount INT NOT NULL DEFAULT 0,
+    UpdatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    FOREIGN KEY (PropertyID) REFERENCES Properties(PropertyID) ON DELETE CASCADE
+);
+
+INSERT INTO PropertyRentSummary (PropertyID, PaidCount, UnpaidCount)
+SELECT p.PropertyID,
+       COALESCE(SUM(t.RentStatus = 'Paid'), 0),
+       COALESCE(SUM(t.RentStatus = 'Unpaid'), 0)
+FROM Properties p
+LEFT JOIN Tenants t ON t.PropertyID = p.PropertyID
+GROUP BY p.PropertyID;
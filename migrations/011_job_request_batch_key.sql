@@ -0,0 +1,9 @@
+-- Correlation tag for POST /api/jobrequests/batch. A multi-row INSERT does not promise consecutive
+-- AUTO_INCREMENT values (innodb_autoinc_lock_mode=2 is the MySQL 8 default), so each inserted row
+-- carries its chunk's key and position, and the handler reads the real JobIDs back through this index.
+-- Rows created one at a time leave both columns NULL.
+
+ALTER TABLE JobRequests
+    ADD COLUMN BatchKey CHAR(32) NULL,
+    ADD COLUMN BatchSeq INT NULL,
+    ADD INDEX idx_jobrequests_batch (BatchKey, BatchSeq);
@@ -0,0 +1,56 @@
+-- The schedule conflict check in POST /api/technicians/<id>/schedule (and the availability engine)
+-- assume each technician's slots never overlap. Rows written before that check may, so:
+--   1. overlapping slots with the same status are merged into the earliest of them;
+--   2. if slots with different statuses still overlap, the migration stops with
+--      "Check constraint 'resolve_overlapping_schedule_slots_first' is violated". List them with
+--        SELECT a.*, b.* FROM TechnicianSchedule a JOIN TechnicianSchedule b
+--          ON a.TechnicianID = b.TechnicianID AND a.ScheduleID < b.ScheduleID
+--         AND a.StartTime < b.EndTime AND b.StartTime < a.EndTime;
+--      fix them by hand and run this file again.
+
+-- A slot opens a new group unless it starts before some earlier slot of the same status has ended
+CREATE TEMPORARY TABLE schedule_merge AS
+SELECT ScheduleID, TechnicianID, Status, StartTime, EndTime,
+       SUM(OpensGroup) OVER (PARTITION BY TechnicianID, Status ORDER BY StartTime, ScheduleID) AS GroupNo
+FROM (
+    SELECT ScheduleID, TechnicianID, Status, StartTime, EndTime,
+           CASE WHEN StartTime < MAX(EndTime) OVER (
+                    PARTITION BY TechnicianID, Status ORDER BY StartTime, ScheduleID
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+                THEN 0 ELSE 1 END AS OpensGroup
+    FROM TechnicianSchedule
+) ordered;
+
+CREATE TEMPORARY TABLE schedule_groups AS
+SELECT TechnicianID, Status, GroupNo, MIN(ScheduleID) AS KeepID,
+       MIN(StartTime) AS StartTime, MAX(EndTime) AS EndTime
+FROM schedule_merge
+GROUP BY TechnicianID, Status, GroupNo
+HAVING COUNT(*) > 1;
+
+UPDATE TechnicianSchedule s
+JOIN schedule_groups g ON g.KeepID = s.ScheduleID
+SET s.StartTime = g.StartTime, s.EndTime = g.EndTime;
+
+DELETE s
+FROM TechnicianSchedule s
+JOIN schedule_merge m ON m.ScheduleID = s.ScheduleID
+JOIN schedule_groups g ON g.TechnicianID = m.TechnicianID AND g.Status = m.Status AND g.GroupNo = m.GroupNo
+WHERE s.ScheduleID <> g.KeepID;
+
+DROP TEMPORARY TABLE schedule_groups;
+DROP TEMPORARY TABLE schedule_merge;
+
+CREATE TEMPORARY TABLE schedule_overlap_check (
+    Overlaps INT NOT NULL,
+    CONSTRAINT resolve_overlapping_schedule_slots_first CHECK (Overlaps = 0)
+);
+
+INSERT INTO schedule_overlap_check
+SELECT COUNT(*)
+FROM TechnicianSchedule a
+JOIN TechnicianSchedule b
+  ON a.TechnicianID = b.TechnicianID AND a.ScheduleID < b.ScheduleID
+ AND a.StartTime < b.EndTime AND b.StartTime < a.EndTime;
+
+DROP TEMPORARY TABLE schedule_overlap_check;
@@ -0,0 +1,13 @@
+-- Validators for the paginated list endpoints (Conditional.page_version): a page's version is read
+-- from its base table's keys and UpdatedAt, plus the newest UpdatedAt of each joined table.
+-- The UpdatedAt indexes make those MAX() reads a single index lookup instead of a table scan.
+
+ALTER TABLE Assignments
+    ADD COLUMN UpdatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+ALTER TABLE Invoices
+    ADD COLUMN UpdatedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+CREATE INDEX idx_users_updated ON Users (UpdatedAt);
+CREATE INDEX idx_properties_updated ON Properties (UpdatedAt);
+CREATE INDEX idx_jobrequests_updated ON JobRequests (UpdatedAt);
+CREATE INDEX idx_propertyrentsummary_updated ON PropertyRentSummary (UpdatedAt);
@@ -0,0 +1,18 @@
+# The modules live at the repository root, next to this directory
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Flask test client for the API blueprint; no background workers, and no database unless a test
+# replaces get_connection
+@pytest.fixture
+def client():
+    pytest.importorskip("flask")
+    pytest.importorskip("mysql.connector")
+    pytest.importorskip("email_validator")
+    import API
+    return API.create_app(warm=False).test_client()
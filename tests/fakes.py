@@ -0,0 +1,84 @@
+# In-memory stand-ins for a MySQL connection: each statement is answered by the first scripted
+# response whose text appears in it, and every statement is recorded for the test to inspect.
+import itertools
+
+
+def _normalise(sql):
+    return " ".join(sql.split())
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self._conn = conn
+        self._rows = []
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, sql, params=()):
+        sql = _normalise(sql)
+        self._conn.executed.append((sql, params))
+        result = self._conn.respond(sql, params)
+        if isinstance(result, int):
+            self._rows, self.rowcount = [], result
+        else:
+            self._rows = list(result)
+            self.rowcount = len(self._rows)
+        if sql.startswith("INSERT"):
+            self.lastrowid = next(self._conn.ids)
+            self._conn.in_transaction = True
+        elif sql.startswith(("UPDATE", "DELETE")):
+            self._conn.in_transaction = True
+
+    def executemany(self, sql, seq_params):
+        seq_params = list(seq_params)
+        for params in seq_params:
+            self.execute(sql, params)
+        self.rowcount = len(seq_params)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    # responses: [(text, rows | rowcount | callable(params) -> rows | rowcount)]
+    def __init__(self, responses=(), first_id=1):
+        self.responses = list(responses)
+        self.executed = []
+        self.ids = itertools.count(first_id)
+        self.commits = 0
+        self.rollbacks = 0
+        self.in_transaction = False
+        self.closed = False
+
+    def respond(self, sql, params):
+        for text, result in self.responses:
+            if text in sql:
+                return result(params) if callable(result) else result
+        return []
+
+    def statements(self, text):
+        return [(sql, params) for sql, params in self.executed if text in sql]
+
+    def cursor(self, dictionary=False, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        self.in_transaction = False
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def is_connected(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
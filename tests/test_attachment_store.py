@@ -0,0 +1,93 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from AttachmentStore import LocalAttachmentStore
+
+
+def test_save_streams_and_addresses_by_content(tmp_path):
+    store = LocalAttachmentStore(str(tmp_path), chunk_size=7)
+    data = os.urandom(100)
+
+    key, size, created = store.save_new(io.BytesIO(data))
+    assert key == hashlib.sha256(data).hexdigest()
+    assert (size, created) == (100, True)
+    assert store.exists(key) and store.size(key) == 100
+    with store.open(key) as file:
+        assert file.read() == data
+
+    # Identical content is stored once; save() keeps the (key, size) shape
+    assert store.save(io.BytesIO(data)) == (key, 100)
+    assert store.save_new(io.BytesIO(data))[2] is False
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_delete_and_key_validation(tmp_path):
+    store = LocalAttachmentStore(str(tmp_path))
+    key, _ = store.save(io.BytesIO(b"contents"))
+    store.delete(key)
+    store.delete(key)  # already gone: no error
+    assert not store.exists(key)
+
+    for bad in ("../../etc/passwd", "", None, key.upper()):
+        with pytest.raises(ValueError):
+            store.open(bad)
+
+
+def test_failed_save_leaves_no_temp_file(tmp_path):
+    class Broken(io.RawIOBase):
+        def read(self, size=-1):
+            raise OSError("client went away")
+
+    store = LocalAttachmentStore(str(tmp_path))
+    with pytest.raises(OSError):
+        store.save(Broken())
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    import AttachmentStore
+    store = LocalAttachmentStore(str(tmp_path), 4096)
+    monkeypatch.setattr(AttachmentStore, "_store", store)
+    return store
+
+
+def test_download_serves_ranges_and_refuses_unsatisfiable_ones(client, store, monkeypatch):
+    import API
+    from fakes import FakeConnection
+
+    key, size = store.save(io.BytesIO(b"0123456789"))
+    row = ("notes.txt", "text/plain", key, size, None)
+    monkeypatch.setattr(API, "get_connection", lambda: FakeConnection([("FROM JobRequestFiles", [row])]))
+
+    partial = client.get("/api/files/1/download", headers={"Range": "bytes=2-4"})
+    assert partial.status_code == 206
+    assert partial.get_data() == b"234"
+    assert client.get("/api/files/1/download", headers={"Range": "bytes=99999-"}).status_code == 416
+
+
+def test_failed_upload_removes_only_the_blob_it_added(client, store, monkeypatch):
+    import API
+    from fakes import FakeConnection
+
+    def outbox_down(params):
+        raise RuntimeError("outbox unavailable")
+
+    monkeypatch.setattr(API, "get_connection", lambda: FakeConnection([
+        ("FROM Tenants", [(1,)]),
+        ("INSERT INTO Outbox", outbox_down),
+    ]))
+    form = {"tenant_id": "1", "property_id": "2", "job_type": "Plumbing", "description": "Leak", "urgency": "3"}
+
+    response = client.post("/api/jobrequests", data=dict(form, file=(io.BytesIO(b"new content"), "a.txt")))
+    assert response.status_code == 500
+    assert not store.exists(hashlib.sha256(b"new content").hexdigest())
+
+    # Content that was already stored belongs to someone else and stays
+    existing, _ = store.save(io.BytesIO(b"shared content"))
+    response = client.post("/api/jobrequests", data=dict(form, file=(io.BytesIO(b"shared content"), "b.txt")))
+    assert response.status_code == 500
+    assert store.exists(existing)
@@ -0,0 +1,128 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("mysql.connector")
+
+import Availability  # noqa: E402
+from Availability import AvailabilityEngine, IntervalSet, IntervalTree  # noqa: E402
+
+BASE = datetime(2025, 5, 1, 8, 0)
+
+
+def at(minutes):
+    return BASE + timedelta(minutes=minutes)
+
+
+def brute_force_covering(intervals, start, end):
+    return sorted(value for s, e, value in intervals if s <= start and e >= end)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_tree_matches_brute_force_after_inserts_and_removes(seed):
+    rng = random.Random(seed)
+    tree = IntervalTree()
+    live = []
+    for _ in range(300):
+        if live and rng.random() < 0.4:
+            interval = live.pop(rng.randrange(len(live)))
+            tree.remove(*interval)
+        else:
+            start = rng.randrange(0, 500)
+            interval = (start, start + rng.randrange(1, 120), rng.randrange(10))
+            tree.insert(*interval)
+            live.append(interval)
+        assert len(tree) == len(live)
+        if rng.random() < 0.3:
+            window_start = rng.randrange(-10, 600)
+            window_end = window_start + rng.randrange(0, 90)
+            assert sorted(tree.covering(window_start, window_end)) == brute_force_covering(live, window_start, window_end)
+
+    for window_start in range(-10, 620, 7):
+        for length in (0, 1, 30, 200):
+            assert sorted(tree.covering(window_start, window_start + length)) == \
+                brute_force_covering(live, window_start, window_start + length)
+
+
+def test_tree_keeps_duplicates_and_ignores_missing():
+    tree = IntervalTree([(1, 5, "a"), (1, 5, "a"), (2, 9, "b")])
+    tree.remove(1, 5, "a")
+    tree.remove(3, 4, "z")  # not present
+    assert len(tree) == 2
+    assert sorted(tree.covering(2, 5)) == ["a", "b"]
+
+
+def test_interval_set_merges_touching_and_overlapping():
+    free = IntervalSet([(at(60), at(90)), (at(0), at(30)), (at(30), at(45)), (at(40), at(50)), (at(100), at(110))])
+    assert list(free) == [(at(0), at(50)), (at(60), at(90)), (at(100), at(110))]
+    assert free.covers(at(10), at(50))
+    assert not free.covers(at(40), at(70))
+    assert free.overlapping(at(45), at(101)) == [(at(0), at(50)), (at(60), at(90)), (at(100), at(110))]
+    assert free.overlap_seconds(at(45), at(70)) == 15 * 60
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.rows)
+
+    def close(self):
+        pass
+
+
+def assert_consistent(engine):
+    expected = sorted((start, end, technician_id) for technician_id, free in engine._free.items() for start, end in free)
+    assert len(engine._tree) == len(expected)
+    for start, end, technician_id in expected:
+        assert technician_id in engine._tree.covering(start, end)
+    for minutes in range(0, 300, 10):
+        window = (at(minutes), at(minutes + 20))
+        covering = sorted(t for t, free in engine._free.items() if free.covers(*window))
+        assert engine.free_between(*window) == covering
+
+
+def test_apply_keeps_free_and_tree_in_step(monkeypatch):
+    rows = [
+        {"ScheduleID": 1, "TechnicianID": 7, "StartTime": at(0), "EndTime": at(60)},
+        {"ScheduleID": 2, "TechnicianID": 7, "StartTime": at(60), "EndTime": at(120)},
+        {"ScheduleID": 3, "TechnicianID": 8, "StartTime": at(30), "EndTime": at(90)},
+    ]
+    monkeypatch.setattr(Availability, "get_connection", lambda: FakeConnection(rows))
+    engine = AvailabilityEngine(ttl=3600)
+    assert engine.free_between(at(10), at(100)) == [7]
+    assert list(engine.free_intervals(7)) == [(at(0), at(120))]
+    assert_consistent(engine)
+
+    # Slot 2 is booked: the merged interval splits back to slot 1 alone
+    engine.apply(7, added=[(2, at(60), at(120), 'Booked')])
+    assert list(engine.free_intervals(7)) == [(at(0), at(60))]
+    assert engine.free_between(at(10), at(100)) == []
+    assert engine.free_between(at(40), at(60)) == [7, 8]
+    assert_consistent(engine)
+
+    # Freed again, then slot 3 removed and a technician with no slots gains one
+    engine.apply(7, added=[(2, at(60), at(120), 'Available')])
+    engine.apply(8, removed=[3])
+    engine.apply(9, added=[(4, at(200), at(260), 'Available')])
+    assert engine.free_between(at(10), at(100)) == [7]
+    assert engine.free_between(at(210), at(250)) == [9]
+    assert list(engine.free_intervals(8)) == []
+    assert_consistent(engine)
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from Cache import ReloadingIndex, TTLCache
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_size=10, ttl=5)
+    cache.set("a", 1)
+    now[0] += 4.9
+    assert cache.get("a") == 1
+    now[0] += 0.2
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction_keeps_recently_read_entries():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # "b" is the least recently used
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_invalidation():
+    cache = TTLCache(max_size=10, ttl=60)
+    for key in [("property", 1), ("property", 2), ("list", "all")]:
+        cache.set(key, True)
+    cache.delete(("property", 1))
+    cache.delete(("property", 9))  # absent: not counted
+    cache.delete_where(lambda key: key[0] == "list")
+    assert cache.get(("property", 2))
+    assert cache.stats()["size"] == 1
+    assert cache.invalidations == 2
+    cache.clear()
+    assert cache.stats()["size"] == 0
+
+
+class CountingIndex(ReloadingIndex):
+    def __init__(self, ttl):
+        super().__init__(ttl)
+        self.loads = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def _load(self):
+        self.release.wait()
+        self.loads += 1
+
+
+def test_reloading_index_reloads_when_stale_or_expired(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    index = CountingIndex(ttl=10)
+    index.ensure_loaded()
+    index.ensure_loaded()
+    assert index.loads == 1
+    index.invalidate()
+    index.ensure_loaded()
+    assert index.loads == 2
+    now[0] += 11
+    index.ensure_loaded()
+    assert index.loads == 3
+
+
+def test_readers_do_not_wait_for_a_reload():
+    index = CountingIndex(ttl=60)
+    index.ensure_loaded()
+    index.invalidate()
+    index.release.clear()
+    reloader = threading.Thread(target=index.ensure_loaded)
+    reloader.start()
+    while not index._reload_lock.locked():
+        time.sleep(0.001)
+    index.ensure_loaded()  # returns at once and keeps serving the previous version
+    assert index.loads == 1
+    index.release.set()
+    reloader.join()
+    assert index.loads == 2
+
+
+def test_failed_load_stays_stale():
+    class Failing(ReloadingIndex):
+        def _load(self):
+            raise RuntimeError("database down")
+
+    index = Failing(ttl=60)
+    with pytest.raises(RuntimeError):
+        index.ensure_loaded()
+    assert index._needs_reload()
@@ -0,0 +1,61 @@
+import gzip
+
+import pytest
+
+pytest.importorskip("flask")
+
+from flask import Flask, Response, jsonify  # noqa: E402
+
+import Compression  # noqa: E402
+import Config  # noqa: E402
+
+BODY = {"rows": ["x" * 40] * 100}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(Config, "COMPRESSION_MIN_SIZE", 1024)
+    app = Flask(__name__)
+    Compression.init_app(app)
+
+    @app.route("/big")
+    def big():
+        response = jsonify(BODY)
+        response.set_etag("v1")
+        return response
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/stream")
+    def stream():
+        return Response((line for line in ["a" * 2000]), mimetype="application/x-ndjson")
+
+    return app.test_client()
+
+
+def test_gzip_when_brotli_is_not_accepted(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] == 'W/"v1"'
+    assert gzip.decompress(response.get_data()).startswith(b'{"rows"')
+
+
+def test_brotli_preferred_when_installed(client, monkeypatch):
+    brotli = pytest.importorskip("brotli")
+    monkeypatch.setattr(Compression, "brotli", brotli)
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data()).startswith(b'{"rows"')
+
+    monkeypatch.setattr(Compression, "brotli", None)
+    assert client.get("/big", headers={"Accept-Encoding": "gzip, br"}).headers["Content-Encoding"] == "gzip"
+
+
+def test_left_alone(client):
+    assert "Content-Encoding" not in client.get("/big").headers
+    assert client.get("/big").headers["ETag"] == '"v1"'
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/stream", headers={"Accept-Encoding": "gzip"}).headers
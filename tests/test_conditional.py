@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("flask")
+
+from flask import Flask  # noqa: E402
+
+from Conditional import make_etag, not_modified, page_version  # noqa: E402
+from fakes import FakeConnection  # noqa: E402
+
+UPDATED = datetime(2025, 5, 1, 9, 30, 15, 250000)
+
+
+def test_etag_depends_on_every_part():
+    assert make_etag("job", 1, UPDATED) == make_etag("job", 1, UPDATED)
+    assert make_etag("job", 1, UPDATED) != make_etag("job", 2, UPDATED)
+    assert make_etag("job", 1, UPDATED) != make_etag("job", 1, UPDATED.replace(microsecond=0))
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, None),
+    ({"If-None-Match": '"abc"'}, 304),
+    ({"If-None-Match": 'W/"abc"'}, 304),
+    ({"If-None-Match": '"other"'}, None),
+    # If-None-Match wins when both are sent
+    ({"If-None-Match": '"other"', "If-Modified-Since": "Thu, 01 May 2025 09:30:15 GMT"}, None),
+    ({"If-Modified-Since": "Fri, 02 May 2025 00:00:00 GMT"}, 304),
+    ({"If-Modified-Since": "Wed, 30 Apr 2025 00:00:00 GMT"}, None),
+])
+def test_not_modified(headers, expected):
+    last_modified = UPDATED.astimezone()
+    with Flask(__name__).test_request_context(headers=headers):
+        response = not_modified("abc", last_modified)
+        assert (response and response.status_code) == expected
+        if response is not None:
+            assert response.get_etag() == ("abc", False)
+
+
+def test_page_version_aggregates_the_narrow_page_and_joined_tables():
+    conn = FakeConnection([("COUNT(*) AS RowCount", [{"RowCount": 2, "KeySum": 7, "UpdatedAt": UPDATED,
+                                                      "UsersUpdatedAt": UPDATED, "PropertiesCount": 9}])])
+    version = page_version(conn.cursor(dictionary=True), "SELECT JobID AS RowKey, UpdatedAt FROM JobRequests LIMIT %s",
+                           [3], tables=("Users",), counts=("Properties",))
+    assert version == (2, 7, UPDATED, UPDATED, 9)
+    (sql, params), = conn.executed
+    assert "FROM (SELECT JobID AS RowKey, UpdatedAt FROM JobRequests LIMIT %s) page" in sql
+    assert "(SELECT MAX(UpdatedAt) FROM Users) AS UsersUpdatedAt" in sql
+    assert "(SELECT COUNT(*) FROM Properties) AS PropertiesCount" in sql
+    assert params == (3,)
+
+
+def test_list_page_revalidates_without_reading_the_page(client, monkeypatch):
+    import API
+
+    versions = [(1, 4, UPDATED)]
+    invoice = {"InvoiceID": 4, "TechnicianID": 2, "JobID": 3, "Amount": 120, "SentTime": UPDATED, "Status": "Sent"}
+    conns = []
+
+    def connect():
+        conns.append(FakeConnection([
+            ("COUNT(*) AS RowCount", lambda params: [dict(zip(("RowCount", "KeySum", "UpdatedAt"), versions[-1]))]),
+            ("FROM Invoices", [invoice]),
+        ]))
+        return conns[-1]
+
+    monkeypatch.setattr(API, "get_connection", connect)
+
+    first = client.get("/api/invoices?technician_id=2")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get("/api/invoices?technician_id=2", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert len(conns[-1].executed) == 1
+
+    # Other filters are another page with its own validator
+    assert client.get("/api/invoices?technician_id=3", headers={"If-None-Match": etag}).status_code == 200
+
+    versions.append((1, 4, UPDATED.replace(second=16)))
+    changed = client.get("/api/invoices?technician_id=2", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(conns[-1].executed) == 2
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from mysql.connector.errors import PoolError  # noqa: E402
+
+from ConnectionPool import ConnectionPool  # noqa: E402
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.in_transaction = False
+        self.unread_result = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise OSError("gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+    def cursor(self, *args, **kwargs):
+        return ("cursor", self.number)
+
+
+class Factory:
+    def __init__(self):
+        self.made = []
+
+    def __call__(self):
+        conn = FakeConnection(len(self.made))
+        self.made.append(conn)
+        return conn
+
+
+def test_close_returns_the_connection_for_reuse():
+    factory = Factory()
+    pool = ConnectionPool(factory, max_size=2)
+    conn = pool.get()
+    conn.close()
+    conn.close()  # a second close is a no-op, not a double release
+    assert not conn.is_connected()
+    assert pool.get().number == 0
+    assert len(factory.made) == 1
+    assert pool.stats()["idle"] == 0
+
+
+def test_checkout_times_out_with_pool_error():
+    pool = ConnectionPool(Factory(), max_size=1)
+    held = pool.get()
+    with pytest.raises(PoolError):
+        pool.get(timeout=0.05)
+    assert pool.stats()["timeouts"] == 1
+
+    # A waiter is handed the connection as soon as it comes back
+    threading.Timer(0.05, held.close).start()
+    assert pool.get(timeout=2).number == 0
+
+
+def test_dead_connections_are_replaced():
+    factory = Factory()
+    pool = ConnectionPool(factory, max_size=1, ping_interval=0)
+    conn = pool.get()
+    conn.close()
+    factory.made[0].alive = False
+
+    replacement = pool.get()
+    assert replacement.number == 1
+    assert factory.made[0].closed
+    stats = pool.stats()
+    assert (stats["open"], stats["health_check_failures"]) == (1, 1)
+
+
+def test_idle_connections_are_evicted_down_to_min_idle():
+    factory = Factory()
+    pool = ConnectionPool(factory, max_size=3, min_idle=1, idle_timeout=0.01)
+    held = [pool.get() for _ in range(3)]
+    for conn in held:
+        conn.close()
+    time.sleep(0.05)
+    pool.evict_idle()
+
+    stats = pool.stats()
+    assert (stats["open"], stats["idle"], stats["evicted_idle"]) == (1, 1, 2)
+    assert sum(conn.closed for conn in factory.made) == 2
+
+
+def test_release_rolls_back_an_open_transaction():
+    factory = Factory()
+    pool = ConnectionPool(factory, max_size=1)
+    conn = pool.get()
+    factory.made[0].in_transaction = True
+    conn.close()
+    assert factory.made[0].rollbacks == 1
+    assert pool.get().number == 0
+
+
+
+def test_connections_that_cannot_be_reset_are_dropped():
+    factory = Factory()
+    pool = ConnectionPool(factory, max_size=2)
+    unread, broken = pool.get(), pool.get()
+    factory.made[0].unread_result = True
+    factory.made[1].in_transaction = True
+
+    def lost_connection():
+        raise OSError("lost connection")
+    factory.made[1].rollback = lost_connection
+
+    unread.close()
+    broken.close()
+
+    assert factory.made[0].closed and factory.made[1].closed
+    assert pool.stats()["open"] == 0
+    assert pool.get().number == 2
+
+
+def test_failed_connect_frees_its_slot():
+    def factory():
+        raise OSError("connection refused")
+
+    pool = ConnectionPool(factory, max_size=1)
+    with pytest.raises(OSError):
+        pool.get()
+    assert pool.stats()["open"] == 0
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("mysql.connector")
+
+import Availability  # noqa: E402
+import Dispatch  # noqa: E402
+from Dispatch import TechnicianIndex, parse_skills  # noqa: E402
+from fakes import FakeConnection  # noqa: E402
+
+NOW = datetime(2025, 5, 1, 9, 0)
+KINGSTON = (18.0, -76.8)
+
+
+def technician(technician_id, skillset, rating=None, count=0):
+    return {"TechnicianID": technician_id, "Skillset": skillset, "AvgRating": rating, "RatingCount": count,
+            "FirstName": f"Tech{technician_id}", "LastName": None}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    technicians = [technician(1, "Plumbing, HVAC", 4.5, 10), technician(2, "electrical;plumbing"),
+                   technician(3, "Painting", 5.0, 3)]
+    loads = [{"TechnicianID": 1, "OpenAssignments": 3}]
+    locations = [{"TechnicianID": 1, "Latitude": 18.0, "Longitude": -76.8},
+                 {"TechnicianID": 2, "Latitude": 18.1, "Longitude": -76.8}]
+    monkeypatch.setattr(Dispatch, "get_connection", lambda: FakeConnection([
+        ("FROM Technicians t", technicians), ("AS OpenAssignments", loads), ("MAX(AssignmentID)", locations)]))
+
+    slots = [{"ScheduleID": 1, "TechnicianID": 2, "StartTime": NOW, "EndTime": NOW + timedelta(hours=8)},
+             {"ScheduleID": 2, "TechnicianID": 1, "StartTime": NOW, "EndTime": NOW + timedelta(hours=2)}]
+    engine = Availability.AvailabilityEngine(ttl=3600)
+    monkeypatch.setattr(Availability, "get_connection", lambda: FakeConnection([("TechnicianSchedule", slots)]))
+    monkeypatch.setattr(Dispatch, "availability_engine", engine)
+    return TechnicianIndex(ttl=3600)
+
+
+def test_parse_skills():
+    assert parse_skills(" Plumbing, HVAC;electrical / Pest Control|") == {"plumbing", "hvac", "electrical", "pest control"}
+    assert parse_skills(None) == set()
+
+
+def test_rank_weighs_availability_skill_load_and_distance(index):
+    ranked = index.rank("Plumbing", KINGSTON, NOW, NOW + timedelta(hours=4))
+    assert [row["TechnicianID"] for row in ranked] == [2, 1, 3]
+    first, second, third = ranked
+    assert (first["AvailabilityOverlap"], first["SkillMatch"], first["AvgRating"]) == (1.0, True, None)
+    assert (second["AvailabilityOverlap"], second["DistanceKm"], second["OpenAssignments"]) == (0.5, 0.0, 3)
+    assert (third["SkillMatch"], third["DistanceKm"]) == (False, None)
+
+    assert [row["TechnicianID"] for row in index.rank("plumbing", KINGSTON, NOW, NOW + timedelta(hours=4),
+                                                      require_skill=True)] == [2, 1]
+    # Partial matches count as skilled
+    assert index.skilled_for("Emergency Plumbing") == {1, 2}
+    assert len(index.rank("Plumbing", None, NOW, NOW + timedelta(hours=1), limit=1)) == 1
+
+
+def test_patches_update_entries_in_place(index):
+    index.ensure_loaded()
+    index.record_assignment(1, -1)
+    index.record_assignment(3, 1, (18.1, -76.7))
+    index.record_rating(2, 3.0, 1)
+    entries = index._entries
+    assert entries[1].open_assignments == 2
+    assert (entries[3].open_assignments, entries[3].location) == (1, (18.1, -76.7))
+    assert (entries[2].avg_rating, entries[2].rating_count) == (3.0, 1)
+    assert not index._needs_reload()
+
+    index.record_assignment(1, -5)
+    assert entries[1].open_assignments == 0
+
+
+def test_unknown_technician_triggers_a_reload(index):
+    index.ensure_loaded()
+    index.record_assignment(99, 1)
+    assert index._needs_reload()
+
+
+def test_patch_during_a_load_marks_the_snapshot_stale(index, monkeypatch):
+    index.ensure_loaded()
+    index.invalidate()
+    loading = Dispatch.get_connection
+
+    def racing_connection():
+        # Another thread's committed write lands while the snapshot is being read
+        index.record_assignment(1, 1)
+        return loading()
+
+    monkeypatch.setattr(Dispatch, "get_connection", racing_connection)
+    index.ensure_loaded()
+    assert index._needs_reload()
+
+
+def test_completing_an_assignment_lowers_the_open_load(index, client, monkeypatch):
+    import API
+    index.ensure_loaded()
+    monkeypatch.setattr(API, "technician_index", index)
+    conn = FakeConnection([
+        ("SELECT Status FROM Assignments", [("In Progress",)]),
+        ("UPDATE Assignments", 1),
+        ("SELECT a.TechnicianID, a.JobID, a.Status, j.PropertyID", [(1, 10, "Completed", 4)]),
+    ])
+    monkeypatch.setattr(API, "get_connection", lambda: conn)
+
+    response = client.patch("/api/assignments/5", json={"action": "complete"})
+    assert response.status_code == 200
+    assert conn.commits == 1
+    assert index._entries[1].open_assignments == 2
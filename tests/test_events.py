@@ -0,0 +1,105 @@
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("mysql.connector")
+pytest.importorskip("email_validator")
+
+import Config  # noqa: E402
+import Events  # noqa: E402
+from Events import OutboxWorker, enqueue_events  # noqa: E402
+from fakes import FakeConnection  # noqa: E402
+
+
+def test_enqueue_writes_one_outbox_row_per_event():
+    conn = FakeConnection()
+    enqueue_events(conn.cursor(), [("job.a", {"id": 1}), ("job.b", {"at": datetime(2025, 5, 1, 9, 0)})])
+    rows = [params for _, params in conn.statements("INSERT INTO Outbox")]
+    assert [event_type for event_type, _ in rows] == ["job.a", "job.b"]
+    assert [json.loads(payload) for _, payload in rows] == [{"id": 1}, {"at": "2025-05-01 09:00:00"}]
+    enqueue_events(conn.cursor(), [])
+    assert len(conn.statements("INSERT INTO Outbox")) == 2
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    conns = []
+
+    def connect():
+        conns.append(FakeConnection())
+        return conns[-1]
+
+    monkeypatch.setattr(Events, "get_connection", connect)
+    monkeypatch.setattr(Events, "_handlers", {})
+    worker = OutboxWorker(workers=1, max_attempts=3)
+    worker._slots = threading.BoundedSemaphore(1)
+    worker.connections = conns
+    return worker
+
+
+def process(worker, event):
+    worker._slots.acquire()
+    worker._process(event)
+    # The pool slot is always handed back
+    assert worker._slots.acquire(blocking=False)
+    worker._slots.release()
+    (sql, params), = worker.connections[-1].executed
+    return sql, params
+
+
+def test_handled_events_are_marked_done(worker):
+    seen = []
+    Events.handler("job.a")(seen.append)
+    sql, params = process(worker, {"EventID": 7, "EventType": "job.a", "Payload": '{"id": 1}', "Attempts": 0})
+    assert seen == [{"id": 1}]
+    assert "SET Status = 'Done'" in sql and params == (7,)
+
+
+def test_failures_back_off_then_give_up(worker, monkeypatch):
+    monkeypatch.setattr(Config, "OUTBOX_RETRY_BASE_SECONDS", 5)
+
+    @Events.handler("job.a")
+    def broken(payload):
+        raise RuntimeError("smtp down")
+
+    sql, params = process(worker, {"EventID": 7, "EventType": "job.a", "Payload": "{}", "Attempts": 1})
+    assert "AvailableAt = NOW(6) + INTERVAL %s SECOND" in sql and params == (10, "smtp down", 7)
+    sql, params = process(worker, {"EventID": 7, "EventType": "job.a", "Payload": "{}", "Attempts": 2})
+    assert "SET Status = 'Failed'" in sql and params == ("smtp down", 7)
+
+
+def test_claim_takes_a_lease_on_what_it_returns(worker, monkeypatch):
+    events = [{"EventID": 3, "EventType": "x", "Payload": "{}", "Attempts": 0},
+              {"EventID": 4, "EventType": "x", "Payload": "{}", "Attempts": 1}]
+    conn = FakeConnection([("FOR UPDATE SKIP LOCKED", events)])
+    monkeypatch.setattr(Events, "get_connection", lambda: conn)
+    assert worker._claim(5) == events
+    (_, limit), (lease_sql, lease_params) = conn.executed
+    assert limit == (5,)
+    assert lease_params == [worker.lease_seconds, 3, 4]
+    assert conn.commits == 1
+
+
+def test_job_request_ids_are_validated_before_any_write(client, monkeypatch):
+    import API
+    monkeypatch.setattr(API, "get_connection", lambda: pytest.fail("no query expected"))
+    response = client.post("/api/jobrequests", data={
+        "tenant_id": "abc", "property_id": "10", "job_type": "Plumbing", "description": "Leak", "urgency": "2"})
+    assert response.status_code == 400
+    assert "must be integers" in response.get_json()["message"]
+
+
+def test_job_request_event_is_written_in_the_same_transaction(client, monkeypatch):
+    import API
+    conn = FakeConnection([("FROM Tenants WHERE TenantID", [(1,)])], first_id=42)
+    monkeypatch.setattr(API, "get_connection", lambda: conn)
+    response = client.post("/api/jobrequests", data={
+        "tenant_id": "1", "property_id": "10", "job_type": "Plumbing", "description": "Leak", "urgency": "2"})
+    assert response.status_code == 201
+    (_, (event_type, payload)), = conn.statements("INSERT INTO Outbox")
+    assert event_type == "job_request.submitted"
+    assert json.loads(payload)["job_id"] == 42 and json.loads(payload)["tenant_id"] == 1
+    assert conn.commits == 1
@@ -0,0 +1,58 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("orjson")
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import Config  # noqa: E402
+import FastJSON  # noqa: E402
+
+PAYLOAD = {
+    "success": True,
+    "b": [1, 2.5, None],
+    "a": {"when": datetime(2025, 5, 1, 9, 30), "amount": Decimal("120.50"), "name": "Ségolène"},
+}
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(Config, "FAST_JSON", True)
+    monkeypatch.setattr(Config, "JSON_ISO_DATETIMES", False)
+    app = Flask(__name__)
+    FastJSON.init_app(app)
+    return app
+
+
+def test_provider_is_installed_only_when_enabled(app, monkeypatch):
+    assert isinstance(app.json, FastJSON.OrjsonProvider)
+    monkeypatch.setattr(Config, "FAST_JSON", False)
+    plain = Flask(__name__)
+    FastJSON.init_app(plain)
+    assert not isinstance(plain.json, FastJSON.OrjsonProvider)
+
+
+def test_output_decodes_like_the_default_provider(app):
+    default = DefaultJSONProvider(app)
+    with app.app_context():
+        fast = app.json.response(PAYLOAD)
+        assert json.loads(fast.get_data()) == json.loads(default.response(PAYLOAD).get_data())
+        assert fast.mimetype == "application/json"
+        # Sorted keys like Flask, but non-ASCII stays UTF-8 instead of \uXXXX escapes
+        assert fast.get_data().index(b'"a"') < fast.get_data().index(b'"b"') < fast.get_data().index(b'"success"')
+        assert "Ségolène".encode() in fast.get_data()
+
+
+def test_iso_datetimes_when_asked(app, monkeypatch):
+    monkeypatch.setattr(Config, "JSON_ISO_DATETIMES", True)
+    assert json.loads(app.json.dumps({"when": datetime(2025, 5, 1, 9, 30)})) == {"when": "2025-05-01T09:30:00"}
+
+
+def test_json_dumps_arguments_fall_back_to_the_standard_library(app):
+    assert app.json.dumps({"a": 1}, indent=4) == json.dumps({"a": 1}, indent=4)
+    assert app.json.loads('{"a": 1}') == {"a": 1}
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+import Config  # noqa: E402
+import Feed  # noqa: E402
+from Feed import FeedFull, FeedPublisher, Subscription, event_topics  # noqa: E402
+from fakes import FakeConnection  # noqa: E402
+
+
+@pytest.fixture
+def publisher(monkeypatch):
+    publisher = FeedPublisher()
+    monkeypatch.setattr(publisher, "_ensure_started", lambda: None)
+    return publisher
+
+
+def test_event_topics_cover_old_and_new_technician():
+    payload = {"technician_id": 4, "previous_technician_id": 2, "property_id": 9}
+    assert sorted(event_topics(payload)) == ["property:9", "technician:2", "technician:4"]
+    assert event_topics({"technician_id": None}) == []
+
+
+def test_subscription_overflow_asks_for_reset():
+    subscription = Subscription(["technician:1"], max_queued=2)
+    subscription.push((1, "job.updated", ["technician:1"], {}))
+    assert [event[0] for event in subscription.get(0)] == [1]
+    for event_id in (2, 3, 4):
+        subscription.push((event_id, "job.updated", ["technician:1"], {}))
+    assert subscription.needs_reset
+
+
+def test_reconnect_replays_missed_events_for_its_topics(publisher):
+    publisher._start_id = 10
+    publisher._recent.extend([(11, "job.created", ["technician:1"], {}),
+                              (12, "job.created", ["technician:2"], {}),
+                              (13, "job.updated", ["technician:1"], {})])
+    subscription = publisher.subscribe(["technician:1"], last_event_id=11)
+    assert [event[0] for event in subscription.get(0)] == [13]
+    assert not subscription.needs_reset
+
+    stale = publisher.subscribe(["technician:1"], last_event_id=5)
+    assert stale.needs_reset
+
+
+def test_streams_beyond_the_cap_are_refused(publisher, monkeypatch):
+    monkeypatch.setattr(Config, "SSE_MAX_STREAMS", 2)
+    first = publisher.subscribe(["technician:1"])
+    publisher.subscribe(["technician:2"])
+    with pytest.raises(FeedFull):
+        publisher.subscribe(["technician:3"])
+    publisher.unsubscribe(first)
+    # Unsubscribing twice (generator finally and response close) frees the slot only once
+    publisher.unsubscribe(first)
+    assert publisher._count == 1
+    publisher.subscribe(["technician:3"])
+    with pytest.raises(FeedFull):
+        publisher.subscribe(["technician:4"])
+
+
+def test_poll_starts_at_the_newest_event_then_fans_out(publisher, monkeypatch):
+    rows = [{"EventID": 8, "EventType": "job.updated", "Payload": json.dumps({"technician_id": 1})},
+            {"EventID": 9, "EventType": "job.updated", "Payload": json.dumps({"technician_id": 2})}]
+    conn = FakeConnection([("MAX(EventID)", [{"EventID": 7}]), ("FROM Outbox", rows)])
+    monkeypatch.setattr(Feed, "get_connection", lambda: conn)
+    subscription = publisher.subscribe(["technician:1"])
+
+    publisher._poll()
+    assert publisher._floor == publisher._start_id == 7
+    publisher._poll()
+    assert [event[0] for event in subscription.get(0)] == [8]
+    assert publisher._floor == 9
+    assert conn.statements("WHERE EventID >")[0][1] == (7,)
+
+
+def test_stream_endpoint_rejects_bad_requests_and_answers_503_when_full(client, monkeypatch):
+    import API
+
+    assert client.get("/api/events/stream").status_code == 400
+    assert client.get("/api/events/stream?technician_id=x").status_code == 400
+
+    def full(topics, last_event_id=None):
+        raise FeedFull()
+
+    monkeypatch.setattr(API.feed_publisher, "subscribe", full)
+    response = client.get("/api/events/stream?technician_id=1")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
@@ -0,0 +1,68 @@
+import math
+import random
+
+import pytest
+
+from Geo import KM_PER_DEGREE, covering_cells, grid_cell, haversine_km, parse_point
+
+
+def test_haversine():
+    assert haversine_km(18.0, -76.8, 18.0, -76.8) == 0
+    assert haversine_km(0, 0, 1, 0) == pytest.approx(KM_PER_DEGREE)
+    assert haversine_km(0, 179.5, 0, -179.5) == pytest.approx(KM_PER_DEGREE)
+    assert haversine_km(90, 0, -90, 0) == pytest.approx(math.pi * 6371.0088)
+
+
+@pytest.mark.parametrize("value, point", [("18.01,-76.79", (18.01, -76.79)), (" -90 , 180 ", (-90.0, 180.0))])
+def test_parse_point(value, point):
+    assert parse_point(value) == point
+
+
+@pytest.mark.parametrize("value", [None, "", "18", "1,2,3", "a,b", "91,0", "0,-181", "nan,0", "0,inf"])
+def test_parse_point_rejects(value):
+    with pytest.raises(ValueError):
+        parse_point(value)
+
+
+def in_cells(cells, lat, lng):
+    (lat_lo, lat_hi), lng_ranges = cells
+    if not lat_lo <= grid_cell(lat) <= lat_hi:
+        return False
+    return not lng_ranges or any(lo <= grid_cell(lng) <= hi for lo, hi in lng_ranges)
+
+
+@pytest.mark.parametrize("centre, radius_km", [
+    ((18.0, -76.8), 5.0),
+    ((0.0, 179.95), 30.0),     # crosses the antimeridian eastwards
+    ((-10.0, -179.99), 50.0),  # and westwards
+    ((89.9, 0.0), 40.0),       # reaches the pole: every longitude
+    ((60.0, 10.0), 400.0),
+])
+def test_covering_cells_contain_every_point_within_the_radius(centre, radius_km):
+    rng = random.Random(1)
+    cells = covering_cells(*centre, radius_km)
+    checked = 0
+    while checked < 2000:
+        lat = centre[0] + rng.uniform(-1, 1) * radius_km / KM_PER_DEGREE * 1.2
+        lng = centre[1] + rng.uniform(-1, 1) * radius_km / KM_PER_DEGREE * 30
+        if not -90 <= lat <= 90:
+            continue
+        lng = (lng + 180) % 360 - 180
+        if haversine_km(*centre, lat, lng) <= radius_km:
+            assert in_cells(cells, lat, lng), (lat, lng)
+            checked += 1
+
+
+def test_covering_cells_shape():
+    (lat_lo, lat_hi), ranges = covering_cells(18.0, -76.8, 5.0)
+    assert lat_hi - lat_lo <= 4 and len(ranges) == 1
+    assert len(covering_cells(0.0, 179.95, 30.0)[1]) == 2
+    assert covering_cells(89.9, 0.0, 40.0)[1] == []
+
+
+@pytest.mark.parametrize("query", ["near=18,-76.8&radius_km=nan", "near=18,-76.8&radius_km=inf",
+                                   "near=18,-76.8&radius_km=-1", "near=nan,0", "near=18"])
+def test_radius_search_rejects_bad_input_before_querying(client, query):
+    response = client.get(f"/api/properties?{query}")
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import Config
+from fakes import FakeConnection
+
+
+@pytest.fixture
+def db(client, monkeypatch):
+    import API
+
+    def job_ids(params):
+        # AUTO_INCREMENT values deliberately not consecutive
+        inserted = [p for sql, p in conn.statements("INSERT INTO JobRequests") if p[5] == params[0]]
+        return [(seq, 1000 + 7 * seq) for *_, seq in inserted]
+
+    conn = FakeConnection([
+        ("FROM Tenants WHERE TenantID IN", [(1, 10), (2, 20)]),
+        ("SELECT BatchSeq, JobID FROM JobRequests", job_ids),
+    ])
+    monkeypatch.setattr(API, "get_connection", lambda: conn)
+    return conn
+
+
+def item(tenant_id, property_id, **extra):
+    return dict({"tenant_id": tenant_id, "property_id": property_id, "job_type": "Plumbing",
+                 "description": "Leak", "urgency": 2}, **extra)
+
+
+def test_valid_items_are_created_and_invalid_ones_reported(client, db):
+    response = client.post("/api/jobrequests/batch", json={"requests": [
+        item(1, 10), item(2, 99), item(2, 20), {"tenant_id": 1}, item("x", 10)]})
+    body = response.get_json()
+    assert response.status_code == 201
+    assert (body["created"], body["failed"], body["success"]) == (2, 3, False)
+    assert [r.get("job_id") for r in body["results"]] == [1000, None, 1007, None, None]
+    assert body["results"][1]["message"] == "Tenant not linked to this property"
+    assert db.commits == 1
+
+    events = [json.loads(params[1]) for _, params in db.statements("INSERT INTO Outbox")]
+    assert [(event["job_id"], event["tenant_id"]) for event in events] == [(1000, 1), (1007, 2)]
+
+
+def test_atomic_batch_creates_nothing_if_any_item_is_invalid(client, db):
+    response = client.post("/api/jobrequests/batch", json={"atomic": True, "requests": [item(1, 10), item(2, 99)]})
+    assert response.status_code == 400
+    assert db.statements("INSERT") == []
+    assert db.commits == 0
+
+
+def test_rows_are_tagged_per_chunk(client, db, monkeypatch):
+    monkeypatch.setattr(Config, "BATCH_INSERT_CHUNK", 2)
+    response = client.post("/api/jobrequests/batch", json={"requests": [item(1, 10)] * 5})
+    assert [r["job_id"] for r in response.get_json()["results"]] == [1000, 1007, 1000, 1007, 1000]
+    keys = [params[5] for _, params in db.statements("INSERT INTO JobRequests")]
+    assert len(set(keys)) == 3
+    assert [params[6] for _, params in db.statements("INSERT INTO JobRequests")] == [0, 1, 0, 1, 0]
+
+
+@pytest.mark.parametrize("body", [{}, {"requests": []}, {"requests": "x"}])
+def test_malformed_batches_are_rejected(client, db, body):
+    assert client.post("/api/jobrequests/batch", json=body).status_code == 400
+    assert db.executed == []
+
+
+def test_batch_size_is_capped(client, db, monkeypatch):
+    monkeypatch.setattr(Config, "MAX_BATCH_ITEMS", 2)
+    assert client.post("/api/jobrequests/batch", json={"requests": [item(1, 10)] * 3}).status_code == 400
@@ -0,0 +1,67 @@
+import json
+
+from LoginSystem import UserStore
+
+
+def put(username):
+    return json.dumps({"op": "put", "username": username, "password": "pw", "privilege": 1})
+
+
+def test_writes_replay_into_other_instances(tmp_path):
+    path = str(tmp_path / "users.json")
+    writer, reader = UserStore(path), UserStore(path)
+
+    assert writer.add("alice", "pw", 1)
+    assert writer.add_many([("bob", "pw", 2), ("alice", "pw", 1), ("bob", "pw", 2)]) == [True, False, False]
+    assert writer.delete("alice")
+
+    assert reader.all() == {"bob": {"password": "pw", "privilege": 2}}
+    assert UserStore(path).all() == reader.all()
+
+
+def test_torn_line_is_skipped(tmp_path):
+    path = str(tmp_path / "users.json")
+    store = UserStore(path)
+    store.add("alice", "pw", 1)
+    with open(path + ".log", "ab") as file:
+        file.write(put("half")[:20].encode())
+
+    # The unterminated line is left alone, and the next append terminates it rather than merging into it
+    other = UserStore(path)
+    assert other.get("half") is None
+    assert other.add("bob", "pw", 1)
+    assert store.all().keys() == {"alice", "bob"}
+    assert UserStore(path).all().keys() == {"alice", "bob"}
+
+
+def test_compaction_is_seen_by_other_instances(tmp_path):
+    path = str(tmp_path / "users.json")
+    first, second = UserStore(path, min_compact=3), UserStore(path, min_compact=3)
+
+    for i in range(3):
+        first.add(f"user-{i}", "pw", 1)
+    assert second.get("user-2") is not None
+    first.add("user-3", "pw", 1)  # crosses the threshold: snapshot rewritten, log restarted
+    with open(path) as file:
+        assert set(json.load(file)) == {f"user-{i}" for i in range(4)}
+
+    # second still holds an offset into the old log; it must reload rather than read from it
+    assert second.add("user-4", "pw", 1)
+    assert second.delete("user-0")
+    expected = {f"user-{i}" for i in range(1, 5)}
+    assert first.all().keys() == expected
+    assert second.all().keys() == expected
+    assert UserStore(path).all().keys() == expected
+
+
+def test_log_without_generation_header_still_loads(tmp_path):
+    path = str(tmp_path / "users.json")
+    with open(path, "w") as file:
+        json.dump({"alice": {"password": "pw", "privilege": 3}}, file)
+    with open(path + ".log", "w") as file:
+        file.write(put("bob") + "\n")
+
+    store = UserStore(path)
+    assert store.all().keys() == {"alice", "bob"}
+    store.compact()
+    assert UserStore(path).all() == store.all()
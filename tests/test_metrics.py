@@ -0,0 +1,92 @@
+import pytest
+
+flask = pytest.importorskip("flask")
+
+import Metrics  # noqa: E402
+from Metrics import Counter, Histogram, InstrumentedCursor  # noqa: E402
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test.", ("endpoint",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "home")
+    assert histogram.render() == [
+        "# HELP test_seconds Test.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{endpoint="home",le="0.1"} 1',
+        'test_seconds_bucket{endpoint="home",le="1"} 3',
+        'test_seconds_bucket{endpoint="home",le="+Inf"} 4',
+        'test_seconds_sum{endpoint="home"} 4.05',
+        'test_seconds_count{endpoint="home"} 4',
+    ]
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("test_total", "Test.", ("path",))
+    counter.inc(2, 'a"b\\c\nd')
+    assert counter.render()[-1] == 'test_total{path="a\\"b\\\\c\\nd"} 2'
+
+
+@pytest.mark.parametrize("sql, statement", [
+    ("  select 1", "SELECT"),
+    ("(SELECT 1) UNION (SELECT 2)", "SELECT"),
+    (b"INSERT INTO t VALUES (1)", "INSERT"),
+    ("update t set a = 1", "UPDATE"),
+    ("SHOW TABLES", "OTHER"),
+    ("", "OTHER"),
+])
+def test_statement_type(sql, statement):
+    assert Metrics._statement_type(sql) == statement
+
+
+class FakeCursor:
+    def __init__(self):
+        self.with_rows = False
+        self.rowcount = -1
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        self.with_rows = sql.startswith("SELECT")
+        self.rowcount = -1 if self.with_rows else 3
+        self.rows = [(1,), (2,)] if self.with_rows else []
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def rows_observed(statement):
+    series = Metrics.sql_rows._series.get(("background", statement))
+    return (series[-2], series[-1]) if series else (0, 0)
+
+
+def test_instrumented_cursor_counts_rows_per_statement():
+    select_before, update_before = rows_observed("SELECT"), rows_observed("UPDATE")
+    cursor = InstrumentedCursor(FakeCursor())
+    cursor.execute("SELECT a FROM t")
+    assert cursor.fetchall() == [(1,), (2,)]
+    cursor.execute("UPDATE t SET a = 1")  # flushes the SELECT's fetched rows
+    cursor.close()
+    assert rows_observed("SELECT") == (select_before[0] + 2, select_before[1] + 1)
+    assert rows_observed("UPDATE") == (update_before[0] + 3, update_before[1] + 1)
+
+
+def test_requests_are_timed_and_their_queries_counted():
+    app = flask.Flask(__name__)
+    Metrics.init_app(app)
+
+    @app.route("/things")
+    def things():
+        cursor = InstrumentedCursor(FakeCursor())
+        cursor.execute("SELECT a FROM t")
+        cursor.execute("SELECT b FROM t")
+        cursor.close()
+        return "ok"
+
+    assert app.test_client().get("/things").status_code == 200
+    text = Metrics.render()
+    assert 'dpm_http_request_duration_seconds_count{endpoint="things",method="GET",status="200"} 1' in text
+    assert 'dpm_http_request_sql_queries_sum{endpoint="things"} 2' in text
+    assert 'dpm_sql_query_duration_seconds_count{endpoint="things",statement="SELECT"} 2' in text
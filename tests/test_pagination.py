@@ -0,0 +1,70 @@
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from Pagination import InvalidPageRequest, decode_cursor, encode_cursor, keyset_condition, parse_page_args, split_page
+
+
+@pytest.mark.parametrize("values", [
+    [17],
+    [datetime(2024, 3, 1, 12, 30, 5, 250000), 9001],
+    [date(2024, 2, 29), "Unit 4"],
+    [1.5, "ünïcode", -3],
+    [None, 12],
+])
+def test_cursor_round_trip(values):
+    token = encode_cursor(values)
+    assert "=" not in token
+    assert decode_cursor(token, len(values)) == values
+
+
+@pytest.mark.parametrize("token", [
+    "not base64!",
+    encode_cursor([1, 2]),     # wrong number of keys
+    encode_cursor([True]),     # bool is not a key value
+    encode_cursor([[1]]),
+    encode_cursor([{"dt": "yesterday"}]),
+])
+def test_bad_cursors_are_rejected(token):
+    with pytest.raises(InvalidPageRequest):
+        decode_cursor(token, 1)
+
+
+def test_page_args():
+    limit, after = parse_page_args({"limit": "5", "after": encode_cursor([3])}, 1)
+    assert (limit, after) == (5, [3])
+    with pytest.raises(InvalidPageRequest):
+        parse_page_args({"limit": "0"}, 1)
+    with pytest.raises(InvalidPageRequest):
+        parse_page_args({"limit": "ten"}, 1)
+
+
+# SQLite orders NULLs like MySQL (first ascending, last descending), so it can check the predicates
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_keyset_pages_cover_nullable_keys(descending, limit):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE Jobs (JobID INTEGER PRIMARY KEY, RequestedTime TEXT)")
+    conn.executemany("INSERT INTO Jobs VALUES (?, ?)", [
+        (1, "2024-01-02"), (2, None), (3, "2024-01-01"), (4, None), (5, "2024-01-02"), (6, "2024-01-03"),
+    ])
+    direction = "DESC" if descending else "ASC"
+    order = f" ORDER BY RequestedTime {direction}, JobID {direction} LIMIT ?"
+    expected = [row["JobID"] for row in conn.execute("SELECT * FROM Jobs" + order, (100,))]
+
+    seen, after = [], None
+    while True:
+        query, params = "SELECT * FROM Jobs", []
+        if after:
+            condition, params = keyset_condition(["RequestedTime", "JobID"], after, descending, nullable=("RequestedTime",))
+            query += " WHERE " + condition.replace("%s", "?")
+        rows, next_cursor = split_page(conn.execute(query + order, params + [limit + 1]).fetchall(), limit,
+                                       ("RequestedTime", "JobID"))
+        seen.extend(row["JobID"] for row in rows)
+        if next_cursor is None:
+            break
+        after = decode_cursor(next_cursor, 2)
+
+    assert seen == expected
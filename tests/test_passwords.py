@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+import Config
+import Passwords
+from Passwords import HasherBusy, check_password, hash_password, needs_rehash, run_bounded, verify_password
+
+
+@pytest.fixture(autouse=True)
+def cheap_scrypt(monkeypatch):
+    monkeypatch.setattr(Config, "PASSWORD_SCRYPT_N", 2 ** 4)
+    monkeypatch.setattr(Config, "PASSWORD_SCRYPT_R", 8)
+    monkeypatch.setattr(Config, "PASSWORD_SCRYPT_P", 1)
+
+
+def test_hash_round_trip():
+    stored = hash_password("s3cret")
+    assert stored.startswith("scrypt$16$8$1$")
+    assert stored != hash_password("s3cret")  # salted
+    assert verify_password("s3cret", stored)
+    assert not verify_password("s3cret!", stored)
+    assert not verify_password("s3cret", "scrypt$16$8$1$not-base64")
+    assert not verify_password("s3cret", None)
+
+
+def test_plaintext_and_old_cost_hashes_need_rehash():
+    assert verify_password("legacy", "legacy")
+    assert not verify_password("legacy", "Legacy")
+    assert needs_rehash("legacy")
+    assert needs_rehash(hash_password("s3cret", n=2 ** 5))
+    assert not needs_rehash(hash_password("s3cret"))
+
+
+def test_unknown_email_verifies_against_the_dummy_on_the_pool(monkeypatch):
+    calls = []
+    monkeypatch.setattr(Passwords, "run_bounded", lambda func, *args: calls.append(args) or func(*args))
+    dummy = Passwords._dummy_hash
+    assert check_password("anything", None) == (False, False)
+    assert calls == [("anything", dummy)]
+    # Ready at import and never replaced by the request
+    assert Passwords._dummy_hash is dummy
+    assert Passwords.is_hashed(dummy)
+
+
+def test_successful_logins_are_remembered(monkeypatch):
+    monkeypatch.setattr(Passwords, "_verified", Passwords.TTLCache(10, 60))
+    calls = []
+    monkeypatch.setattr(Passwords, "run_bounded", lambda func, *args: calls.append(args) or func(*args))
+    stored = hash_password("s3cret")
+    assert check_password("s3cret", stored) == (True, False)
+    assert check_password("s3cret", stored) == (True, False)
+    assert check_password("wrong", stored) == (False, False)
+    assert len(calls) == 2
+    # Plaintext rows verify inline and ask for an upgrade
+    assert check_password("legacy", "legacy") == (True, True)
+    assert len(calls) == 2
+
+
+def test_full_queue_refuses_instead_of_waiting(monkeypatch):
+    pending = threading.BoundedSemaphore(1)
+    pending.acquire()
+    monkeypatch.setattr(Passwords, "_pending", pending)
+    monkeypatch.setattr(Config, "PASSWORD_HASH_QUEUE_TIMEOUT", 0.01)
+    with pytest.raises(HasherBusy):
+        run_bounded(verify_password, "s3cret", "s3cret")
+    pending.release()
+    assert run_bounded(verify_password, "s3cret", "s3cret")
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("mysql.connector")
+pytest.importorskip("email_validator")
+
+import Provisioning  # noqa: E402
+from fakes import FakeConnection  # noqa: E402
+from Passwords import verify_password  # noqa: E402
+from Provisioning import provision_users  # noqa: E402
+
+
+def users_table(existing=()):
+    # Answers the read-back by email with IDs that are neither consecutive nor in insert order
+    def read_back(params):
+        return [(500 - 3 * i, email.upper()) for i, email in enumerate(params)]
+
+    return FakeConnection([
+        ("SELECT Email FROM Users WHERE Email IN", [(email,) for email in existing]),
+        ("SELECT PropertyID FROM Properties", [(10,)]),
+        ("SELECT UserID, Email FROM Users WHERE Email IN", read_back),
+    ])
+
+
+def user(email, role="Tenant", **extra):
+    return dict({"email": email, "role": role, "first_name": "A", "last_name": "B"}, **extra)
+
+
+def test_results_follow_input_order_with_ids_read_back_by_email():
+    conn = users_table(existing=["taken@example.com"])
+    results = provision_users(conn.cursor(), [
+        user("a@example.com", property_id="10"),
+        user("taken@example.com"),
+        user("b@example.com", role="Technician", skillset="HVAC"),
+        user("A@example.com"),
+        user("c@example.com", role="Owner"),
+        user("d@example.com", property_id=99),
+        "not an object",
+    ], chunk_size=10)
+
+    assert [r["success"] for r in results] == [True, False, True, False, False, False, False]
+    assert [results[i]["message"] for i in (1, 3, 4, 5, 6)] == [
+        "User already exists", "Duplicate email in batch", "Role must be one of Manager, Technician, Tenant",
+        "Property not found", "Each user must be an object"]
+    assert (results[0]["user_id"], results[2]["user_id"]) == (500, 497)
+    assert verify_password(results[0]["password"], conn.statements("INSERT INTO Users")[0][1][1])
+
+    (sql, params), = conn.statements("SELECT UserID, Email FROM Users")
+    assert "UserID >=" not in sql and params == ["a@example.com", "b@example.com"]
+    assert [p for _, p in conn.statements("INSERT INTO Technicians")] == [(497, "HVAC", 0.0)]
+    assert [p for _, p in conn.statements("INSERT INTO Tenants")] == [(500, 10)]
+    assert [p for _, p in conn.statements("INSERT INTO PropertyRentSummary")] == [(10, 0, 1)]
+
+
+def test_batch_endpoint_returns_ndjson_after_commit(client, monkeypatch):
+    import API
+    conn = users_table()
+    monkeypatch.setattr(API, "get_connection", lambda: conn)
+    monkeypatch.setattr(Provisioning, "hash_passwords", lambda passwords: [f"hash:{p}" for p in passwords])
+
+    response = client.post("/api/users/batch", json={"users": [user("a@example.com"), user("", role=None)]})
+    assert response.status_code == 201
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line.get("success") for line in lines[:2]] == [True, False]
+    assert lines[-1] == {"summary": {"created": 1, "failed": 1}}
+    assert conn.commits == 1
+
+
+def test_batch_endpoint_limits(client, monkeypatch):
+    import API
+    import Config
+    monkeypatch.setattr(Config, "MAX_BATCH_USERS", 1)
+    monkeypatch.setattr(API, "get_connection", lambda: pytest.fail("no query expected"))
+    assert client.post("/api/users/batch", json={"users": [user("a@x.com"), user("b@x.com")]}).status_code == 400
+    assert client.post("/api/users/batch", json={"users": []}).status_code == 400
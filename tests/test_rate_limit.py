@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("flask")
+
+import Config  # noqa: E402
+import RateLimit  # noqa: E402
+from RateLimit import SlidingWindowLimiter  # noqa: E402
+
+START = 6000.0  # on a window boundary for the 60s windows below
+
+
+def test_limit_within_one_window():
+    limiter = SlidingWindowLimiter(3, 60, 100)
+    assert [limiter.acquire("k", START + i) for i in range(3)] == [0, 0, 0]
+    wait = limiter.acquire("k", START + 10)
+    # Blocked attempts are not counted, and the wait runs to the end of the full window
+    assert wait == 51
+    assert limiter.retry_after("k", START + 10) == 51
+    assert limiter.acquire("k", START + 60) > 0
+    assert limiter.acquire("k", START + 10 + wait) == 0
+
+
+def test_overfull_window_waits_for_its_decay():
+    limiter = SlidingWindowLimiter(3, 60, 100)
+    for _ in range(6):
+        limiter.hit("k", START)
+    wait = limiter.retry_after("k", START + 10)
+    # 6 * (1 - t/60) drops below 3 only 30s into the next window, not right at its start
+    assert wait == 81
+    assert limiter.acquire("k", START + 10 + wait - 1) > 0
+    assert limiter.acquire("k", START + 10 + wait) == 0
+
+
+def test_previous_window_decays():
+    limiter = SlidingWindowLimiter(3, 60, 100)
+    for _ in range(3):
+        limiter.hit("k", START)
+    # At the start of the next window the previous count still weighs in fully
+    wait = limiter.acquire("k", START + 60)
+    assert wait > 0
+    # 3 * (1 - t/60) drops below 3 - 1 after 20s into the window; the estimate errs late, never early
+    assert START + 60 + wait >= START + 80
+    assert limiter.acquire("k", START + 60 + wait) == 0
+    # Two windows on, nothing is left
+    limiter.reset("k")
+    limiter.hit("k", START)
+    assert limiter.retry_after("k", START + 120) == 0
+
+
+def test_refund_and_eviction():
+    limiter = SlidingWindowLimiter(1, 60, 2)
+    assert limiter.acquire("a", START) == 0
+    assert limiter.acquire("a", START) > 0
+    limiter.refund("a", START)
+    assert limiter.acquire("a", START) == 0
+
+    limiter.hit("b", START)
+    limiter.hit("c", START)  # least recently used key "a" goes
+    assert limiter.stats()["keys"] == 2
+    assert limiter.evictions == 1
+    assert limiter.retry_after("a", START) == 0
+
+
+def test_blocked_email_does_not_use_up_the_address(monkeypatch):
+    monkeypatch.setattr(Config, "LOGIN_RATE_LIMIT", True)
+    monkeypatch.setattr(RateLimit, "ip_limiter", SlidingWindowLimiter(3, 60, 100))
+    monkeypatch.setattr(RateLimit, "email_limiter", SlidingWindowLimiter(1, 60, 100))
+
+    assert RateLimit.check_login("10.0.0.1", "a@example.com") == 0
+    assert RateLimit.check_login("10.0.0.1", "a@example.com") > 0
+    assert RateLimit.check_login("10.0.0.1", "a@example.com") > 0
+    # Only the allowed attempt counted against the address
+    assert RateLimit.check_login("10.0.0.1", "b@example.com") == 0
+    assert RateLimit.check_login("10.0.0.1", "c@example.com") == 0
+    assert RateLimit.check_login("10.0.0.1", "d@example.com") > 0
+
+    RateLimit.record_login_success("a@example.com")
+    assert RateLimit.email_limiter.retry_after("a@example.com") == 0
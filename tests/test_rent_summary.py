@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+from fakes import FakeConnection
+from RentSummary import adjust_rent_counts, rebuild_rent_counts
+
+
+def test_changes_are_netted_per_property_in_property_order():
+    conn = FakeConnection()
+    adjust_rent_counts(conn.cursor(), [
+        (9, "Unpaid", "Paid"),
+        (3, None, "Unpaid"),     # tenant added
+        (9, "Paid", None),       # tenant removed
+        (3, "Unpaid", "Unpaid"),  # no change
+        (None, None, "Paid"),    # tenant without a property
+        (5, "Paid", "Unpaid"),
+        (5, "Unpaid", "Paid"),   # nets out
+    ])
+    assert [params for _, params in conn.statements("INSERT INTO PropertyRentSummary")] == [(3, 0, 1), (9, 0, -1)]
+
+
+def test_nothing_to_write_issues_no_statement():
+    conn = FakeConnection()
+    adjust_rent_counts(conn.cursor(), [(1, "Paid", "Paid"), (2, "Late", "Overdue")])
+    assert conn.executed == []
+
+
+def test_rebuild_overwrites_the_counters_from_tenants():
+    conn = FakeConnection([("INSERT INTO PropertyRentSummary", 4)])
+    assert rebuild_rent_counts(conn.cursor()) == 4
+    (sql, _), = conn.executed
+    assert "FROM Properties p LEFT JOIN Tenants t" in sql
+    assert "PaidCount = VALUES(PaidCount)" in sql
+
+
+def test_dashboard_totals_come_from_the_manager_rows(client, monkeypatch):
+    import API
+
+    conn = FakeConnection([
+        ("COUNT(*) AS RowCount", [{"RowCount": 1, "KeySum": 7, "UpdatedAt": None}]),
+        ("GROUP BY p.ManagerID", [{"ManagerID": 1, "PropertyCount": 2, "PaidCount": Decimal(3), "UnpaidCount": Decimal(1)},
+                                  {"ManagerID": 2, "PropertyCount": 1, "PaidCount": Decimal(0), "UnpaidCount": Decimal(2)}]),
+        ("FROM Properties p", [{"PropertyID": 7, "Address": "1 Hope Rd", "ManagerID": 1, "PaidCount": 3, "UnpaidCount": 1}]),
+    ])
+    monkeypatch.setattr(API, "get_connection", lambda: conn)
+
+    response = client.get("/api/dashboard/rent")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["totals"] == {"paid": 3, "unpaid": 3}
+    assert [manager["PaidCount"] for manager in body["managers"]] == [3, 0]
+    assert [prop["PropertyID"] for prop in body["properties"]] == [7]
@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("mysql.connector")
+
+import Sessions  # noqa: E402
+
+
+class RecordingCursor:
+    def __init__(self, rowcount=1):
+        self.rowcount = rowcount
+        self.executed = []
+
+    def execute(self, sql, params):
+        self.executed.append((" ".join(sql.split()), params))
+
+
+def test_token_round_trip():
+    token, _ = Sessions.create_session(RecordingCursor(), 42, "Admin")
+    user_id, session_id = Sessions.parse_token(token)
+    assert user_id == 42
+    # Freshly issued sessions are served from the cache without a lookup
+    assert Sessions.validate_token(token)["role"] == "Admin"
+    assert Sessions.session_cache.get((42, session_id)) is not None
+
+
+@pytest.mark.parametrize("mangle", [
+    lambda token: token[:-1] + ("A" if token[-1] != "A" else "B"),  # signature
+    lambda token: "7" + token,                                         # user id
+    lambda token: token.replace(".", "", 1),                            # shape
+    lambda token: "",
+    lambda token: None,
+])
+def test_mangled_tokens_are_rejected(mangle):
+    token, _ = Sessions.create_session(RecordingCursor(), 42, "Tenant")
+    assert Sessions.parse_token(mangle(token)) is None
+    assert Sessions.validate_token(mangle(token)) is None
+
+
+def test_revoke_session():
+    token, _ = Sessions.create_session(RecordingCursor(), 7, "Tenant")
+    other, _ = Sessions.create_session(RecordingCursor(), 7, "Tenant")
+    key = Sessions.parse_token(token)
+
+    cursor = RecordingCursor()
+    assert Sessions.revoke_session(cursor, token)
+    (sql, params), = cursor.executed
+    assert sql.startswith("UPDATE Sessions SET RevokedAt")
+    assert params == (key[1], key[0])
+    assert Sessions.session_cache.get(key) is None
+    assert Sessions.session_cache.get(Sessions.parse_token(other)) is not None
+
+    cursor = RecordingCursor()
+    assert not Sessions.revoke_session(cursor, token + "x")
+    assert cursor.executed == []
+
+
+def test_revoke_user_sessions():
+    tokens = [Sessions.create_session(RecordingCursor(), 9, "Tenant")[0] for _ in range(3)]
+    keep, _ = Sessions.create_session(RecordingCursor(), 10, "Tenant")
+
+    Sessions.revoke_user_sessions(RecordingCursor(), 9)
+    assert all(Sessions.session_cache.get(Sessions.parse_token(token)) is None for token in tokens)
+    assert Sessions.session_cache.get(Sessions.parse_token(keep)) is not None
@@ -0,0 +1,5 @@
+# WSGI entry point for production servers: gunicorn -c gunicorn.conf.py wsgi:app
+# Warm-up runs per worker from gunicorn.conf.py (post_worker_init), after the fork.
+from API import create_app
+
+app = create_app(warm=False)